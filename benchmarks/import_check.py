@@ -0,0 +1,67 @@
+"""
+Checks that the analysis modules and the backend import without the heavy libraries.
+
+Each module is imported in a fresh interpreter; the check fails when it pulls in one
+of the libraries that only the plots, the PyMC model or notebooks need, or, with
+`--budget`, when the import takes longer than the given number of seconds:
+
+    python benchmarks/import_check.py
+    python benchmarks/import_check.py --budget 1.5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PATHS = [os.path.join(ROOT, 'scripts'), os.path.join(ROOT, 'dashboard', 'backend')]
+
+MODULES = ['analysis_core', 'event_analysis', 'preprocess', 'visualize', 'rolling_stats', 'models.price_analysis']
+HEAVY_MODULES = ['pymc', 'arviz', 'ruptures', 'matplotlib', 'seaborn', 'IPython', 'gdown', 'scipy.stats',
+                 'scipy.signal']
+
+_PROBE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module):
+    """Imports `module` in a new interpreter; returns its import time and the heavy modules it loaded."""
+    code = _PROBE.format(paths=PATHS, module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', default=','.join(MODULES), help='comma-separated modules to import')
+    parser.add_argument('--budget', type=float, help='largest allowed import time in seconds')
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules.split(','):
+        try:
+            result = probe(module)
+        except RuntimeError as e:
+            print(e)
+            failures += 1
+            continue
+        problems = [f"loads {', '.join(result['loaded'])}"] if result['loaded'] else []
+        if args.budget is not None and result['seconds'] > args.budget:
+            problems.append(f"over the {args.budget:.2f}s budget")
+        failures += bool(problems)
+        print(f"{module:<25} {result['seconds'] * 1e3:>8.0f}ms  {'; '.join(problems) or 'ok'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
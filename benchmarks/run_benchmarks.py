@@ -0,0 +1,220 @@
+"""
+Benchmarks of the analysis hot paths and the dashboard endpoints on synthetic data.
+
+Every benchmark is timed over several repeats and run once more under tracemalloc
+for its peak Python memory. Results are written as JSON so that runs can be compared:
+
+    python benchmarks/run_benchmarks.py --sizes 9000,100000 --output before.json
+    # ... change the code ...
+    python benchmarks/run_benchmarks.py --sizes 9000,100000 --compare before.json
+
+Sizes up to `--daily-limit` rows use business days like the Brent data; larger ones
+use hourly prices so the dates stay within pandas' range.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'dashboard', 'backend'))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import numpy as np
+import pandas as pd
+from synthetic_data import key_events, synthetic_events, synthetic_prices
+
+logger = logging.getLogger('benchmarks')
+
+
+def measure(function, repeat):
+    """Times `repeat` calls of `function` (after one warm-up call) and the peak memory of one more."""
+    function()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+
+def analysis_benchmarks(prices, events):
+    """(name, function) pairs of the analysis functions on one dataset."""
+    from models.price_analysis import (
+        calculate_analysis_metrics, calculate_event_impact, calculate_event_impacts, calculate_price_distribution,
+        get_prices_around_event
+    )
+
+    catalogue = key_events(events)
+    first_event, first_date = next(iter(catalogue.items()))
+    dates = [pd.Timestamp(date) for date in catalogue.values()]
+    frame = prices.reset_index()
+
+    def prices_around_events():
+        for date in dates:
+            get_prices_around_event(date, prices, days_before=180, days_after=180)
+
+    benchmarks = [
+        ('get_prices_around_event', prices_around_events),
+        ('calculate_event_impact', lambda: calculate_event_impact(first_event, first_date, prices)),
+        ('calculate_event_impacts', lambda: calculate_event_impacts(catalogue, prices)),
+        ('calculate_price_distribution', lambda: calculate_price_distribution(prices)),
+        ('calculate_analysis_metrics', lambda: calculate_analysis_metrics(frame)),
+    ]
+
+    try:
+        from event_analysis import EventChangeAnalyzer
+    except ImportError as e:
+        logger.warning("Skipping detect_change_point: %s", e)
+    else:
+        analyzer = EventChangeAnalyzer(prices, logger=logger)
+        benchmarks.append(('detect_change_point',
+                           lambda: analyzer.detect_change_point(penalty='bic', min_size=30, plot=False)))
+    return benchmarks
+
+
+def endpoint_benchmarks(prices, events, data_dir):
+    """(name, function) pairs requesting each endpoint through the Flask test client.
+
+    Cold requests clear the response cache first (the per-version data services, such as
+    the histogram, stay built); warm ones are served from it."""
+    path = os.path.join(data_dir, 'data.csv')
+    prices.reset_index().to_csv(path, index=False)
+    os.environ['PRICE_DATA_PATH'] = path
+    import app as dashboard
+
+    dashboard.store.refresh()
+    client = dashboard.app.test_client()
+    batch = {'events': [{'name': name, 'date': date} for name, date in key_events(events).items()]}
+    routes = [
+        '/api/prices?max_points=1000',
+        '/api/price-trends',
+        '/api/event-impact',
+        '/api/analysis-metrics',
+        '/api/average-yearly-price',
+        '/api/price-distribution',
+        '/api/rolling?windows=20,50,200',
+        '/api/aggregate?freq=M',
+        '/api/aggregate?freq=W&start=2015-03-15&end=2016-09-20',
+    ]
+
+    def get(route, cold):
+        def request():
+            if cold:
+                dashboard.response_cache.clear()
+            response = client.get(route)
+            assert response.status_code == 200, (route, response.status_code)
+        return request
+
+    def post_batch():
+        response = client.post('/api/event-impact/batch', json=batch)
+        assert response.status_code == 200, response.status_code
+
+    benchmarks = []
+    for route in routes:
+        benchmarks.append((f'GET {route} (cold)', get(route, cold=True)))
+        benchmarks.append((f'GET {route} (warm)', get(route, cold=False)))
+    benchmarks.append((f'POST /api/event-impact/batch ({len(events)} events)', post_batch))
+    return benchmarks
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(results, baseline_path):
+    """Prints the median time of each benchmark relative to a previous results file."""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    print(f"\n{'benchmark':<60} {'size':>9} {'median':>10} {'baseline':>10} {'ratio':>7}")
+    for result in results:
+        before = baseline.get((result['name'], result['size']))
+        ratio = f"{result['median_s'] / before['median_s']:.2f}x" if before and before['median_s'] else '-'
+        previous = f"{before['median_s'] * 1e3:.2f}ms" if before else '-'
+        print(f"{result['name']:<60} {result['size']:>9} {result['median_s'] * 1e3:>8.2f}ms {previous:>10} {ratio:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='9000,100000', help='comma-separated numbers of price rows')
+    parser.add_argument('--events', type=int, default=50, help='number of synthetic events')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per benchmark')
+    parser.add_argument('--daily-limit', type=int, default=12000, help='largest size generated as daily prices')
+    parser.add_argument('--only', help='regular expression selecting benchmarks by name')
+    parser.add_argument('--skip-endpoints', action='store_true', help='do not benchmark the Flask endpoints')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    meta = environment()
+    meta['args'] = vars(args)
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in [int(size) for size in args.sizes.split(',')]:
+            freq = 'B' if size <= args.daily_limit else 'h'
+            prices = synthetic_prices(size, freq=freq, seed=args.seed)
+            events = synthetic_events(args.events, start=prices.index[0], end=prices.index[-1], seed=args.seed)
+            benchmarks = analysis_benchmarks(prices, events)
+            if not args.skip_endpoints:
+                benchmarks += endpoint_benchmarks(prices, events, data_dir)
+            for name, function in benchmarks:
+                if args.only and not re.search(args.only, name):
+                    continue
+                result = {'name': name, 'size': size, 'freq': freq, 'events': args.events}
+                result.update(measure(function, args.repeat))
+                results.append(result)
+                print(f"{name:<60} {size:>9} {result['median_s'] * 1e3:>10.2f}ms "
+                      f"{result['peak_memory_bytes'] / 2 ** 20:>8.1f}MiB", flush=True)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results',
+                                         f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, default=str)
+    print(f"\nWrote {len(results)} results to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
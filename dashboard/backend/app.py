@@ -1,21 +1,63 @@
 # app.py
 
-from flask import Flask, jsonify, request
+import hashlib
+import math
+import os
+import time
+from functools import wraps
+
+from flask import Flask, Response, abort, g, jsonify, request, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 from models.price_analysis import (
-    load_price_data,
-    calculate_price_trends, 
-    calculate_yearly_average_price, 
-    calculate_analysis_metrics,calculate_price_distribution, 
-    calculate_event_impact, get_prices_around_event
+    data_path,
+    calculate_price_trends,
+    yearly_average_frame,
+    aggregate_frame,
+    calculate_analysis_metrics,price_distribution_frame,
+    event_impacts_frame, get_prices_around_event, DateWindowIndex, EventImpactEngine, HistogramService,
+    rolling_stats_frame, RollingStats, MAX_WINDOWS, PricePyramid
+)
+from models.cache import ResponseCache
+from models.event_batch import BatchRequestError, iter_event_impacts, parse_event_batch
+from models.serialization import (
+    JSON_MIMETYPE, LAYOUTS, NDJSON_MIMETYPE, Table, available_encodings, available_mimetypes, compress,
+    serialize, serialize_ndjson
 )
+from models.downsample import DOWNSAMPLING_METHODS
+from models.data_store import PriceDataStore
+from models.metrics import PROMETHEUS_MIMETYPE, SamplingProfiler, metrics
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 1024 * 1024))
+# /metrics and /debug/slow-requests reveal internals, so they are served only with EXPOSE_METRICS=1
+app.config['EXPOSE_METRICS'] = os.environ.get('EXPOSE_METRICS', '0') == '1'
+
+# Per-request limits of /api/rolling, configurable per deployment
+MAX_WINDOW = int(os.environ.get('ROLLING_MAX_WINDOW', 2520))
 CORS(app)
 
-# Load data
-price_data = load_price_data()
+# Load data; cached responses are dropped whenever the data file changes
+response_cache = ResponseCache(max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 256)))
+store = PriceDataStore(os.environ.get('PRICE_DATA_PATH', data_path))
+store.add_reload_listener(response_cache.clear)
+store.load()
+
+# Analysis helpers built from the data (prefix sums, sorted arrays), once per dataset version
+data_services = ResponseCache(max_entries=8)
+store.add_reload_listener(data_services.clear)
+
+
+def data_service(factory):
+    """The instance of `factory(store.data)` for the current dataset version."""
+    return data_services.get_or_compute((store.version, factory.__name__), lambda: (factory(store.data), True))
+
+metrics.gauge('dashboard_response_cache_entries', 'Entries in the response cache.', lambda: len(response_cache))
+metrics.gauge('dashboard_price_rows', 'Rows of the loaded price data.',
+              lambda: len(store.data) if store.data is not None else None)
+
+# Opt-in: PROFILE_SLOW_REQUESTS_MS=500 samples the stacks of requests slower than that
+profiler = SamplingProfiler.from_env()
 
 key_events = {
     "Russian Financial Crisis": "1999-08-17",
@@ -25,62 +67,343 @@ key_events = {
     "Post-COVID-19 Recovery + OPEC+ Cuts": "2021-09-22",
 }
 
+cached_routes = []
+
+
+def route_label():
+    # The URL rule, not the path, so that metrics have one series per endpoint
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def date_arg(name):
+    """The query parameter `name` as a naive (UTC) Timestamp, or None; ValueError when it is not a date."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        date = pd.Timestamp(value)
+    except (TypeError, ValueError, OverflowError):
+        date = pd.NaT
+    if pd.isna(date):
+        raise ValueError(f"{name} is not a valid date: {value!r}")
+    return date.tz_convert('UTC').tz_localize(None) if date.tz is not None else date
+
+
+def error_response(e, status=500):
+    """Logs an endpoint failure with its traceback, counts it and returns the JSON error."""
+    app.logger.exception("%s %s failed", request.method, request.path)
+    metrics.count_error(route_label(), e)
+    return jsonify({'error': str(e)}), status
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if profiler is not None:
+        profiler.start_request()
+
+
+@app.after_request
+def record_request_metrics(response):
+    # For streamed responses this is the time to the first byte; their size is unknown
+    started = g.get('request_started')
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.observe_request(route_label(), request.method, response.status_code, elapsed, size)
+        if profiler is not None:
+            profiler.finish_request(f'{request.method} {request.full_path.rstrip("?")}', elapsed)
+    return response
+
+
+def negotiate_mimetype(offered):
+    """Best of the `offered` formats for the Accept header (JSON without one), or None."""
+    if not request.accept_mimetypes:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match(offered)
+
+
+def cached_response(view):
+    """Serve a GET endpoint from the response cache.
+
+    Entries are keyed on the dataset version, the route and its query parameters.
+    Responses carry an ETag so clients can revalidate with If-None-Match. Error
+    responses (returned as a `(response, status)` tuple) are never cached.
+
+    The body format is negotiated from the Accept header (JSON, MessagePack or an
+    Arrow IPC stream when installed), `?layout=columnar` sends tables as one array
+    per column, and bodies are compressed according to Accept-Encoding. The encoded
+    body is cached once per format; each compressed variant is cached on top of it.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        store.refresh()
+        mimetype = negotiate_mimetype(available_mimetypes())
+        if mimetype is None:
+            return jsonify({'error': f"Acceptable formats: {', '.join(available_mimetypes())}"}), 406
+        layout = request.args.get('layout', 'records')
+        if layout not in LAYOUTS:
+            return jsonify({'error': f"layout must be one of {', '.join(LAYOUTS)}"}), 400
+        encoding = request.accept_encodings.best_match(available_encodings())
+        key = (store.version, request.path, tuple(sorted(request.args.items(multi=True))), mimetype)
+
+        def compute_body():
+            rv = view(*args, **kwargs)
+            if isinstance(rv, tuple):
+                return rv, False
+            body = serialize(rv, mimetype, layout)
+            if body is None:
+                return (jsonify({'error': f"{request.path} cannot be sent as {mimetype}"}), 406), False
+            return body, True
+
+        computed = False
+
+        def compute():
+            nonlocal computed
+            computed = True
+            body = response_cache.get_or_compute(key, compute_body)
+            if isinstance(body, tuple):
+                return body, False
+            body, applied = compress(body, encoding)
+            return (body, hashlib.sha1(body).hexdigest(), applied), True
+
+        entry = response_cache.get_or_compute(key + (encoding,), compute)
+        metrics.cache_result(route_label(), hit=not computed)
+        if not isinstance(entry[0], bytes):
+            return entry
+        body, etag, applied = entry
+        response = Response(body, mimetype=mimetype)
+        if applied:
+            response.content_encoding = applied
+        response.vary.update(('Accept', 'Accept-Encoding'))
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    cached_routes.append(view.__name__)
+    return wrapper
+
+
+def warm_cache():
+    """Precompute the parameterless responses of all cached endpoints."""
+    with app.test_client() as client:
+        for rule in app.url_map.iter_rules():
+            if rule.endpoint in cached_routes and not rule.arguments:
+                client.get(rule.rule)
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: the worker is up and serving requests
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    # Readiness: the price data is loaded (a failed reload keeps the previous version)
+    store.refresh()
+    if not store.ready:
+        return jsonify({'status': 'loading'}), 503
+    return jsonify({
+        'status': 'ready',
+        'version': store.version,
+        'rows': len(store.data),
+        'last_error': store.last_error,
+        'pid': os.getpid(),
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus scrape endpoint (per worker process under gunicorn)
+    if not app.config['EXPOSE_METRICS']:
+        abort(404)
+    return Response(metrics.render(), content_type=PROMETHEUS_MIMETYPE)
+
+@app.route('/debug/slow-requests', methods=['GET'])
+def get_slow_requests():
+    # Sampled call stacks of the slowest requests, when the profiler is enabled
+    if not app.config['EXPOSE_METRICS']:
+        abort(404)
+    if profiler is None:
+        return jsonify({'error': 'Profiling is off; set PROFILE_SLOW_REQUESTS_MS to enable it'}), 404
+    return jsonify(profiler.slowest())
+
 @app.route('/api/price-trends', methods=['GET'])
+@cached_response
 def get_price_trends():
+    price_data = store.data
+    window_index = data_service(DateWindowIndex)
     trends_data = []
     for event, date in key_events.items():
         event_date = pd.to_datetime(date)
-        prices_around_event = get_prices_around_event(event_date, price_data, days_before=180, days_after=180)
+        prices_around_event = get_prices_around_event(event_date, price_data, days_before=180, days_after=180,
+                                                      service=window_index)
         trends_data.append({
             'event': event,
             'date': date,
-            'prices': prices_around_event['Price'].tolist(),
-            'dates': prices_around_event.index.tolist()
+            'prices': prices_around_event['Price'].to_numpy(),
+            'dates': prices_around_event.index.values
         })
-    return jsonify(trends_data)
+    return trends_data
 
 @app.route('/api/event-impact', methods=['GET'])
+@cached_response
 def get_event_impact():
-    results = []
-    for event, date in key_events.items():
-        impact_data = calculate_event_impact(event, date, price_data)
-        results.append(impact_data)
-    return jsonify(results)
+    return Table(event_impacts_frame(key_events, store.data))
+
+@app.route('/api/event-impact/batch', methods=['POST'])
+def post_event_impact_batch():
+    # Score a list of ad-hoc events; with Accept: application/x-ndjson rows are
+    # streamed chunk by chunk as they are computed
+    try:
+        spec = parse_event_batch(request.get_json(silent=True))
+    except BatchRequestError as e:
+        return jsonify({'error': str(e)}), e.status
+    offered = available_mimetypes() + [NDJSON_MIMETYPE]
+    mimetype = negotiate_mimetype(offered)
+    if mimetype is None:
+        return jsonify({'error': f"Acceptable formats: {', '.join(offered)}"}), 406
+    layout = request.args.get('layout', 'records')
+    if layout not in LAYOUTS:
+        return jsonify({'error': f"layout must be one of {', '.join(LAYOUTS)}"}), 400
+
+    store.refresh()
+    chunks = iter_event_impacts(data_service(EventImpactEngine), **spec)
+
+    if mimetype == NDJSON_MIMETYPE:
+        def generate():
+            try:
+                for impacts in chunks:
+                    yield serialize_ndjson(Table(impacts))
+            except Exception as e:
+                app.logger.exception("Streaming %s failed", request.path)
+                metrics.count_error(route_label(), e)
+                yield serialize({'error': str(e)}) + b'\n'
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+    try:
+        impacts = pd.concat(list(chunks), ignore_index=True)
+    except Exception as e:
+        return error_response(e)
+    return Response(serialize(Table(impacts), mimetype, layout), mimetype=mimetype)
 
 @app.route('/api/analysis-metrics', methods=['GET'])
+@cached_response
 def get_analysis():
     try:
-        analysis_results = calculate_analysis_metrics(price_data.reset_index())
-        return jsonify(analysis_results)
+        analysis_results = calculate_analysis_metrics(store.data.reset_index())
+        return analysis_results
     except Exception as e:
-        return jsonify({'error': str(e)}), 500  # Internal Server Error
+        return error_response(e)
 
 @app.route('/api/prices', methods=['GET'])
+@cached_response
 def get_price_trend():
     try:
-        # Generate full dataset without filtering
-        price_data_dict = calculate_price_trends(price_data)
-        
-        return jsonify(price_data_dict)
+        max_points = request.args.get('max_points')
+        if max_points is not None:
+            try:
+                max_points = int(max_points)
+            except ValueError:
+                max_points = 0
+            if max_points < 3:
+                return jsonify({'error': 'max_points must be an integer of at least 3'}), 400
+        method = request.args.get('method', 'lttb')
+        if method not in DOWNSAMPLING_METHODS:
+            return jsonify({'error': f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}"}), 400
+
+        try:
+            start, end = date_arg('start'), date_arg('end')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Optionally restrict to [start, end] and downsample to max_points
+        price_data_dict = calculate_price_trends(store.data, start=start, end=end, max_points=max_points,
+                                                 method=method)
+
+        return price_data_dict
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 
 
 @app.route('/api/average-yearly-price', methods=['GET'])
+@cached_response
 def get_yearly_average():
     try:
-        analysis_results = calculate_yearly_average_price(price_data)
-        return jsonify(analysis_results)
+        return Table(yearly_average_frame(store.data, service=data_service(PricePyramid)))
     except Exception as e:
-        return jsonify({'error': str(e)}), 500  # Internal Server Error
-    
+        return error_response(e)
+
 @app.route('/api/price-distribution', methods=['GET'])
+@cached_response
 def get_distribution():
     try:
-        analysis_results = calculate_price_distribution(price_data)
-        return jsonify(analysis_results)
+        try:
+            bin_size = float(request.args.get('bin_size', 5))
+        except ValueError:
+            return jsonify({'error': 'bin_size must be a number'}), 400
+        edges = request.args.get('edges')
+        if edges is not None:
+            try:
+                edges = [float(edge) for edge in edges.split(',')]
+                if not all(math.isfinite(edge) for edge in edges):
+                    raise ValueError
+            except ValueError:
+                return jsonify({'error': 'edges must be a comma-separated list of finite numbers'}), 400
+        try:
+            distribution = price_distribution_frame(store.data, bin_size=bin_size, edges=edges,
+                                                    start=date_arg('start'), end=date_arg('end'),
+                                                    service=data_service(HistogramService))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return Table(distribution)
+    except Exception as e:
+        return error_response(e)
+
+@app.route('/api/rolling', methods=['GET'])
+@cached_response
+def get_rolling():
+    # Rolling statistics for several windows at once, e.g. ?windows=20,50,200&stats=mean,std
+    try:
+        windows = request.args.get('windows', '30').split(',')
+        if len(windows) > MAX_WINDOWS:
+            return jsonify({'error': f"At most {MAX_WINDOWS} windows per request, got {len(windows)}"}), 400
+        try:
+            windows = [int(window) for window in windows]
+        except ValueError:
+            return jsonify({'error': 'windows must be a comma-separated list of integers'}), 400
+        if any(window > MAX_WINDOW for window in windows):
+            return jsonify({'error': f"windows must be at most {MAX_WINDOW} prices long"}), 400
+        stats = request.args.get('stats')
+        try:
+            rolling = rolling_stats_frame(store.data, windows, stats=stats.split(',') if stats else None,
+                                          start=date_arg('start'), end=date_arg('end'),
+                                          service=data_service(RollingStats))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return Table(rolling)
+    except Exception as e:
+        return error_response(e)
+
+@app.route('/api/aggregate', methods=['GET'])
+@cached_response
+def get_aggregate():
+    # Price bars per day, week, month, quarter or year, e.g. ?freq=W&start=2020-01-01&end=2020-06-30
+    try:
+        try:
+            aggregate = aggregate_frame(store.data, freq=request.args.get('freq', 'M'),
+                                        start=date_arg('start'), end=date_arg('end'),
+                                        service=data_service(PricePyramid))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return Table(aggregate)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500  # Internal Server Error    
+        return error_response(e)
+
+
+if os.environ.get('WARM_CACHE', '0') == '1':
+    warm_cache()
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server; in production run gunicorn with gunicorn.conf.py (see wsgi.py)
+    app.run(host=os.environ.get('HOST', '127.0.0.1'), port=int(os.environ.get('PORT', 5000)),
+            debug=os.environ.get('FLASK_DEBUG', '0') == '1')
@@ -0,0 +1,39 @@
+# gunicorn.conf.py
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+# Import the app, and load the price data, once in the master. Forked workers share
+# those pages copy-on-write instead of each holding its own copy, so memory does
+# not grow with the worker count.
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # Move the preloaded objects out of the collector's reach so that garbage
+    # collection in the workers does not touch (and copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Pick up a dataset that changed between the preload and this fork; later changes
+    # are detected per request by PriceDataStore.refresh
+    from app import store
+
+    store.refresh()
+    server.log.info("Worker %s serving price data version %s", worker.pid, store.version)
@@ -0,0 +1,69 @@
+# cache.py
+
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Thread-safe LRU cache for computed endpoint responses.
+
+    Concurrent misses on the same key are collapsed: only the first caller runs the
+    computation, the others wait for its result.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing it once if missing.
+
+        `compute` returns a `(value, cacheable)` pair; uncacheable values (errors)
+        are handed back to the caller without being stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                value = self._entries.get(key)
+            if value is not None:
+                return value
+            try:
+                value, cacheable = compute()
+                if cacheable:
+                    self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
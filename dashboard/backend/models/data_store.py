@@ -0,0 +1,85 @@
+# data_store.py
+
+import hashlib
+import logging
+import os
+import threading
+
+from models.price_analysis import data_path, load_price_data
+
+logger = logging.getLogger(__name__)
+
+
+class PriceDataStore:
+    """Holds the loaded price frame together with a version derived from the data file.
+
+    The version is a content hash of the file, so a touched but unchanged file keeps
+    its version. `refresh` only re-reads the file when its mtime or size changed, which
+    keeps the per-request check down to a single `os.stat`.
+
+    Once loaded, a failed reload (e.g. a file that is still being written) keeps the
+    previous version in service; the failure is kept in `last_error`.
+    """
+
+    def __init__(self, path=data_path, loader=load_price_data):
+        self.path = path
+        self.loader = loader
+        self.data = None
+        self.version = None
+        self.last_error = None
+        self._stat = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_reload_listener(self, callback):
+        self._listeners.append(callback)
+
+    def load(self):
+        with self._lock:
+            self._load()
+        return self.data
+
+    @property
+    def ready(self):
+        return self.data is not None
+
+    def refresh(self):
+        """Reload the data if the file changed on disk. Returns True when a new version was loaded."""
+        try:
+            stat = self._file_stat()
+            if stat == self._stat:
+                return False
+            with self._lock:
+                if self._file_stat() == self._stat:
+                    return False
+                return self._load()
+        except Exception as e:
+            if self.data is None:
+                raise
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Keeping data version %s, reload of %s failed: %s", self.version, self.path, self.last_error)
+            return False
+
+    def _load(self):
+        stat = self._file_stat()
+        version = self._file_hash()
+        self._stat = stat
+        if version == self.version and self.data is not None:
+            return False
+        self.data = self.loader(self.path)
+        self.version = version
+        self.last_error = None
+        for callback in self._listeners:
+            callback()
+        return True
+
+    def _file_stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _file_hash(self):
+        digest = hashlib.sha1()
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
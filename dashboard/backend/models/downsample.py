@@ -0,0 +1,80 @@
+# downsample.py
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points preserving the visual shape of (x, y).
+
+    The first and last points are always kept. Bucket averages are computed at once with
+    `np.add.reduceat`; only the choice of the point in each bucket, which depends on the
+    previously chosen one, is sequential.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+
+    # n_out - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The point following the last bucket is the last data point
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Min/max bucketing: the first and last points plus the minimum and maximum of each of
+    `(n_out - 2) // 2` equal-count buckets, so at most `n_out` indices are returned.
+
+    With `n_out` = 3 the third point is the interior minimum or maximum, whichever lies
+    farther from the mean of the first and last points."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = (n_out - 2) // 2
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+    if n_buckets < 1:
+        interior = y[1:n - 1]
+        reference = (y[0] + y[-1]) / 2
+        low, high = int(np.argmin(interior)), int(np.argmax(interior))
+        extreme = high if interior[high] - reference >= reference - interior[low] else low
+        return np.array([0, extreme + 1, n - 1], dtype=np.int64)
+
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    firsts = np.searchsorted(bucket[order], np.arange(n_buckets), side='left')
+    lasts = np.searchsorted(bucket[order], np.arange(n_buckets), side='right') - 1
+    return np.unique(np.concatenate(([0, n - 1], order[firsts], order[lasts])))
+
+
+DOWNSAMPLING_METHODS = ('lttb', 'minmax')
+
+
+def downsample_series(series, max_points, method='lttb'):
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if max_points is None or len(series) <= max_points:
+        return series
+    if method == 'minmax':
+        return series.iloc[minmax_indices(series.to_numpy(), max_points)]
+    x = series.index.values.astype('datetime64[ns]').astype(np.int64)
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
@@ -0,0 +1,148 @@
+# event_batch.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Importing price_analysis also makes the shared scripts/ modules importable
+from models.price_analysis import EventImpactEngine
+from window_index import ASOF_POLICIES
+
+# Per-request limits, configurable per deployment
+MAX_EVENTS = int(os.environ.get('EVENT_BATCH_MAX_EVENTS', 1000))
+MAX_WINDOW_DAYS = int(os.environ.get('EVENT_BATCH_MAX_WINDOW_DAYS', 3650))
+MAX_HORIZONS = int(os.environ.get('EVENT_BATCH_MAX_HORIZONS', 12))
+DEFAULT_CHUNK_SIZE = 100
+
+
+class BatchRequestError(ValueError):
+    """An invalid batch request; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _days(value, field, minimum=0):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise BatchRequestError(f"{field} must be an integer number of days")
+    if not minimum <= value <= MAX_WINDOW_DAYS:
+        raise BatchRequestError(f"{field} must be between {minimum} and {MAX_WINDOW_DAYS} days")
+    return value
+
+
+def _date(value, field):
+    try:
+        date = pd.Timestamp(value)
+    except (TypeError, ValueError, OverflowError):
+        date = pd.NaT
+    if pd.isna(date):
+        raise BatchRequestError(f"{field} is not a valid date: {value!r}")
+    # Dates with an offset are compared with the (naive) price dates in UTC
+    if date.tz is not None:
+        date = date.tz_convert('UTC').tz_localize(None)
+    return date.normalize()
+
+
+def _check_range(date, days_before, days_after, field):
+    # Window and horizon dates must stay within the datetime64[ns] range
+    try:
+        inside = (pd.Timestamp.min + pd.Timedelta(days=days_before) <= date
+                  <= pd.Timestamp.max - pd.Timedelta(days=days_after))
+    except (OverflowError, ValueError):
+        inside = False
+    if not inside:
+        raise BatchRequestError(f"{field} is too close to the supported date range "
+                                f"({pd.Timestamp.min.date()} to {pd.Timestamp.max.date()}) for its windows")
+
+
+def parse_event_batch(payload):
+    """
+    Validates a batch request body.
+
+    Expected body::
+
+        {"events": [{"name": "...", "date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}, ...],
+         "days_before": 180, "days_after": 180, "horizons": [30, 90, 180],
+         "policy": "nearest", "tolerance_days": 7, "equal_var": true, "chunk_size": 100}
+
+    Only `events` and each event's `date` are required. An event's `end_date` sets
+    its own after window, ending on that date instead of `days_after` later.
+
+    Returns:
+    - dict: Keyword arguments for `iter_event_impacts`.
+    """
+    if not isinstance(payload, dict):
+        raise BatchRequestError("Request body must be a JSON object")
+    events = payload.get('events')
+    if not isinstance(events, list) or not events:
+        raise BatchRequestError("events must be a non-empty list")
+    if len(events) > MAX_EVENTS:
+        raise BatchRequestError(f"At most {MAX_EVENTS} events per request, got {len(events)}", status=413)
+
+    days_before = _days(payload.get('days_before', 180), 'days_before')
+    default_after = _days(payload.get('days_after', 180), 'days_after')
+
+    horizons = payload.get('horizons', [30, 90, 180])
+    if not isinstance(horizons, list) or len(horizons) > MAX_HORIZONS:
+        raise BatchRequestError(f"horizons must be a list of at most {MAX_HORIZONS} day counts")
+    horizons = sorted({_days(days, 'horizons', minimum=1) for days in horizons})
+
+    policy = payload.get('policy', 'nearest')
+    if policy not in ASOF_POLICIES:
+        raise BatchRequestError(f"policy must be one of {', '.join(ASOF_POLICIES)}")
+    tolerance_days = payload.get('tolerance_days', 7)
+    if tolerance_days is not None:
+        tolerance_days = _days(tolerance_days, 'tolerance_days')
+    # Farthest a horizon lookup reaches from an event date
+    reach = (horizons[-1] if horizons else 0) + (tolerance_days or 0)
+
+    names, dates, days_after = [], [], []
+    for i, event in enumerate(events):
+        if not isinstance(event, dict) or 'date' not in event:
+            raise BatchRequestError(f"events[{i}] must be an object with a date")
+        date = _date(event['date'], f"events[{i}].date")
+        if event.get('end_date') is not None:
+            end_date = _date(event['end_date'], f"events[{i}].end_date")
+            days_after.append(_days((end_date - date).days, f"events[{i}] window (end_date - date)"))
+        else:
+            days_after.append(default_after)
+        _check_range(date, max(days_before, reach), max(days_after[-1], reach), f"events[{i}].date")
+        names.append(str(event.get('name', date.strftime('%Y-%m-%d'))))
+        dates.append(date)
+
+    chunk_size = payload.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or not 1 <= chunk_size <= MAX_EVENTS:
+        raise BatchRequestError(f"chunk_size must be between 1 and {MAX_EVENTS}")
+    equal_var = payload.get('equal_var', True)
+    if not isinstance(equal_var, bool):
+        raise BatchRequestError("equal_var must be true or false")
+
+    return {
+        'names': names,
+        'dates': pd.DatetimeIndex(dates),
+        'days_before': days_before,
+        'days_after': np.asarray(days_after, dtype=np.int64),
+        'horizons': horizons,
+        'policy': policy,
+        'tolerance_days': tolerance_days,
+        'equal_var': equal_var,
+        'chunk_size': chunk_size,
+    }
+
+
+def iter_event_impacts(engine: EventImpactEngine, names, dates, days_before, days_after, horizons,
+                       policy, tolerance_days, equal_var, chunk_size):
+    """Scores the events `chunk_size` at a time, yielding one DataFrame per chunk.
+
+    Each chunk is a single vectorized `EventImpactEngine.compute` call, so results can be
+    streamed while later chunks are still being computed.
+    """
+    for lo in range(0, len(dates), chunk_size):
+        hi = lo + chunk_size
+        impacts = engine.compute(dates[lo:hi], names=names[lo:hi], horizons=horizons,
+                                 days_before=days_before, days_after=days_after[lo:hi],
+                                 equal_var=equal_var, policy=policy, tolerance_days=tolerance_days)
+        impacts.insert(2, 'End Date', dates[lo:hi] + pd.to_timedelta(days_after[lo:hi], unit='D'))
+        yield impacts
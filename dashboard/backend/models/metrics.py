@@ -0,0 +1,313 @@
+# metrics.py
+
+import heapq
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _label_value(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_label_value(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+
+
+class CounterMetric(_Metric):
+    """Monotonic count per label combination."""
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self.labels, key)} {_format_number(value)}'
+                                for key, value in values]
+
+
+class HistogramMetric(_Metric):
+    """Cumulative bucket counts, sum and count per label combination."""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[labels] = (counts, total + value)
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in values:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", _format_number(bound))])} '
+                             f'{count}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_number(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {counts[-1]}')
+        return lines
+
+
+class GaugeMetric(_Metric):
+    """Value read from a callback at scrape time; the callback returns a number or {labels: number}."""
+    type = 'gauge'
+
+    def __init__(self, name, documentation, function, labels=()):
+        super().__init__(name, documentation, labels)
+        self.function = function
+
+    def render(self):
+        values = self.function()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self.header() + [f'{self.name}{_format_labels(self.labels, key)} {_format_number(value)}'
+                                for key, value in sorted(values.items()) if value is not None]
+
+
+class Metrics:
+    """Request, cache, error and analysis-function metrics of one process.
+
+    Rendered in the Prometheus text format. Under gunicorn every worker keeps its own
+    metrics, so a scrape of /metrics reports the worker that served it.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self.requests = self.add(CounterMetric(
+            'dashboard_requests_total', 'Requests served, by route, method and status.', ('route', 'method', 'status')))
+        self.latency = self.add(HistogramMetric(
+            'dashboard_request_duration_seconds', 'Time to build the response, by route and method.',
+            ('route', 'method')))
+        self.payload = self.add(HistogramMetric(
+            'dashboard_response_size_bytes', 'Response body size (after compression), by route.', ('route',),
+            buckets=SIZE_BUCKETS))
+        self.cache = self.add(CounterMetric(
+            'dashboard_cache_requests_total', 'Response cache lookups of cached routes, by route and result.',
+            ('route', 'result')))
+        self.errors = self.add(CounterMetric(
+            'dashboard_errors_total', 'Errors caught by the endpoints, by route and exception type.',
+            ('route', 'exception')))
+        self.analysis = self.add(HistogramMetric(
+            'dashboard_analysis_duration_seconds', 'Time spent in the price analysis functions.', ('function',)))
+        self.add(GaugeMetric('dashboard_cache_hit_ratio', 'Share of response cache lookups that were hits.',
+                             self.cache_hit_ratio))
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, documentation, function, labels=()):
+        return self.add(GaugeMetric(name, documentation, function, labels))
+
+    def observe_request(self, route, method, status, seconds, size=None):
+        self.requests.inc(route, method, str(status))
+        self.latency.observe(seconds, route, method)
+        if size is not None:
+            self.payload.observe(size, route)
+
+    def cache_result(self, route, hit):
+        self.cache.inc(route, 'hit' if hit else 'miss')
+
+    def cache_hit_ratio(self):
+        with self.cache._lock:
+            hits = sum(value for (_, result), value in self.cache._values.items() if result == 'hit')
+            total = sum(self.cache._values.values())
+        return hits / total if total else None
+
+    def count_error(self, route, exception):
+        self.errors.inc(route, type(exception).__name__)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def timed(function):
+    """Records the duration of every call of `function` in `dashboard_analysis_duration_seconds`."""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.analysis.observe(time.perf_counter() - started, function.__name__)
+    return wrapper
+
+
+class SamplingProfiler:
+    """Statistical profiler for slow requests.
+
+    While a request runs, a background thread samples its call stack every `interval`
+    seconds. When the request took at least `slow_seconds`, its sampled stacks are kept
+    among the `keep` slowest requests and, with an `output_dir`, written there as a
+    collapsed-stack file (one 'frame;frame;... count' line per stack, the input format
+    of flame graph tools). Faster requests are discarded.
+
+    Sampling reads `sys._current_frames()`, so the cost is on the sampler thread and
+    grows with the number of requests in flight, not with their work.
+    """
+
+    def __init__(self, slow_seconds=0.5, interval=0.005, keep=20, output_dir=None):
+        self.slow_seconds = slow_seconds
+        self.interval = interval
+        self.keep = keep
+        self.output_dir = output_dir
+        self._active = {}
+        self._slowest = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """A profiler configured by PROFILE_SLOW_REQUESTS_MS (unset: profiling off),
+        PROFILE_INTERVAL_MS, PROFILE_KEEP and PROFILE_DIR; None when disabled."""
+        slow_ms = environ.get('PROFILE_SLOW_REQUESTS_MS')
+        if not slow_ms:
+            return None
+        return cls(slow_seconds=float(slow_ms) / 1000, interval=float(environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+                   keep=int(environ.get('PROFILE_KEEP', 20)), output_dir=environ.get('PROFILE_DIR') or None)
+
+    def _after_fork(self):
+        # The sampler thread does not survive a fork, and the lock may have been held by
+        # another thread at that moment (e.g. a preloaded app warming its cache), so a
+        # forked worker starts over with fresh primitives and its own sampler
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._active = {}
+
+    def _ensure_sampler(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_loop, name='request-sampler', daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                active = list(self._active.items())
+                if not active:
+                    self._wake.clear()
+            if not active:
+                # Idle until the next request starts
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            samples = [(thread_id, stacks, self._collapse(frames[thread_id]))
+                       for thread_id, stacks in active if thread_id in frames]
+            # Credited under the lock and only while the request is still running, so a
+            # finished request's stacks are never changed while they are written out
+            with self._lock:
+                for thread_id, stacks, stack in samples:
+                    if self._active.get(thread_id) is stacks:
+                        stacks[stack] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def start_request(self):
+        with self._lock:
+            self._ensure_sampler()
+            self._active[threading.get_ident()] = Counter()
+            self._wake.set()
+
+    def finish_request(self, description, seconds):
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), None)
+        if stacks is None or seconds < self.slow_seconds:
+            return
+        record = {
+            'request': description,
+            'seconds': round(seconds, 4),
+            'samples': sum(stacks.values()),
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'stacks': [{'stack': stack, 'samples': count} for stack, count in stacks.most_common(20)],
+        }
+        with self._lock:
+            self._sequence += 1
+            entry = (seconds, self._sequence, record)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+        if self.output_dir:
+            self._write(record, stacks)
+
+    def _write(self, record, stacks):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', record['request']).strip('_')[:80]
+        path = os.path.join(self.output_dir, f"{record['finished'].replace(':', '')}-{slug}-"
+                                             f"{int(record['seconds'] * 1000)}ms-{os.getpid()}.folded")
+        try:
+            with open(path, 'w') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in stacks.most_common())
+        except OSError as e:
+            logger.warning("Could not write request profile %s: %s", path, e)
+
+    def slowest(self):
+        """The kept slow requests, slowest first."""
+        with self._lock:
+            return [record for _, _, record in sorted(self._slowest, reverse=True)]
@@ -1,23 +1,50 @@
 # price_analysis.py
 
+import os
+import sys
 import pandas as pd
 import numpy as np
-from datetime import timedelta
-from scipy import stats
+
+# Share the analysis components in scripts/ with the backend
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts')))
+from window_index import DateWindowIndex
+from event_impact import EventImpactEngine
+from histogram import HistogramService
+from rolling_stats import MAX_WINDOWS, ROLLING_STATS, RollingStats
+from price_pyramid import PricePyramid
+from models.downsample import downsample_series
+from models.metrics import timed
+from price_store import (
+    is_store_fresh, normalize_price_frame, read_price_store, store_path_for, write_price_store
+)
 
 data_path = '../../data/data.csv'
 
-def load_price_data():
-    data = pd.read_csv(data_path, parse_dates=['Date'])
+@timed
+def load_price_data(path=data_path):
+    # Prefer the memory-mapped columnar store; it is (re)built from the CSV when stale
+    store_path = path if path.endswith('.feather') else store_path_for(path)
+    if is_store_fresh(store_path, path):
+        try:
+            return read_price_store(store_path)
+        except ImportError:
+            pass
+    data = pd.read_csv(path)
     data['Date'] = pd.to_datetime(data['Date'], format='mixed')
-    data.set_index('Date', inplace=True)
+    data = normalize_price_frame(data)
+    try:
+        write_price_store(data, store_path)
+    except (ImportError, OSError):
+        pass
     return data
 
-def get_prices_around_event(event_date, data, days_before=30, days_after=30):
-    before_date = event_date - timedelta(days=days_before)
-    after_date = event_date + timedelta(days=days_after)
-    return data[(data.index >= before_date) & (data.index <= after_date)]
+@timed
+def get_prices_around_event(event_date, data, days_before=30, days_after=30, service=None):
+    # Binary-search window; pass a long-lived DateWindowIndex to avoid re-checking the sort on every call
+    service = service if service is not None else DateWindowIndex(data)
+    return service.window(event_date, days_before=days_before, days_after=days_after)
 
+@timed
 def calculate_analysis_metrics(data):
     volatility = np.std(data['Price']) / np.mean(data['Price'])
     avg_price_change = data['Price'].diff().abs().mean()
@@ -39,76 +66,72 @@ def calculate_analysis_metrics(data):
         }
     }
 
+@timed
+def event_impacts_frame(events, price_data, horizons=(30, 90, 180), days_before=180, days_after=180,
+                       policy='nearest', tolerance_days=7):
+    # Score all events in one vectorized pass; events maps name -> date.
+    # Horizon dates on weekends/holidays resolve to a trading day according to `policy`
+    engine = EventImpactEngine(price_data)
+    impacts = engine.compute(list(events.values()), names=list(events.keys()), horizons=horizons,
+                             days_before=days_before, days_after=days_after,
+                             policy=policy, tolerance_days=tolerance_days)
+    impacts['Date'] = list(events.values())
+    return impacts.drop(columns=['N Before', 'N After'])
+
+def calculate_event_impacts(events, price_data, **kwargs):
+    impacts = event_impacts_frame(events, price_data, **kwargs)
+    # NaN is not valid JSON; missing values are reported as None
+    return impacts.astype(object).where(impacts.notna(), None).to_dict(orient='records')
+
 def calculate_event_impact(event, date, price_data):
-    event_date = pd.to_datetime(date)
-    prices_around_event = get_prices_around_event(event_date, price_data, days_before=180, days_after=180)
-    change_1m, change_3m, change_6m = None, None, None
+    return calculate_event_impacts({event: date}, price_data)[0]
+
+@timed
+def calculate_price_trends(data, start=None, end=None, max_points=None, method='lttb'):
+    # Slice the requested range, then reduce it to at most max_points for the chart
+    prices = data['Price'].loc[start:end].dropna()
+    prices = downsample_series(prices, max_points, method=method)
+    # Plain arrays; models.serialization encodes them column by column
+    return {
+        'prices': prices.to_numpy(),
+        'dates': prices.index.values
+    }
 
-    try:
-        price_before_1m = price_data.loc[event_date - timedelta(days=30), 'Price']
-        price_after_1m = price_data.loc[event_date + timedelta(days=30), 'Price']
-        change_1m = ((price_after_1m - price_before_1m) / price_before_1m) * 100
-    except KeyError:
-        change_1m = None
 
-    try:
-        price_before_3m = price_data.loc[event_date - timedelta(days=90), 'Price']
-        price_after_3m = price_data.loc[event_date + timedelta(days=90), 'Price']
-        change_3m = ((price_after_3m - price_before_3m) / price_before_3m) * 100
-    except KeyError:
-        change_3m = None
+@timed
+def price_distribution_frame(data, bin_size=5, edges=None, start=None, end=None, service=None):
+    # Vectorized, read-only histogram; pass a long-lived HistogramService to reuse its cache
+    service = service if service is not None else HistogramService(data)
+    return service.distribution(bin_size=bin_size, edges=edges, start=start, end=end)
 
-    try:
-        price_before_6m = price_data.loc[event_date - timedelta(days=180), 'Price']
-        price_after_6m = price_data.loc[event_date + timedelta(days=180), 'Price']
-        change_6m = ((price_after_6m - price_before_6m) / price_before_6m) * 100
-    except KeyError:
-        change_6m = None
-
-    cum_return_before = prices_around_event.loc[:event_date]['Price'].pct_change().add(1).cumprod().iloc[-1] - 1
-    cum_return_after = prices_around_event.loc[event_date:]['Price'].pct_change().add(1).cumprod().iloc[-1] - 1
-    before_prices = prices_around_event.loc[:event_date]['Price']
-    after_prices = prices_around_event.loc[event_date:]['Price']
-    t_stat, p_val = stats.ttest_ind(before_prices, after_prices, nan_policy='omit')
 
-    return {
-        "Event": event,
-        "Date": date,
-        "Change_1M": change_1m,
-        "Change_3M": change_3m,
-        "Change_6M": change_6m,
-        "Cumulative Return Before": float(cum_return_before),
-        "Cumulative Return After": float(cum_return_after),
-        "T-Statistic": float(t_stat),
-        "P-Value": float(p_val)
-    }
+def calculate_price_distribution(data, bin_size=5):
+    return price_distribution_frame(data, bin_size).to_dict(orient='records')  # Return as a list of dictionaries
 
-def calculate_price_trends(data):
-    return {
-        'prices': data['Price'].tolist(),
-        'dates': data.index.strftime('%Y').tolist()  # Format dates as year strings
-    }
 
+@timed
+def yearly_average_frame(data, service=None):
+    # Read from the yearly level of a pre-aggregated pyramid; years are labelled by their last day
+    service = service if service is not None else PricePyramid(data)
+    yearly_avg = service.query('Y', label='end')['Mean']
+    return yearly_avg.reset_index().rename(columns={'Date': 'Year', 'Mean': 'Average_Price'})
 
-def calculate_price_distribution(data, bin_size=5):
-    # Calculate the minimum and maximum prices to determine the range
-    min_price = data['Price'].min()
-    max_price = data['Price'].max()
 
-    # Create bins from min to max price
-    bins = list(range(int(min_price), int(max_price) + bin_size, bin_size))
-    
-    # Use pd.cut to create a Series that indicates which bin each price belongs to
-    data['PriceRange'] = pd.cut(data['Price'], bins=bins, right=False)
+@timed
+def aggregate_frame(data, freq='M', start=None, end=None, service=None):
+    # OHLC, mean, std, count and sum per bucket; pass a long-lived PricePyramid to reuse its levels
+    service = service if service is not None else PricePyramid(data)
+    return service.query(freq, start=start, end=end).reset_index()
 
-    # Group by the PriceRange and count the occurrences
-    distribution = data.groupby('PriceRange').size().reset_index(name='Frequency')
 
-    # Format the distribution for visualization
-    distribution['PriceRange'] = distribution['PriceRange'].astype(str)  # Convert bins to string for better visualization
-    return distribution.to_dict(orient='records')  # Return as a list of dictionaries
+@timed
+def rolling_stats_frame(data, windows, stats=None, start=None, end=None, service=None):
+    # Many windows from one set of prefix sums; pass a long-lived RollingStats to reuse them
+    service = service if service is not None else RollingStats(data)
+    frame = service.compute(windows, stats=stats or ROLLING_STATS,
+                            start=start, end=end)
+    return frame.reset_index()
 
 
 def calculate_yearly_average_price(data):
-    yearly_avg = data['Price'].resample('YE').mean()
-    return yearly_avg.reset_index().rename(columns={'Date': 'Year', 'Price': 'Average_Price'}).to_dict(orient='records')
+    return yearly_average_frame(data).to_dict(orient='records')
@@ -0,0 +1,183 @@
+# serialization.py
+
+import gzip
+import io
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional binary format
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional compression
+    brotli = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+LAYOUTS = ('records', 'columnar')
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+
+class Table:
+    """A tabular payload, serialized as a list of row objects ('records' layout) or as
+    one array per column ('columnar' layout, dates as epoch milliseconds)."""
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def columns(self, dates):
+        return {name: column_values(self.frame[name].to_numpy(), dates) for name in self.frame.columns}
+
+    def encode(self, layout, dates):
+        columns = self.columns(dates)
+        if layout == 'columnar':
+            return {'columns': list(columns), 'length': len(self.frame), 'data': columns}
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_mimetypes():
+    """Response formats that can be produced with the installed packages, JSON first."""
+    mimetypes = [JSON_MIMETYPE]
+    if msgpack is not None:
+        mimetypes.append(MSGPACK_MIMETYPE)
+    if _has_pyarrow():
+        mimetypes.append(ARROW_MIMETYPE)
+    return mimetypes
+
+
+def available_encodings():
+    """Content encodings that can be produced, in order of preference."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def column_values(values, dates='iso'):
+    """
+    Converts a numpy column to a plain list in one vectorized step.
+
+    Datetimes become ISO 8601 strings or epoch milliseconds; missing numbers become None.
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        missing = np.isnat(values)
+        if dates == 'epoch_ms':
+            converted = values.astype('datetime64[ms]').astype(np.int64).astype(object)
+        else:
+            converted = np.datetime_as_string(values, unit='s').astype(object)
+        converted[missing] = None
+        return converted.tolist()
+    if values.dtype.kind == 'f':
+        missing = np.isnan(values)
+        if missing.any():
+            values = values.astype(object)
+            values[missing] = None
+        return values.tolist()
+    if values.dtype.kind in 'iub':
+        return values.tolist()
+    return [None if pd.isna(value) else str(value) for value in values]
+
+
+def _default(layout, dates):
+    """Fallback encoder hook for the values the JSON/MessagePack encoders do not know."""
+    def default(obj):
+        if isinstance(obj, Table):
+            return obj.encode(layout, dates)
+        if isinstance(obj, (pd.Series, pd.Index, np.ndarray)):
+            return column_values(np.asarray(obj), dates)
+        if isinstance(obj, (pd.Timestamp, np.datetime64)):
+            return column_values(np.array([obj], dtype='datetime64[ns]'), dates)[0]
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+    return default
+
+
+def _arrow_stream(frame):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def serialize(payload, mimetype=JSON_MIMETYPE, layout='records'):
+    """
+    Encodes an endpoint payload.
+
+    Parameters:
+    - payload: JSON-like data which may contain `Table`s, numpy arrays, Series and timestamps.
+    - mimetype (str): One of `available_mimetypes()`.
+    - layout (str): 'records' or 'columnar' for the `Table`s in the payload. The columnar
+      layout (and MessagePack) sends dates as epoch milliseconds, records as ISO strings.
+
+    Returns:
+    - bytes or None: The body, or None if the payload cannot be sent in that format
+      (Arrow streams carry a single table).
+    """
+    dates = 'epoch_ms' if layout == 'columnar' or mimetype == MSGPACK_MIMETYPE else 'iso'
+    default = _default(layout, dates)
+    if mimetype == ARROW_MIMETYPE:
+        return _arrow_stream(payload.frame) if isinstance(payload, Table) else None
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(payload, default=default)
+    return _dumps_json(payload, default)
+
+
+def _finite(obj):
+    """Replaces NaN and infinities by None, which orjson writes as null but json as NaN."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _dumps_json(payload, default):
+    if orjson is not None:
+        return orjson.dumps(payload, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_finite(payload), default=lambda obj: _finite(default(obj)), allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def serialize_ndjson(table):
+    """Encodes a `Table` as newline-delimited JSON, one row object per line."""
+    default = _default('records', 'iso')
+    return b''.join(_dumps_json(row, default) + b'\n' for row in table.encode('records', 'iso'))
+
+
+def compress(body, encoding):
+    """Compresses a body with 'br' or 'gzip'; returns `(body, encoding)` with encoding None
+    when the body was left as is."""
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), encoding
+    return gzip.compress(body, compresslevel=6, mtime=0), encoding
@@ -0,0 +1,11 @@
+# wsgi.py
+
+# Production entry point:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# With preload_app the import below runs once in the gunicorn master: the price data
+# is loaded (memory-mapped from the columnar store) before the workers are forked.
+
+from app import app
+
+application = app
@@ -23,13 +23,14 @@ const Dashboard = () => {
     const fetchPrices = async () => {
         setLoading(true);
         try {
-            const priceResponse = await axios.get('http://localhost:5000/api/prices');
+            // Downsampled server-side to roughly what the chart can display
+            const priceResponse = await axios.get('http://localhost:5000/api/prices', { params: { max_points: 1000 } });
             console.log("Price trend response data:", priceResponse.data);
     
             // Assuming response data structure is { prices: [...], dates: [...] }
             const pricesData = priceResponse.data;
             const formattedData = pricesData.dates.map((date, index) => ({
-                dates: date,         // x-axis
+                dates: date.slice(0, 4), // x-axis (year of the ISO timestamp)
                 prices: pricesData.prices[index] // y-axis
             }));
             
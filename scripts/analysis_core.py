@@ -0,0 +1,96 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from bayes_changepoint import marginal_change_point_posterior
+from changepoint import detect_change_points
+from cusum import cusum_alarms
+from event_impact import EventImpactEngine
+from window_index import DateWindowIndex
+
+
+class PriceAnalysisCore:
+    """
+    The numerical analyses of one price series, without plotting or probabilistic
+    programming libraries.
+
+    Importing this module loads numpy, pandas and scipy.special only, so batch
+    workers and command-line jobs start quickly. `EventChangeAnalyzer` builds its
+    plots and the PyMC model on top of this class.
+
+    Parameters:
+    - price_data (pd.DataFrame): DataFrame with 'Date' as index and 'Price' column.
+    - logger (logging.Logger): Logger instance for logging messages.
+    """
+
+    def __init__(self, price_data, logger=None):
+        self.price_data = price_data
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self.mean_price = self.price_data['Price'].mean()
+        self.window_index = DateWindowIndex(self.price_data)
+        self.impact_engine = EventImpactEngine(self.price_data)
+
+    def prices_around_event(self, event_date, days_before=30, days_after=30) -> pd.DataFrame:
+        """Prices from `days_before` calendar days before to `days_after` days after an event."""
+        return self.window_index.window(event_date, days_before=days_before, days_after=days_after)
+
+    def percentage_change(self, event_date, days):
+        """Percentage change between the prices `days` days before and after an event, or None."""
+        change = self.impact_engine.horizon_changes(event_date, days)[0]
+        return None if np.isnan(change) else change
+
+    def compute_event_impacts(self, key_events, horizons=(30, 90, 180), days_before=180, days_after=180,
+                              equal_var=True):
+        """
+        Computes percentage changes, cumulative returns and t-tests for many events in one vectorized pass.
+
+        Parameters:
+        - key_events (dict): Mapping of event name to event date.
+        - horizons (iterable of int): Calendar-day horizons for the percentage changes.
+        - days_before, days_after (int): Window lengths in calendar days around each event.
+        - equal_var (bool): Student's t-test when True, Welch's t-test otherwise.
+
+        Returns:
+        - pd.DataFrame: One row per event, see `EventImpactEngine.compute`.
+        """
+        return self.impact_engine.compute(list(key_events.values()), names=list(key_events.keys()),
+                                          horizons=horizons, days_before=days_before, days_after=days_after,
+                                          equal_var=equal_var)
+
+    def cusum(self) -> pd.Series:
+        """CUSUM of the deviations from the mean price."""
+        return (self.price_data['Price'] - self.mean_price).cumsum()
+
+    def detect_cusum_alarms(self, drift=0.5, threshold=5.0, warmup=30):
+        """
+        Runs the online two-sided CUSUM detector over the price history.
+
+        Unlike `cusum`, the reference mean only uses prices seen so far, so the alarms are
+        the ones a streaming feed would have raised.
+
+        Parameters:
+        - drift (float): Allowance in standard deviations.
+        - threshold (float): Alarm threshold in standard deviations.
+        - warmup (int): Prices used to estimate the reference after the start and after each alarm.
+
+        Returns:
+        - pd.DataFrame: One row per alarm, indexed by alarm date.
+        """
+        alarms_df = cusum_alarms(self.price_data['Price'], drift=drift, threshold=threshold, warmup=warmup)
+        self.logger.info("CUSUM detector raised %d alarms.", len(alarms_df))
+        return alarms_df
+
+    def change_points(self, n_bkps=5, penalty=None, cost='normal', min_size=30) -> dict:
+        """
+        Exact change point detection, see `changepoint.detect_change_points`.
+
+        With a `penalty` PELT chooses the number of change points, otherwise the best
+        segmentation with exactly `n_bkps` change points is found.
+        """
+        return detect_change_points(self.price_data['Price'], n_bkps=n_bkps if penalty is None else None,
+                                    penalty=penalty, cost=cost, min_size=min_size)
+
+    def marginal_change_points(self, n_changepoints=1, resample=None, min_size=2) -> dict:
+        """Exact Bayesian posterior over the change point locations, see `bayes_changepoint.py`."""
+        return marginal_change_point_posterior(self.price_data['Price'], n_changepoints=n_changepoints,
+                                               resample=resample, min_size=min_size)
@@ -0,0 +1,335 @@
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+import pandas as pd
+from bayes_changepoint import marginal_change_point_posterior
+from changepoint import detect_change_points
+from cusum import cusum_alarms
+from event_impact import EventImpactEngine
+
+
+def event_impacts(series: pd.Series, key_events: dict, **kwargs) -> pd.DataFrame:
+    """Event-impact statistics of `key_events` (name -> date), see `EventImpactEngine.compute`."""
+    return EventImpactEngine(series).compute(list(key_events.values()), names=list(key_events.keys()), **kwargs)
+
+
+# Analyses available by name; any picklable function f(series, **kwargs) can be used as well
+ANALYSES = {
+    'change_points': detect_change_points,
+    'bayesian_change_points': marginal_change_point_posterior,
+    'cusum_alarms': cusum_alarms,
+    'event_impacts': event_impacts,
+}
+
+
+class SharedSeries:
+    """
+    A date-indexed float series published in a shared memory block.
+
+    The block holds the dates (int64 nanoseconds) followed by the values (float64).
+    Instances are small and picklable; worker processes `attach` to the block and
+    read the series without copying it.
+
+    Parameters:
+    - series (pd.Series): Series indexed by date.
+    """
+
+    def __init__(self, series: pd.Series):
+        self.name = series.name
+        self.length = len(series)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(16 * self.length, 1))
+        self.shm_name = self._shm.name
+        dates, values = self._arrays(self._shm)
+        dates[:] = series.index.values.astype('datetime64[ns]').view(np.int64)
+        values[:] = series.to_numpy(dtype=np.float64)
+
+    def __getstate__(self):
+        return {'name': self.name, 'length': self.length, 'shm_name': self.shm_name}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = None
+
+    def _arrays(self, shm):
+        dates = np.ndarray(self.length, dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray(self.length, dtype=np.float64, buffer=shm.buf, offset=8 * self.length)
+        return dates, values
+
+    def attach(self):
+        """
+        Maps the block into this process.
+
+        Returns:
+        - tuple[SharedMemory, pd.Series]: The block, to be closed when done, and a
+          read-only series backed by it.
+        """
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        dates, values = self._arrays(shm)
+        dates.flags.writeable = False
+        values.flags.writeable = False
+        index = pd.DatetimeIndex(dates.view('datetime64[ns]'), name='Date')
+        return shm, pd.Series(values, index=index, name=self.name, copy=False)
+
+    def unlink(self):
+        """Releases the block; only the creating process should call this."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _worker_loop(conn):
+    """Worker process body: runs (shared, analysis, kwargs) tasks until it receives None.
+
+    Each result is sent back as ('ok', result) or ('error', traceback). A series' block
+    is mapped on its first task and stays mapped until the worker exits."""
+    attached = {}
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        shared, analysis, kwargs = task
+        try:
+            if shared.shm_name not in attached:
+                attached[shared.shm_name] = shared.attach()
+            series = attached[shared.shm_name][1]
+            function = ANALYSES[analysis] if isinstance(analysis, str) else analysis
+            # The result is pickled (copied) here, so it may still reference the shared block
+            conn.send(('ok', function(series, **kwargs)))
+        except Exception:
+            conn.send(('error', traceback.format_exc()))
+    conn.close()
+
+
+class _Worker:
+    """A long-lived worker process and the parent's end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self, terminate=False):
+        """Asks the worker to exit, or terminates it (e.g. in the middle of a task)."""
+        if not terminate:
+            try:
+                self.conn.send(None)
+            except OSError:
+                terminate = True
+        self.conn.close()
+        if terminate and self.process.is_alive():
+            self.process.terminate()
+        self.process.join(None if terminate else 5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+
+class AnalysisRunner:
+    """
+    Runs analyses over many price series in parallel worker processes.
+
+    Each series is published once in shared memory, so workers map it instead of
+    receiving a pickled copy. Tasks (one analysis of one series each) run in up to
+    `max_workers` long-lived worker processes, which are reused across tasks and calls
+    to `run` and map each series only once. A task can be cancelled, and one that
+    exceeds its timeout is terminated together with its worker, which is replaced;
+    neither affects the other tasks.
+
+    Example:
+        with AnalysisRunner({'Brent': brent, 'WTI': wti, 'Brent weekly': brent.resample('W').mean()}) as runner:
+            for name in runner.series:
+                runner.submit(name, 'change_points', penalty='bic')
+                runner.submit(name, 'bayesian_change_points', n_changepoints=2, resample='W')
+            results = runner.run()
+
+    Parameters:
+    - series (dict[str, pd.Series or pd.DataFrame]): Series by name; a DataFrame must have a 'Price' column.
+    - max_workers (int, optional): Maximum concurrent worker processes; defaults to the CPU count.
+    - timeout (float, optional): Default per-task timeout in seconds.
+    - start_method (str, optional): multiprocessing start method ('fork', 'spawn', 'forkserver').
+    - logger (logging.Logger): Logger instance for logging messages.
+    """
+
+    def __init__(self, series: dict, max_workers: int = None, timeout: float = None,
+                 start_method: str = None, logger: logging.Logger = None):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self._context = multiprocessing.get_context(start_method)
+        self._ids = itertools.count()
+        self._tasks = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._idle = []
+        self.series = {}
+        try:
+            for name, data in series.items():
+                data = data['Price'] if isinstance(data, pd.DataFrame) else data
+                self.series[name] = SharedSeries(data.dropna().rename(name))
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory blocks."""
+        while self._idle:
+            self._idle.pop().stop()
+        for shared in self.series.values():
+            shared.unlink()
+
+    def submit(self, series: str, analysis, timeout: float = None, **kwargs) -> int:
+        """
+        Queues an analysis of one series.
+
+        Parameters:
+        - series (str): Name of the series.
+        - analysis (str or callable): A name from `ANALYSES`, or a picklable function
+          called as f(series, **kwargs).
+        - timeout (float, optional): Seconds after which the task is terminated; defaults to the runner's.
+        - **kwargs: Arguments for the analysis.
+
+        Returns:
+        - int: The task id.
+        """
+        if series not in self.series:
+            raise KeyError(f"Unknown series: {series!r}")
+        if isinstance(analysis, str) and analysis not in ANALYSES:
+            raise KeyError(f"Unknown analysis: {analysis!r}; available: {', '.join(ANALYSES)}")
+        task_id = next(self._ids)
+        self._tasks[task_id] = {
+            'series': series,
+            'analysis': analysis,
+            'kwargs': kwargs,
+            'timeout': self.timeout if timeout is None else timeout,
+        }
+        return task_id
+
+    def cancel(self, task_id: int = None):
+        """Cancels a queued or running task, or every task when `task_id` is None.
+
+        Safe to call from another thread while `run` is in progress."""
+        with self._lock:
+            self._cancelled.update(self._tasks if task_id is None else [task_id])
+
+    def _result(self, task_id, status, result=None, error=None, elapsed=None):
+        task = self._tasks[task_id]
+        analysis = task['analysis']
+        return {
+            'task_id': task_id,
+            'series': task['series'],
+            'analysis': analysis if isinstance(analysis, str) else getattr(analysis, '__name__', repr(analysis)),
+            'kwargs': task['kwargs'],
+            'status': status,
+            'result': result,
+            'error': error,
+            'elapsed': elapsed,
+        }
+
+    def _start(self, task_id):
+        task = self._tasks[task_id]
+        worker = None
+        while self._idle and worker is None:
+            worker = self._idle.pop()
+            if not worker.process.is_alive():
+                worker.stop(terminate=True)
+                worker = None
+        worker = worker or _Worker(self._context)
+        try:
+            worker.conn.send((self.series[task['series']], task['analysis'], task['kwargs']))
+        except OSError:
+            pass  # The worker died; run() reads EOF from it and reports the task as an error
+        started = time.monotonic()
+        deadline = started + task['timeout'] if task['timeout'] is not None else None
+        return {'worker': worker, 'started': started, 'deadline': deadline}
+
+    @staticmethod
+    def _stop(job):
+        # A worker cannot be interrupted in the middle of a task, so it is terminated and replaced
+        job['worker'].stop(terminate=True)
+
+    def run(self, poll_interval: float = 0.1) -> list:
+        """
+        Runs every submitted task and waits for all of them.
+
+        Returns:
+        - list[dict]: One result per task, in submission order, with 'task_id', 'series',
+          'analysis', 'kwargs', 'status' ('ok', 'error', 'timeout' or 'cancelled'),
+          'result', 'error' (the worker traceback) and 'elapsed' (seconds).
+        """
+        pending = deque(sorted(self._tasks))
+        running = {}
+        results = {}
+        try:
+            while pending or running:
+                with self._lock:
+                    cancelled = set(self._cancelled)
+
+                while pending and len(running) < self.max_workers:
+                    task_id = pending.popleft()
+                    if task_id in cancelled:
+                        results[task_id] = self._result(task_id, 'cancelled')
+                    else:
+                        running[task_id] = self._start(task_id)
+                if not running:
+                    continue
+
+                by_conn = {job['worker'].conn: task_id for task_id, job in running.items()}
+                for conn in connection.wait(list(by_conn), timeout=poll_interval):
+                    task_id = by_conn[conn]
+                    job = running.pop(task_id)
+                    elapsed = time.monotonic() - job['started']
+                    try:
+                        status, payload = conn.recv()
+                        self._idle.append(job['worker'])
+                    except (EOFError, OSError):
+                        job['worker'].process.join(1)
+                        status, payload = 'error', f"Worker exited with code {job['worker'].process.exitcode}"
+                        self._stop(job)
+                    if status == 'ok':
+                        results[task_id] = self._result(task_id, 'ok', result=payload, elapsed=elapsed)
+                    else:
+                        results[task_id] = self._result(task_id, 'error', error=payload, elapsed=elapsed)
+                        self.logger.error("Task %d (%s) failed:\n%s", task_id,
+                                          self._tasks[task_id]['series'], payload)
+
+                now = time.monotonic()
+                for task_id, job in list(running.items()):
+                    if task_id in cancelled:
+                        status = 'cancelled'
+                    elif job['deadline'] is not None and now > job['deadline']:
+                        status = 'timeout'
+                    else:
+                        continue
+                    self._stop(running.pop(task_id))
+                    results[task_id] = self._result(task_id, status, elapsed=now - job['started'])
+                    self.logger.warning("Task %d (%s) %s after %.1fs.", task_id,
+                                        self._tasks[task_id]['series'], status, now - job['started'])
+        finally:
+            # On an interrupt (e.g. KeyboardInterrupt) no worker is left behind
+            for job in running.values():
+                self._stop(job)
+
+        self.logger.info("Ran %d analysis tasks: %d ok.", len(results),
+                         sum(r['status'] == 'ok' for r in results.values()))
+        self._tasks.clear()
+        with self._lock:
+            self._cancelled.clear()
+        return [results[task_id] for task_id in sorted(results)]
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln, logsumexp
+
+
+class NormalGammaSegments:
+    """
+    Closed-form log marginal likelihood of Normal segments with unknown mean and variance.
+
+    Each segment is i.i.d. Normal(mu, sigma^2) under the conjugate prior
+    mu | sigma^2 ~ Normal(m0, sigma^2 / kappa0), sigma^2 ~ InvGamma(alpha0, beta0).
+    Integrating out mu and sigma^2 leaves a function of the segment's count, sum and
+    sum of squares, so with prefix sums every segment is scored in O(1).
+
+    Parameters:
+    - signal (array-like): The series to segment.
+    - m0 (float, optional): Prior mean of the segment means; defaults to the signal mean.
+    - kappa0 (float): Prior strength of m0, in pseudo-observations.
+    - alpha0 (float): Shape of the inverse-gamma prior on the variance.
+    - beta0 (float, optional): Scale of that prior; defaults to alpha0 times the signal variance.
+    """
+
+    def __init__(self, signal, m0=None, kappa0=0.01, alpha0=1.0, beta0=None):
+        signal = np.asarray(signal, dtype=np.float64)
+        shift = signal.mean()
+        centered = signal - shift
+        self.m0 = (shift if m0 is None else m0) - shift
+        self.kappa0 = kappa0
+        self.alpha0 = alpha0
+        self.beta0 = alpha0 * signal.var() if beta0 is None else beta0
+        self._sum = np.concatenate(([0.0], np.cumsum(centered)))
+        self._sumsq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    def log_marginal(self, start, end):
+        """Log marginal likelihood of segments [start, end); `start` and `end` broadcast."""
+        n = np.asarray(end, dtype=np.float64) - start
+        s1 = self._sum[end] - self._sum[start]
+        s2 = self._sumsq[end] - self._sumsq[start]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, s1 / n, 0.0)
+            ss = np.maximum(s2 - s1 * mean, 0.0)
+        kappa_n = self.kappa0 + n
+        alpha_n = self.alpha0 + n / 2
+        beta_n = self.beta0 + 0.5 * ss + self.kappa0 * n * (mean - self.m0) ** 2 / (2 * kappa_n)
+        return (gammaln(alpha_n) - gammaln(self.alpha0)
+                + self.alpha0 * np.log(self.beta0) - alpha_n * np.log(beta_n)
+                + 0.5 * (np.log(self.kappa0) - np.log(kappa_n))
+                - 0.5 * n * np.log(2 * np.pi))
+
+
+def _forward(model, n, n_segments, min_size):
+    """forward[k, t]: log-sum over placements of k + 1 segments covering [0, t)."""
+    forward = np.full((n_segments, n + 1), -np.inf)
+    ends = np.arange(min_size, n + 1)
+    forward[0, ends] = model.log_marginal(0, ends)
+    for k in range(1, n_segments):
+        for t in range((k + 1) * min_size, n + 1):
+            starts = np.arange(k * min_size, t - min_size + 1)
+            forward[k, t] = logsumexp(forward[k - 1, starts] + model.log_marginal(starts, t))
+    return forward
+
+
+def _backward(model, n, n_segments, min_size):
+    """backward[k, s]: log-sum over placements of k + 1 segments covering [s, n)."""
+    backward = np.full((n_segments, n + 1), -np.inf)
+    starts = np.arange(0, n - min_size + 1)
+    backward[0, starts] = model.log_marginal(starts, n)
+    for k in range(1, n_segments):
+        for s in range(0, n - (k + 1) * min_size + 1):
+            ends = np.arange(s + min_size, n - k * min_size + 1)
+            backward[k, s] = logsumexp(model.log_marginal(s, ends) + backward[k - 1, ends])
+    return backward
+
+
+def marginal_change_point_posterior(series: pd.Series, n_changepoints=1, resample=None, min_size=2,
+                                    n_samples=1000, random_seed=42, **prior):
+    """
+    Exact Bayesian change-point posterior with the segment parameters integrated out.
+
+    Change-point configurations have a uniform prior. The segment means and variances
+    are marginalized analytically (see `NormalGammaSegments`), so the posterior over
+    change locations is computed exactly by summing over all placements with
+    log-sum-exp recursions instead of sampling a discrete switchpoint. One change point
+    costs O(N); K change points cost O(K N^2).
+
+    Parameters:
+    - series (pd.Series): Series indexed by date.
+    - n_changepoints (int): Number of change points K.
+    - resample (str, optional): Pandas frequency (e.g. 'W') to average the series to first.
+    - min_size (int): Minimum number of observations per segment.
+    - n_samples (int): Posterior draws of the change-point configuration.
+    - random_seed (int): Seed for the posterior draws.
+    - **prior: Prior hyperparameters passed to `NormalGammaSegments`.
+
+    Returns:
+    - dict: 'posterior' (pd.Series, probability that a new segment starts at each date),
+      'samples' (pd.DataFrame of sampled change dates, one column per change point),
+      'change_points' (posterior median date of each change point) and 'log_evidence'
+      (log of the summed marginal likelihoods, i.e. up to the constant of the uniform prior).
+    """
+    if resample is not None:
+        series = series.resample(resample).mean().dropna()
+    values = series.to_numpy(dtype=np.float64)
+    n = len(values)
+    n_segments = n_changepoints + 1
+    if n < n_segments * min_size:
+        raise ValueError(f"{n} observations cannot hold {n_segments} segments of at least {min_size}.")
+
+    model = NormalGammaSegments(values, **prior)
+    rng = np.random.default_rng(random_seed)
+    probability = np.zeros(n)
+
+    if n_changepoints == 1:
+        taus = np.arange(min_size, n - min_size + 1)
+        log_post = model.log_marginal(0, taus) + model.log_marginal(taus, n)
+        log_evidence = logsumexp(log_post)
+        probability[taus] = np.exp(log_post - log_evidence)
+        samples = rng.choice(taus, size=(n_samples, 1), p=probability[taus] / probability[taus].sum())
+    else:
+        forward = _forward(model, n, n_segments, min_size)
+        backward = _backward(model, n, n_segments, min_size)
+        log_evidence = forward[-1, n]
+        for k in range(n_changepoints):
+            # Change k+1 at t: k + 1 segments before t, the remaining ones after it
+            probability[1:] += np.exp(forward[k, 1:n] + backward[n_segments - k - 2, 1:n] - log_evidence)
+
+        # Draw configurations backwards from the end using the forward table
+        samples = np.zeros((n_samples, n_changepoints), dtype=np.int64)
+        for i in range(n_samples):
+            end = n
+            for k in range(n_changepoints, 0, -1):
+                starts = np.arange(k * min_size, end - min_size + 1)
+                weights = forward[k - 1, starts] + model.log_marginal(starts, end)
+                weights = np.exp(weights - logsumexp(weights))
+                end = rng.choice(starts, p=weights / weights.sum())
+                samples[i, k - 1] = end
+
+    sample_dates = pd.DataFrame({f"change_{k + 1}": series.index[samples[:, k]] for k in range(n_changepoints)})
+    medians = np.median(samples, axis=0).astype(np.int64)
+    return {
+        'posterior': pd.Series(probability, index=series.index, name='probability'),
+        'samples': sample_dates,
+        'change_points': list(series.index[medians]),
+        'log_evidence': float(log_evidence),
+    }
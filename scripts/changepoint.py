@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+
+class L2Cost:
+    """
+    Squared-error cost of fitting a constant mean to a segment (detects mean shifts).
+
+    Prefix sums of the signal and its square make every segment cost O(1).
+    """
+
+    n_params = 1
+
+    def fit(self, signal):
+        signal = np.asarray(signal, dtype=np.float64)
+        centered = signal - signal.mean()
+        self._sum = np.concatenate(([0.0], np.cumsum(centered)))
+        self._sumsq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        return self
+
+    def cost(self, start, end):
+        """Cost of segments [start, end); `start` and `end` broadcast."""
+        n = np.asarray(end, dtype=np.float64) - start
+        s1 = self._sum[end] - self._sum[start]
+        s2 = self._sumsq[end] - self._sumsq[start]
+        return np.maximum(s2 - s1 * s1 / n, 0.0)
+
+
+class NormalMeanVarCost(L2Cost):
+    """
+    Negative Gaussian log-likelihood of a segment with its own mean and variance,
+    n * log(variance), detecting changes in level and/or volatility.
+
+    Parameters:
+    - min_variance (float): Variance floor that keeps near-constant segments finite.
+    """
+
+    n_params = 2
+
+    def __init__(self, min_variance=1e-8):
+        self.min_variance = min_variance
+
+    def cost(self, start, end):
+        n = np.asarray(end, dtype=np.float64) - start
+        variance = np.maximum(super().cost(start, end) / n, self.min_variance)
+        return n * np.log(variance)
+
+
+COSTS = {'l2': L2Cost, 'normal': NormalMeanVarCost}
+
+
+def select_penalty(signal, cost='l2', criterion='bic'):
+    """
+    Returns a penalty per change point from an information criterion.
+
+    For the L2 cost the penalty is scaled by a robust noise variance estimated from
+    the median absolute first difference, so it does not depend on the price level.
+
+    Parameters:
+    - signal (array-like): The series to segment.
+    - cost (str): 'l2' or 'normal'.
+    - criterion (str): 'bic' (log n per parameter) or 'aic' (2 per parameter).
+
+    Returns:
+    - float: The penalty.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    weight = {'bic': np.log(n), 'aic': 2.0}[criterion]
+    # Each change point adds one location plus the per-segment parameters
+    penalty = weight * (COSTS[cost].n_params + 1)
+    if cost == 'l2':
+        sigma = np.median(np.abs(np.diff(signal))) / (0.6745 * np.sqrt(2))
+        penalty *= max(sigma, 1e-12) ** 2
+    return float(penalty)
+
+
+def _as_cost(cost, signal):
+    model = COSTS[cost]() if isinstance(cost, str) else cost
+    return model.fit(signal)
+
+
+def pelt(signal, penalty, cost='l2', min_size=2):
+    """
+    Penalized optimal partitioning with PELT pruning (Killick et al., 2012).
+
+    Finds the segmentation minimizing the total segment cost plus `penalty` per change
+    point. Pruning drops candidate change points that can never be optimal again,
+    giving close to linear run time in practice.
+
+    Parameters:
+    - signal (array-like): The series to segment.
+    - penalty (float): Penalty per change point.
+    - cost (str or cost object): 'l2', 'normal' or an object with `fit` / `cost`.
+    - min_size (int): Minimum segment length.
+
+    Returns:
+    - list[int]: Segment end positions; the last one is len(signal).
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    if n < 2 * min_size:
+        return [n]
+    model = _as_cost(cost, signal)
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+    for t in range(min_size, n + 1):
+        if t - min_size >= min_size:
+            candidates = np.append(candidates, t - min_size)
+        values = best[candidates] + model.cost(candidates, t)
+        j = np.argmin(values)
+        best[t] = values[j] + penalty
+        last[t] = candidates[j]
+        candidates = candidates[values <= best[t]]
+
+    return _backtrack(last, n)
+
+
+def optimal_partition(signal, n_bkps, cost='l2', min_size=2):
+    """
+    Exact segmentation with a fixed number of change points (segment-neighbourhood DP).
+
+    Runs in O(n_bkps * n^2) time and O(n_bkps * n) memory, vectorized over the
+    candidate start positions.
+
+    Parameters:
+    - signal (array-like): The series to segment.
+    - n_bkps (int): Number of change points.
+    - cost (str or cost object): 'l2', 'normal' or an object with `fit` / `cost`.
+    - min_size (int): Minimum segment length.
+
+    Returns:
+    - list[int]: Segment end positions; the last one is len(signal).
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    if n_bkps == 0 or n < (n_bkps + 1) * min_size:
+        return [n]
+    model = _as_cost(cost, signal)
+
+    ends = np.arange(n + 1)
+    best = np.where(ends >= min_size, model.cost(0, np.maximum(ends, 1)), np.inf)
+    last = np.zeros((n_bkps + 1, n + 1), dtype=np.int64)
+    for k in range(1, n_bkps + 1):
+        current = np.full(n + 1, np.inf)
+        for t in range((k + 1) * min_size, n + 1):
+            starts = np.arange(k * min_size, t - min_size + 1)
+            values = best[starts] + model.cost(starts, t)
+            j = np.argmin(values)
+            current[t] = values[j]
+            last[k, t] = starts[j]
+        best = current
+
+    bkps = [n]
+    for k in range(n_bkps, 0, -1):
+        bkps.append(int(last[k, bkps[-1]]))
+    return sorted(bkps)
+
+
+def _backtrack(last, n):
+    bkps = [n]
+    while last[bkps[-1]] > 0:
+        bkps.append(int(last[bkps[-1]]))
+    return sorted(bkps)
+
+
+def segment_summary(series: pd.Series, bkps):
+    """
+    Describes the segments delimited by change points.
+
+    Parameters:
+    - series (pd.Series): The segmented series, indexed by date.
+    - bkps (list[int]): Segment end positions, the last one being len(series).
+
+    Returns:
+    - pd.DataFrame: Start/end dates, length, mean and standard deviation of each segment.
+    """
+    rows = []
+    start = 0
+    for end in bkps:
+        segment = series.iloc[start:end]
+        rows.append({
+            'start': series.index[start],
+            'end': series.index[end - 1],
+            'n': end - start,
+            'mean': segment.mean(),
+            'std': segment.std(),
+        })
+        start = end
+    return pd.DataFrame(rows)
+
+
+def detect_change_points(series: pd.Series, n_bkps=None, penalty='bic', cost='normal', min_size=2):
+    """
+    Detects change points in a series with exact, O(1)-per-segment-cost algorithms.
+
+    With `n_bkps` the best segmentation with exactly that many change points is found
+    by dynamic programming; otherwise PELT finds the best penalized segmentation.
+
+    Parameters:
+    - series (pd.Series): Series indexed by date.
+    - n_bkps (int, optional): Exact number of change points.
+    - penalty (float or str): Penalty per change point, or 'bic' / 'aic' to select one.
+    - cost (str): 'l2' for mean shifts, 'normal' for mean and variance changes.
+    - min_size (int): Minimum segment length.
+
+    Returns:
+    - dict: 'breakpoints' (positions where a new segment starts), 'dates' (their dates),
+      'segments' (see `segment_summary`), 'penalty' and 'method'.
+    """
+    signal = series.to_numpy(dtype=np.float64)
+    if n_bkps is not None:
+        bkps, method, penalty = optimal_partition(signal, n_bkps, cost=cost, min_size=min_size), 'dynp', None
+    else:
+        if isinstance(penalty, str):
+            penalty = select_penalty(signal, cost=cost, criterion=penalty)
+        bkps, method = pelt(signal, penalty, cost=cost, min_size=min_size), 'pelt'
+
+    return {
+        'breakpoints': bkps[:-1],
+        'dates': list(series.index[bkps[:-1]]),
+        'segments': segment_summary(series, bkps),
+        'penalty': penalty,
+        'method': method,
+    }
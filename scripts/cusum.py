@@ -0,0 +1,144 @@
+import itertools
+import math
+import pandas as pd
+
+
+class OnlineCusumDetector:
+    """
+    Streaming two-sided CUSUM (Page's test) for shifts in the mean of a series.
+
+    The reference mean and standard deviation are estimated from the first `warmup`
+    observations (and again after every alarm), so the statistic only uses past data.
+    After warm-up each observation x updates
+
+        g+ = max(0, g+ + (x - mean) / std - drift)
+        g- = max(0, g- - (x - mean) / std - drift)
+
+    and an alarm is raised when either statistic exceeds `threshold`, after which the
+    detector resets. State is O(1) regardless of how many observations are processed.
+
+    Parameters:
+    - drift (float): Allowance k, in standard deviations; shifts smaller than about 2k are ignored.
+    - threshold (float): Decision interval h, in standard deviations.
+    - warmup (int): Observations used to estimate the reference after a start or reset.
+    - target_mean (float, optional): Fixed reference mean instead of the warm-up estimate.
+    - target_std (float, optional): Fixed reference standard deviation instead of the warm-up estimate.
+    """
+
+    def __init__(self, drift=0.5, threshold=5.0, warmup=30, target_mean=None, target_std=None):
+        if warmup < 2 and (target_mean is None or target_std is None):
+            raise ValueError("warmup must be at least 2 unless target_mean and target_std are given.")
+        self.drift = drift
+        self.threshold = threshold
+        self.warmup = warmup
+        self.target_mean = target_mean
+        self.target_std = target_std
+        self.position = -1
+        self.reset()
+
+    def reset(self):
+        """Clears the statistics and starts a new warm-up (keeps the stream position)."""
+        self.g_pos = 0.0
+        self.g_neg = 0.0
+        self._pos_start = None
+        self._neg_start = None
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.mean = self.target_mean
+        self.std = self.target_std
+
+    @property
+    def ready(self):
+        """Whether the reference is known and observations are being tested."""
+        return self.mean is not None and self.std is not None
+
+    def update(self, value, timestamp=None):
+        """
+        Processes one observation.
+
+        Parameters:
+        - value (float): The observation; NaN values are skipped.
+        - timestamp: Optional label stored with any alarm (e.g. the price date).
+
+        Returns:
+        - dict or None: The alarm raised by this observation, if any.
+        """
+        self.position += 1
+        if value is None or math.isnan(value):
+            return None
+
+        if not self.ready:
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+            if self._count >= self.warmup:
+                self.mean = self._mean if self.target_mean is None else self.target_mean
+                if self.target_std is None:
+                    self.std = math.sqrt(self._m2 / (self._count - 1)) or 1.0
+            return None
+
+        z = (value - self.mean) / self.std
+        self.g_pos = max(0.0, self.g_pos + z - self.drift)
+        self.g_neg = max(0.0, self.g_neg - z - self.drift)
+        if self.g_pos == 0.0:
+            self._pos_start = None
+        elif self._pos_start is None:
+            self._pos_start = self.position
+        if self.g_neg == 0.0:
+            self._neg_start = None
+        elif self._neg_start is None:
+            self._neg_start = self.position
+
+        if self.g_pos > self.threshold or self.g_neg > self.threshold:
+            upward = self.g_pos >= self.g_neg
+            alarm = {
+                'position': self.position,
+                'timestamp': timestamp,
+                'direction': 'up' if upward else 'down',
+                'statistic': self.g_pos if upward else self.g_neg,
+                'change_start': self._pos_start if upward else self._neg_start,
+                'reference_mean': self.mean,
+            }
+            self.reset()
+            return alarm
+        return None
+
+    def process(self, values, timestamps=None):
+        """
+        Processes a chunk of observations, continuing from the current state.
+
+        Parameters:
+        - values (iterable of float): Observations in stream order.
+        - timestamps (iterable, optional): Labels matching `values`.
+
+        Returns:
+        - list[dict]: Alarms raised within the chunk.
+        """
+        if timestamps is None:
+            timestamps = itertools.repeat(None)
+        alarms = []
+        for value, timestamp in zip(values, timestamps):
+            alarm = self.update(float(value), timestamp)
+            if alarm is not None:
+                alarms.append(alarm)
+        return alarms
+
+
+def cusum_alarms(series: pd.Series, drift=0.5, threshold=5.0, warmup=30) -> pd.DataFrame:
+    """
+    Runs an `OnlineCusumDetector` over a whole series.
+
+    Parameters:
+    - series (pd.Series): Values indexed by date.
+    - drift, threshold, warmup: See `OnlineCusumDetector`.
+
+    Returns:
+    - pd.DataFrame: One row per alarm, indexed by alarm date.
+    """
+    detector = OnlineCusumDetector(drift=drift, threshold=threshold, warmup=warmup)
+    alarms = detector.process(series.to_numpy(), series.index)
+    alarms_df = pd.DataFrame(alarms, columns=['position', 'timestamp', 'direction', 'statistic',
+                                              'change_start', 'reference_mean'])
+    return alarms_df.set_index('timestamp').rename_axis('Date')
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+
+class GoogleDriveFetcher:
+    """
+    Fetches a file shared through a Google Drive link.
+
+    Google Drive does not support conditional requests, so every fetch downloads the
+    file; the cache's `max_age` decides how often that happens.
+
+    Parameters:
+    - drive_link (str): The Google Drive shareable link to the file.
+    """
+
+    def __init__(self, drive_link: str):
+        self.file_id = drive_link.split('/')[-2]
+        self.source_id = f"gdrive:{self.file_id}"
+
+    def fetch(self, dest: str, validators: dict):
+        import gdown
+
+        download_url = f'https://drive.google.com/uc?export=download&id={self.file_id}'
+        if gdown.download(download_url, dest, quiet=False) is None:
+            raise IOError(f"Download from Google Drive failed: {download_url}")
+        return {}
+
+
+class HttpFetcher:
+    """
+    Fetches a file over HTTP(S), revalidating with ETag / Last-Modified.
+
+    Parameters:
+    - url (str): The file URL.
+    - timeout (float): Request timeout in seconds.
+    """
+
+    def __init__(self, url: str, timeout: float = 60):
+        self.url = url
+        self.timeout = timeout
+        self.source_id = url
+
+    def fetch(self, dest: str, validators: dict):
+        request = urllib.request.Request(self.url)
+        if validators.get('etag'):
+            request.add_header('If-None-Match', validators['etag'])
+        if validators.get('last_modified'):
+            request.add_header('If-Modified-Since', validators['last_modified'])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response, open(dest, 'wb') as f:
+                shutil.copyfileobj(response, f)
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None
+            raise
+        return {'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+
+
+class LocalFileFetcher:
+    """
+    Fetches a file from the local filesystem, revalidating on its modification time.
+
+    Parameters:
+    - path (str): The source file.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.source_id = f"file:{self.path}"
+
+    def fetch(self, dest: str, validators: dict):
+        mtime = os.path.getmtime(self.path)
+        if validators.get('mtime') == mtime:
+            return None
+        shutil.copyfile(self.path, dest)
+        return {'mtime': mtime}
+
+
+class DatasetCache:
+    """
+    Local, content-addressed cache for downloaded datasets.
+
+    Fetched files are stored under `objects/<sha256>`; a metadata file per source
+    records which object it resolved to, when it was fetched and the validators
+    (ETag, modification time, ...) used for conditional re-fetches.
+
+    A fetcher is any object with a `source_id` attribute and a
+    `fetch(dest, validators)` method that writes the file to `dest` and returns new
+    validators, or returns None when the source is unchanged.
+
+    Objects are never modified, only added, so old versions accumulate; `prune`
+    (run after every new fetch) evicts them by age and total size.
+
+    Parameters:
+    - cache_dir (str): Root directory of the cache.
+    - max_bytes (int, optional): Total size of the objects above which the least
+      recently fetched ones are evicted.
+    - max_unused_age (float, optional): Seconds after which an object that no source
+      points to any more (a superseded version) is evicted.
+    - logger (logging.Logger): Logger for tracking cache hits and fetches.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = None, max_unused_age: float = None,
+                 logger: logging.Logger = None):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.sources_dir = os.path.join(cache_dir, 'sources')
+        self.max_bytes = max_bytes
+        self.max_unused_age = max_unused_age
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def _meta_path(self, source_id: str) -> str:
+        return os.path.join(self.sources_dir, hashlib.sha1(source_id.encode('utf-8')).hexdigest() + '.json')
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256)
+
+    def metadata(self, source_id: str):
+        """Returns the cached metadata of a source, or None if it was never fetched."""
+        try:
+            with open(self._meta_path(source_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _temp_file(directory: str, prefix: str) -> str:
+        # A unique name, so that threads and processes sharing the cache never write the same file
+        fd, path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix='.tmp')
+        os.close(fd)
+        return path
+
+    def _write_metadata(self, meta: dict):
+        path = self._meta_path(meta['source_id'])
+        tmp_path = self._temp_file(self.sources_dir, '.meta-')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+
+    @staticmethod
+    def _discard(path: str):
+        # Partial downloads never stay in the cache directory
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, fetcher, max_age: float = None, offline: bool = False) -> str:
+        """
+        Returns the path of the cached copy of a source, fetching it when needed.
+
+        Parameters:
+        - fetcher: The fetcher for the source.
+        - max_age (float, optional): Seconds a cached copy is served without revalidation.
+          None revalidates on every call.
+        - offline (bool): Serve from the cache only and never contact the source.
+
+        Returns:
+        - str: Path of the content-addressed cached file.
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.sources_dir, exist_ok=True)
+
+        meta = self.metadata(fetcher.source_id)
+        cached = self._object_path(meta['sha256']) if meta else None
+        if cached and not os.path.exists(cached):
+            meta, cached = None, None
+
+        if offline:
+            if cached is None:
+                raise FileNotFoundError(f"{fetcher.source_id} is not cached and offline mode is enabled.")
+            self.logger.info(f"Offline mode: serving {fetcher.source_id} from cache.")
+            return cached
+        if cached and max_age is not None and time.time() - meta['fetched_at'] < max_age:
+            self.logger.info(f"Cache hit for {fetcher.source_id}.")
+            return cached
+
+        tmp_path = self._temp_file(self.objects_dir, '.download-')
+        try:
+            validators = fetcher.fetch(tmp_path, meta.get('validators', {}) if meta else {})
+        except Exception as e:
+            self._discard(tmp_path)
+            if cached is None:
+                raise
+            self.logger.warning(f"Fetching {fetcher.source_id} failed ({e}); serving the cached copy.")
+            return cached
+
+        if validators is None:
+            self._discard(tmp_path)
+            self.logger.info(f"{fetcher.source_id} is unchanged; keeping the cached copy.")
+            meta['fetched_at'] = time.time()
+            self._write_metadata(meta)
+            return cached
+
+        try:
+            sha256 = self._sha256(tmp_path)
+            object_path = self._object_path(sha256)
+            os.replace(tmp_path, object_path)
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+        self._write_metadata({
+            'source_id': fetcher.source_id,
+            'sha256': sha256,
+            'size': os.path.getsize(object_path),
+            'fetched_at': time.time(),
+            'validators': validators,
+        })
+        self.logger.info(f"Fetched {fetcher.source_id} into cache object {sha256[:12]}.")
+        self.prune(keep={sha256})
+        return object_path
+
+    def prune(self, keep=()) -> list:
+        """
+        Evicts cached objects according to `max_unused_age` and `max_bytes`.
+
+        Objects no source points to are evicted first, oldest first; then, while the
+        total size is still above `max_bytes`, the least recently fetched of the rest.
+        A source whose object was evicted is fetched again by its next `get`.
+
+        Parameters:
+        - keep (iterable of str): sha256 of objects that must not be evicted.
+
+        Returns:
+        - list[str]: sha256 of the evicted objects.
+        """
+        if self.max_bytes is None and self.max_unused_age is None:
+            return []
+        fetched_at = {}
+        for name in os.listdir(self.sources_dir) if os.path.isdir(self.sources_dir) else []:
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.sources_dir, name)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            fetched_at[meta['sha256']] = max(fetched_at.get(meta['sha256'], 0.0), meta['fetched_at'])
+
+        objects = []
+        for name in os.listdir(self.objects_dir) if os.path.isdir(self.objects_dir) else []:
+            if name.startswith('.'):
+                continue  # Downloads in progress
+            try:
+                stat = os.stat(self._object_path(name))
+            except FileNotFoundError:
+                continue
+            # Unreferenced objects sort first; each group from the least recently fetched
+            objects.append((name in fetched_at, fetched_at.get(name, stat.st_mtime), name, stat.st_size))
+        objects.sort()
+
+        total = sum(size for *_, size in objects)
+        now = time.time()
+        evicted = []
+        for referenced, last_fetched, name, size in objects:
+            if name in keep:
+                continue
+            expired = (not referenced and self.max_unused_age is not None
+                       and now - last_fetched > self.max_unused_age)
+            if expired or (self.max_bytes is not None and total > self.max_bytes):
+                self._discard(self._object_path(name))
+                total -= size
+                evicted.append(name)
+        if evicted:
+            self.logger.info(f"Evicted {len(evicted)} cache objects; {total} bytes remain.")
+        return evicted
@@ -0,0 +1,448 @@
+import heapq
+import logging
+import os
+import numpy as np
+import pandas as pd
+from ingest import RunningStats
+
+# Rows read per chunk when profiling a file
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _bit_length(values):
+    """Bit length of each uint64, exact (float64 only ever holds 32-bit halves)."""
+    high = np.frexp((values >> np.uint64(32)).astype(np.float64))[1]
+    low = np.frexp((values & np.uint64(0xFFFFFFFF)).astype(np.float64))[1]
+    return np.where(high > 0, high + 32, low)
+
+
+class HyperLogLog:
+    """
+    Distinct-count estimate from 64-bit hashes in 2**precision one-byte registers.
+
+    The relative error is about 1.04 / sqrt(2**precision), 0.8% with the default
+    precision, whatever the number of values. Sketches built with the same precision
+    merge by taking the register-wise maximum.
+
+    Parameters:
+    - precision (int): Number of index bits, between 4 and 18.
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        """Adds a batch of uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision)
+        # Position of the first 1 bit after the index bits, capped for an all-zero rest
+        rank = np.minimum(65 - _bit_length(rest), 65 - self.precision).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = self.registers.size
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int((self.registers == 0).sum())
+        # Linear counting is more accurate while many registers are still empty
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class DuplicateDetector:
+    """
+    Exact duplicate-row counting on 64-bit row hashes.
+
+    The distinct hashes seen so far are kept as one sorted array (8 bytes per distinct
+    row), so a chunk is checked with a binary search. Two rows only collide by chance
+    with a probability of about n**2 / 2**65.
+    """
+
+    def __init__(self):
+        self.seen = np.array([], dtype=np.uint64)
+        self.duplicates = 0
+
+    def update(self, hashes) -> np.ndarray:
+        """Adds a chunk of row hashes; returns the mask of rows that repeat an earlier row."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        # Sorted (stably, so the first of equal rows comes first) the chunk's own repeats are
+        # neighbours, and the binary searches walk the seen array in order
+        order = np.argsort(hashes, kind='stable')
+        ordered = hashes[order]
+        repeated_ordered = np.zeros(ordered.size, dtype=bool)
+        repeated_ordered[1:] = ordered[1:] == ordered[:-1]
+        if self.seen.size:
+            position = np.minimum(np.searchsorted(self.seen, ordered), self.seen.size - 1)
+            repeated_ordered |= self.seen[position] == ordered
+        self.duplicates += int(repeated_ordered.sum())
+        self._add(ordered[~repeated_ordered])
+        repeated = np.empty_like(repeated_ordered)
+        repeated[order] = repeated_ordered
+        return repeated
+
+    def _add(self, new):
+        # Both parts are sorted, so the stable sort is a linear merge of two runs
+        self.seen = np.sort(np.concatenate([self.seen, new]), kind='stable')
+
+    def merge(self, other):
+        common = np.intersect1d(self.seen, other.seen, assume_unique=True)
+        self.duplicates += other.duplicates + common.size
+        self._add(np.setdiff1d(other.seen, common, assume_unique=True))
+
+
+class ColumnProfile:
+    """Missing values, distinct estimate and, for numeric columns, streaming moments of one column."""
+
+    def __init__(self, name, precision=14):
+        self.name = name
+        self.dtypes = []
+        self.count = 0
+        self.missing = 0
+        self.distinct = HyperLogLog(precision)
+        self.stats = None
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def update(self, values: pd.Series):
+        dtype = str(values.dtype)
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+        missing = values.isna().to_numpy()
+        self.count += len(values)
+        self.missing += int(missing.sum())
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            # Hash numbers as float64 so that 5 and 5.0 in chunks of different dtypes agree
+            values = values.astype(np.float64)
+            present = values.to_numpy()[~missing]
+            if self.stats is None:
+                self.stats = RunningStats()
+            self.stats.update(present)
+            if present.size:
+                self.minimum = min(self.minimum, present.min())
+                self.maximum = max(self.maximum, present.max())
+        self.distinct.update(pd.util.hash_pandas_object(values[~missing], index=False).to_numpy())
+
+    def merge(self, other):
+        self.dtypes += [dtype for dtype in other.dtypes if dtype not in self.dtypes]
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        if other.stats is not None:
+            if self.stats is None:
+                self.stats = RunningStats()
+            self.stats.merge(other.stats)
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+
+    def report(self) -> dict:
+        report = {
+            'dtype': self.dtypes[0] if len(self.dtypes) == 1 else 'mixed: ' + ', '.join(self.dtypes),
+            'count': self.count - self.missing,
+            'missing': self.missing,
+            'distinct': min(self.distinct.estimate(), self.count - self.missing),
+        }
+        if self.stats is not None:
+            present = self.stats.count > 0
+            report.update({
+                'mean': float(self.stats.mean) if present else None,
+                'std': float(self.stats.std) if self.stats.count > 1 else None,
+                'min': float(self.minimum) if present else None,
+                'max': float(self.maximum) if present else None,
+            })
+        return report
+
+
+class DateProfile:
+    """
+    Order and gap checks of a date column, read in order.
+
+    Each step between consecutive dates is classified as a step back (out of order),
+    a repeated date or a gap longer than `gap_threshold`; the `max_gaps` largest gaps
+    are kept.
+    """
+
+    def __init__(self, gap_threshold='4D', max_gaps=10):
+        self.gap_threshold = pd.Timedelta(gap_threshold).value
+        self.max_gaps = max_gaps
+        self.count = 0
+        self.missing = 0
+        self.unparsed = 0
+        self.first = self.last = None
+        self.minimum = self.maximum = None
+        self.out_of_order = 0
+        self.repeated = 0
+        self.gap_count = 0
+        self.smallest_step = None
+        self._gaps = []
+
+    def update(self, dates, unparsed=0):
+        """Adds the next dates (datetime64[ns]; NaT counts as missing)."""
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        missing = np.isnat(dates)
+        self.count += dates.size
+        self.missing += int(missing.sum())
+        self.unparsed += unparsed
+        dates = dates[~missing].view(np.int64)
+        if dates.size == 0:
+            return
+        minimum, maximum = int(dates.min()), int(dates.max())
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        previous = dates if self.last is None else np.concatenate([[self.last], dates])
+        self._steps(previous[:-1], np.diff(previous))
+        if self.first is None:
+            self.first = int(dates[0])
+        self.last = int(dates[-1])
+
+    def _steps(self, starts, steps):
+        self.out_of_order += int((steps < 0).sum())
+        self.repeated += int((steps == 0).sum())
+        positive = steps[steps > 0]
+        if positive.size:
+            smallest = int(positive.min())
+            self.smallest_step = smallest if self.smallest_step is None else min(self.smallest_step, smallest)
+        gaps = np.flatnonzero(steps > self.gap_threshold)
+        self.gap_count += gaps.size
+        if gaps.size > self.max_gaps:
+            gaps = gaps[np.argpartition(steps[gaps], -self.max_gaps)[-self.max_gaps:]]
+        for i in gaps.tolist():
+            entry = (int(steps[i]), int(starts[i]))
+            if len(self._gaps) < self.max_gaps:
+                heapq.heappush(self._gaps, entry)
+            else:
+                heapq.heappushpop(self._gaps, entry)
+
+    def merge(self, other):
+        """Folds in the profile of the dates that directly follow this one's."""
+        if self.last is not None and other.first is not None:
+            self._steps(np.array([self.last]), np.array([other.first - self.last]))
+        self.count += other.count
+        self.missing += other.missing
+        self.unparsed += other.unparsed
+        self.out_of_order += other.out_of_order
+        self.repeated += other.repeated
+        self.gap_count += other.gap_count
+        for entry in other._gaps:
+            if len(self._gaps) < self.max_gaps:
+                heapq.heappush(self._gaps, entry)
+            else:
+                heapq.heappushpop(self._gaps, entry)
+        for name, pick in (('minimum', min), ('maximum', max), ('smallest_step', min)):
+            values = [v for v in (getattr(self, name), getattr(other, name)) if v is not None]
+            setattr(self, name, pick(values) if values else None)
+        self.first = self.first if self.first is not None else other.first
+        self.last = other.last if other.last is not None else self.last
+
+    def report(self) -> dict:
+        def timestamp(value):
+            return None if value is None else pd.Timestamp(value)
+
+        return {
+            'count': self.count - self.missing,
+            'missing': self.missing,
+            'unparsed': self.unparsed,
+            'first': timestamp(self.first),
+            'last': timestamp(self.last),
+            'min': timestamp(self.minimum),
+            'max': timestamp(self.maximum),
+            'monotonic': self.out_of_order == 0,
+            'strictly_increasing': self.out_of_order == 0 and self.repeated == 0,
+            'out_of_order': self.out_of_order,
+            'repeated': self.repeated,
+            'smallest_step': None if self.smallest_step is None else pd.Timedelta(self.smallest_step),
+            'gap_threshold': pd.Timedelta(self.gap_threshold),
+            'gaps': self.gap_count,
+            'largest_gaps': [{'after': pd.Timestamp(start), 'before': pd.Timestamp(start + step),
+                              'length': pd.Timedelta(step)}
+                             for step, start in sorted(self._gaps, reverse=True)],
+        }
+
+
+class DataProfiler:
+    """
+    One-pass data-quality profile of a table read in chunks.
+
+    Every statistic is updated per chunk and can be merged with the profile of
+    another part of the data, so files larger than memory are profiled with the
+    memory of one chunk plus the sketches:
+
+    - exact row, missing-value and duplicate-row counts (duplicates via 64-bit row hashes),
+    - streaming mean, standard deviation, min and max of numeric columns,
+    - HyperLogLog estimates of the distinct values per column,
+    - parse failures, order, repeated dates and gaps of the date column.
+
+    Parameters:
+    - date_column (str): Column checked as the series' dates. A DatetimeIndex is used
+      when the chunks have no such column.
+    - date_format (str, optional): strptime format of the dates; mixed formats are
+      parsed per value otherwise, which is much slower on large files.
+    - gap_threshold (str or pd.Timedelta): Steps between dates longer than this are gaps;
+      the default allows weekends and a holiday next to one in daily data.
+    - max_gaps (int): Number of largest gaps listed in the report.
+    - max_examples (int): Number of duplicate rows kept as examples.
+    - precision (int): HyperLogLog precision of the distinct estimates.
+    """
+
+    def __init__(self, date_column='Date', date_format=None, gap_threshold='4D', max_gaps=10, max_examples=10,
+                 precision=14):
+        self.date_column = date_column
+        self.date_format = date_format
+        self.max_examples = max_examples
+        self.precision = precision
+        self.rows = 0
+        self.chunks = 0
+        self.columns = {}
+        self.duplicates = DuplicateDetector()
+        self.duplicate_examples = []
+        self.dates = DateProfile(gap_threshold=gap_threshold, max_gaps=max_gaps)
+
+    def _parse_dates(self, chunk):
+        if self.date_column in chunk.columns:
+            raw = chunk[self.date_column]
+        elif isinstance(chunk.index, pd.DatetimeIndex):
+            raw = chunk.index.to_series()
+        else:
+            return None, 0
+        if pd.api.types.is_datetime64_any_dtype(raw):
+            return raw.to_numpy(dtype='datetime64[ns]'), 0
+        text = raw.astype('string').str.strip()
+        parsed = pd.to_datetime(text, format=self.date_format or 'mixed', errors='coerce')
+        unparsed = int((parsed.isna() & text.notna() & (text != '')).sum())
+        return parsed.to_numpy(dtype='datetime64[ns]'), unparsed
+
+    def update(self, chunk: pd.DataFrame):
+        """Adds the next chunk of rows."""
+        self.rows += len(chunk)
+        self.chunks += 1
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, self.precision)
+                # Rows of earlier chunks had no value in this column
+                self.columns[name].count = self.columns[name].missing = self.rows - len(chunk)
+            self.columns[name].update(chunk[name])
+
+        hashable = chunk.apply(lambda column: column.astype(np.float64)
+                               if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+                               else column)
+        repeated = self.duplicates.update(pd.util.hash_pandas_object(hashable, index=False).to_numpy())
+        if repeated.any() and len(self.duplicate_examples) < self.max_examples:
+            examples = chunk[repeated].head(self.max_examples - len(self.duplicate_examples))
+            self.duplicate_examples.extend(examples.reset_index(drop=True).to_dict('records'))
+
+        dates, unparsed = self._parse_dates(chunk)
+        if dates is not None:
+            self.dates.update(dates, unparsed)
+        return self
+
+    def merge(self, other):
+        """Folds in the profile of the rows that directly follow this profile's rows."""
+        for name, profile in other.columns.items():
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, self.precision)
+                self.columns[name].count = self.columns[name].missing = self.rows
+            self.columns[name].merge(profile)
+        self.rows += other.rows
+        self.chunks += other.chunks
+        self.duplicates.merge(other.duplicates)
+        self.duplicate_examples = (self.duplicate_examples + other.duplicate_examples)[:self.max_examples]
+        self.dates.merge(other.dates)
+        return self
+
+    def report(self) -> dict:
+        """
+        The profile as a dictionary.
+
+        Returns:
+        - dict: 'rows', 'chunks', 'columns' (name -> dtype, count, missing, distinct and,
+          for numeric columns, mean, std, min and max), 'duplicate_rows',
+          'duplicate_examples' (records) and 'dates' (None without a date column).
+        """
+        return {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'columns': {name: profile.report() for name, profile in self.columns.items()},
+            'duplicate_rows': self.duplicates.duplicates,
+            'duplicate_examples': list(self.duplicate_examples),
+            'dates': self.dates.report() if self.dates.count else None,
+        }
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """
+    Reads a table in chunks of about `chunksize` rows.
+
+    Parameters:
+    - source (str or pd.DataFrame): A DataFrame, or the path of a CSV (optionally
+      compressed, e.g. .csv.gz), Parquet or Feather/Arrow file. Columnar files are
+      read one record batch at a time and Feather files are memory-mapped.
+    - chunksize (int): Rows per chunk.
+    - columns (list of str, optional): Columns to read; all by default.
+
+    Yields:
+    - pd.DataFrame: The next chunk.
+    """
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+        return
+
+    name = os.path.basename(str(source)).lower()
+    if name.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Profiling Parquet files requires pyarrow: pip install pyarrow") from e
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif name.endswith(('.feather', '.arrow')):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Profiling Feather files requires pyarrow: pip install pyarrow") from e
+        with pa.memory_map(str(source)) as mapped:
+            reader = pa.ipc.open_file(mapped)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for start in range(0, batch.num_rows, chunksize):
+                    yield batch.slice(start, chunksize).to_pandas()
+    else:
+        with pd.read_csv(source, chunksize=chunksize, usecols=columns) as reader:
+            yield from reader
+
+
+def profile_source(source, chunksize=DEFAULT_CHUNKSIZE, columns=None, logger=None, **options) -> dict:
+    """
+    Profiles a DataFrame or a data file in one streaming pass, see `DataProfiler`.
+
+    Parameters:
+    - source (str or pd.DataFrame): Data to profile, see `iter_chunks`.
+    - chunksize (int): Rows read per chunk.
+    - columns (list of str, optional): Columns to profile; all by default.
+    - logger (logging.Logger): Logger instance for logging messages.
+    - **options: Passed to `DataProfiler` (date_column, date_format, gap_threshold, ...).
+
+    Returns:
+    - dict: The report of `DataProfiler.report`.
+    """
+    logger = logger if logger else logging.getLogger(__name__)
+    profiler = DataProfiler(**options)
+    for chunk in iter_chunks(source, chunksize=chunksize, columns=columns):
+        profiler.update(chunk)
+    report = profiler.report()
+    logger.info("Profiled %d rows in %d chunks: %d duplicate rows.", report['rows'], report['chunks'],
+                report['duplicate_rows'])
+    return report
@@ -1,84 +1,132 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import ruptures as rpt
-import pymc as pm
-import arviz as az
-from datetime import timedelta
-from scipy import stats
-
-class EventChangeAnalyzer:
+from analysis_core import PriceAnalysisCore
+from changepoint import segment_summary
+from analysis_runner import AnalysisRunner
+from rendering import PlotRenderer, PlotSpec, output
+
+class EventChangeAnalyzer(PriceAnalysisCore):
     """
     A class for analyzing event-specific changes in Brent oil prices, including CUSUM and Bayesian 
     change point detection, as well as statistical analysis of price changes around events.
+
+    The computations come from `PriceAnalysisCore`; this class adds the plots. ruptures,
+    PyMC, ArviZ and matplotlib are only imported by the methods that use them.
     
     Parameters:
     - price_data (pd.DataFrame): DataFrame with 'Date' as index and 'Price' column.
     - logger (logging.Logger): Logger instance for logging messages, warnings, and errors.
+    - renderer (PlotRenderer, optional): Headless mode; plots are queued on the renderer and
+      written to files by `renderer.flush()` instead of being shown.
     """
     
-    def __init__(self, price_data, logger=None):
-        self.price_data = price_data
-        self.logger = logger
-        self.mean_price = self.price_data['Price'].mean()
+    def __init__(self, price_data, logger=None, renderer: PlotRenderer = None):
+        super().__init__(price_data, logger=logger)
+        self.renderer = renderer
         
         
     def calculate_cusum(self):
         """Calculates and plots the CUSUM of deviations from the mean price."""
         try:
-            cusum = (self.price_data['Price'] - self.mean_price).cumsum()
-            plt.plot(self.price_data.index, cusum, label='CUSUM of Price Deviations', color='orange')
-            plt.title('CUSUM Line Plot of Brent Oil Price Deviations')
-            plt.xlabel('Date')
-            plt.ylabel('Cumulative Sum of Deviations (USD)')
-            plt.legend()
-            plt.grid()
-            plt.show()
+            cusum = self.cusum()
+            spec = PlotSpec('line', {'CUSUM of Price Deviations': cusum},
+                            title='CUSUM Line Plot of Brent Oil Price Deviations', xlabel='Date',
+                            ylabel='Cumulative Sum of Deviations (USD)', color='orange', legend=True, grid='both')
+            output(spec, 'cusum', self.renderer)
             self.logger.info("CUSUM plot created successfully.")
+            return cusum
         except Exception as e:
             self.logger.error("Error calculating or plotting CUSUM: %s", e)
     
-    def detect_change_point(self, n_bkps=5):
-        """Detects change points using the CUSUM-based method from the ruptures package."""
+    def detect_change_point(self, n_bkps=5, penalty=None, cost='normal', min_size=30, method='exact', plot=True):
+        """
+        Detects change points in the price series.
+
+        The default method uses the exact engine in `changepoint.py`, whose segment costs
+        are O(1) from cumulative sums: with a `penalty` PELT chooses the number of change
+        points, otherwise the best segmentation with exactly `n_bkps` change points is found.
+        method='rbf' runs the ruptures Binseg with an RBF kernel instead, which is
+        quadratic in time and memory.
+
+        Parameters:
+        - n_bkps (int): Number of change points when no penalty is given.
+        - penalty (float or str, optional): Penalty per change point, or 'bic' / 'aic'.
+        - cost (str): 'normal' for changes in mean and variance, 'l2' for mean shifts only.
+        - min_size (int): Minimum number of prices per segment.
+        - method (str): 'exact' or 'rbf'.
+        - plot (bool): Whether to plot the prices with the detected change points.
+
+        Returns:
+        - dict: 'breakpoints', 'dates', 'segments', 'penalty' and 'method'
+          (see `changepoint.detect_change_points`), or None if detection failed.
+        """
         try:
-            
-            # Extract the price series for change point detection
-            price_df = self.price_data.reset_index()
-            price_series = price_df['Price'].values
-
-            # Apply the CUSUM-based method for change point detection
-            algo = rpt.Binseg(model="rbf").fit(price_series)
-            change_points = algo.predict(n_bkps=5)  # Adjust n_bkps for more or fewer breakpoints
-
-            # Extract and print the year of each change point
-            change_years = [price_df['Date'].iloc[cp].year for cp in change_points[:-1]]  # Exclude the last index (end of data)
-            print("Detected change point years:", change_years)
-
-            # Plotting the Brent Oil Price with change points
-            plt.plot(price_df['Date'], price_df['Price'], label='Brent Oil Price', color='blue')
-
-            # Overlay detected change points with year annotations
-            for cp in change_points[:-1]:  # Exclude the last point (end of data)
-                year = price_df['Date'].iloc[cp].year
-                plt.axvline(price_df['Date'].iloc[cp], color='red', linestyle='--')
-                plt.text(price_df['Date'].iloc[cp], price_df['Price'].iloc[cp], str(year), color="red", fontsize=10)
-
-            # Enhancements
-            plt.title('Brent Oil Prices with CUSUM Change Points and Years')
-            plt.xlabel('Date')
-            plt.ylabel('Price (USD)')
-            plt.legend()
-            plt.grid()
-            plt.show()
-          
+            prices = self.price_data['Price']
+            if method == 'rbf':
+                import ruptures as rpt
+
+                bkps = rpt.Binseg(model="rbf", min_size=min_size).fit(prices.values).predict(n_bkps=n_bkps)
+                result = {
+                    'breakpoints': bkps[:-1],
+                    'dates': list(prices.index[bkps[:-1]]),
+                    'segments': segment_summary(prices, bkps),
+                    'penalty': None,
+                    'method': 'binseg-rbf',
+                }
+            else:
+                result = self.change_points(n_bkps=n_bkps, penalty=penalty, cost=cost, min_size=min_size)
+
+            change_years = [date.year for date in result['dates']]
+            self.logger.info("Detected change point years: %s", change_years)
+
+            if plot:
+                # Brent Oil Price with the detected change points and their years
+                spec = PlotSpec('line', {'Brent Oil Price': prices},
+                                title='Brent Oil Prices with Detected Change Points and Years',
+                                xlabel='Date', ylabel='Price (USD)', color='blue', legend=True, grid='both',
+                                vlines=result['dates'],
+                                annotations=[(date, prices.iloc[cp], str(date.year))
+                                             for cp, date in zip(result['breakpoints'], result['dates'])])
+                output(spec, f"change_points_{result['method']}", self.renderer)
+
+            return result
+
         except Exception as e:
             self.logger.error("Error detecting change points: %s", e)
             
             
-    def bayesian_change_point_detection(self):
-        """Performs Bayesian change point analysis using PyMC."""
+    def bayesian_change_point_detection(self, method='mcmc', n_changepoints=1, resample=None, min_size=2):
+        """
+        Performs Bayesian change point analysis.
+
+        method='mcmc' samples a single discrete switchpoint with PyMC. method='marginal'
+        integrates the segment means and variances out analytically and computes the exact
+        posterior over the locations of `n_changepoints` change points, which takes
+        seconds instead of a long sampling run (see `bayes_changepoint.py`).
+
+        Parameters:
+        - method (str): 'mcmc' or 'marginal'.
+        - n_changepoints (int): Number of change points (marginal method only).
+        - resample (str, optional): Frequency to average prices to first, e.g. 'W' (marginal method only).
+        - min_size (int): Minimum observations per segment (marginal method only).
+
+        Returns:
+        - pd.Timestamp for 'mcmc' (posterior median change point date), or the posterior
+          dict of `marginal_change_point_posterior` for 'marginal'.
+        """
+        if method == 'marginal':
+            try:
+                result = self.marginal_change_points(n_changepoints=n_changepoints, resample=resample,
+                                                     min_size=min_size)
+                self.logger.info("Estimated change point dates: %s", result['change_points'])
+                return result
+            except Exception as e:
+                self.logger.error("Error in Bayesian change point analysis: %s", e)
+                return None
+
         try:
+            import pymc as pm
+
             data = self.price_data['Price'].values
             prior_mu = np.mean(data)
             
@@ -99,14 +147,17 @@ class EventChangeAnalyzer:
                 trace = pm.sample(4000, tune=2000, chains=4, random_seed=42)
                 self.logger.info("Bayesian sampling completed successfully.")
                 
-                az.plot_trace(trace)
-                plt.show()
+                if self.renderer is None:
+                    import arviz as az
+                    import matplotlib.pyplot as plt
+
+                    az.plot_trace(trace)
+                    plt.show()
                 
                 s_posterior = trace.posterior['change_point'].values.flatten()
                 change_point_estimate = int(np.median(s_posterior))
                 change_point_date = self.price_data.index[change_point_estimate]
                 
-                print(f"Estimated Change Point Date: {change_point_date}")
                 self.logger.info("Estimated change point date: %s", change_point_date)
                 
                 return change_point_date
@@ -114,110 +165,80 @@ class EventChangeAnalyzer:
             self.logger.error("Error in Bayesian change point analysis: %s", e)
     
 
+    def parallel_runner(self, other_series=None, **kwargs):
+        """
+        Creates an `AnalysisRunner` over this analyzer's prices and any other series.
+
+        Parameters:
+        - other_series (dict[str, pd.Series], optional): Further series by name, e.g. WTI or resampled prices.
+        - **kwargs: Runner options (max_workers, timeout, start_method).
+
+        Returns:
+        - AnalysisRunner: The runner, with the prices published as 'Price'.
+        """
+        series = {'Price': self.price_data['Price'], **(other_series or {})}
+        return AnalysisRunner(series, logger=kwargs.pop('logger', self.logger), **kwargs)
+
     def _get_prices_around_event(self, event_date, days_before=30, days_after=30):
         """Helper function to get prices around a given event date."""
-        before_date = event_date - timedelta(days=days_before)
-        after_date = event_date + timedelta(days=days_after)
-        prices_around_event = self.price_data[(self.price_data.index >= before_date) & (self.price_data.index <= after_date)]
-        return prices_around_event
+        return self.prices_around_event(event_date, days_before=days_before, days_after=days_after)
 
     def analyze_price_changes_around_events(self, key_events):
         """Analyzes and plots price changes around specific events."""
-        results = []
+        impacts = self.compute_event_impacts(key_events)
+        impacts["Date"] = list(key_events.values())
 
-        for event, date in key_events.items():
-            try:
-                event_date = pd.to_datetime(date)
-                prices_around_event = self._get_prices_around_event(event_date, days_before=180, days_after=180)
-
-                # Calculate percentage changes at different intervals
-                change_1m = self._calculate_percentage_change(event_date, 30)
-                change_3m = self._calculate_percentage_change(event_date, 90)
-                change_6m = self._calculate_percentage_change(event_date, 180)
-
-                # Calculate cumulative returns around the event
-                cum_return_before = prices_around_event.loc[:event_date].pct_change().add(1).cumprod().iloc[-1] - 1
-                cum_return_after = prices_around_event.loc[event_date:].pct_change().add(1).cumprod().iloc[-1] - 1
-
-                results.append({
-                    "Event": event,
-                    "Date": date,
-                    "Change_1M": change_1m,
-                    "Change_3M": change_3m,
-                    "Change_6M": change_6m,
-                    "Cumulative Return Before": cum_return_before['Price'],
-                    "Cumulative Return After": cum_return_after['Price']
-                })
-            except KeyError:
-                self.logger.warning("Event %s at %s is out of price data range.", event, date)
-
-        event_impact_df = pd.DataFrame(results)
+        dates = pd.to_datetime(impacts["Date"])
+        in_range = (dates >= self.window_index.index[0]) & (dates <= self.window_index.index[-1])
+        for event, date in impacts.loc[~in_range, ["Event", "Date"]].itertuples(index=False):
+            self.logger.warning("Event %s at %s is out of price data range.", event, date)
+        impacts = impacts[in_range].reset_index(drop=True)
+
+        event_impact_df = impacts[["Event", "Date", "Change_1M", "Change_3M", "Change_6M",
+                                   "Cumulative Return Before", "Cumulative Return After"]]
         self._plot_price_trends_around_events(key_events)
         self._plot_percentage_changes_and_cumulative_returns(event_impact_df)
-        t_test_df = self._perform_statistical_analysis(key_events)
+        t_test_df = self._t_test_frame(impacts)
 
         return event_impact_df, t_test_df
 
     def _calculate_percentage_change(self, event_date, days):
         """Calculates the percentage change in price before and after a given number of days around an event."""
-        try:
-            price_before = self.price_data.loc[event_date - timedelta(days=days), 'Price']
-            price_after = self.price_data.loc[event_date + timedelta(days=days), 'Price']
-            return ((price_after - price_before) / price_before) * 100
-        except KeyError:
-            return None
+        return self.percentage_change(event_date, days)
 
     def _plot_price_trends_around_events(self, key_events, days_before=180, days_after=180):
         """Plots price trends around specified events."""
-        plt.figure(figsize=(14, 8))
+        trends = {}
         for event, date in key_events.items():
-            event_date = pd.to_datetime(date)
-            prices_around_event = self._get_prices_around_event(event_date, days_before=days_before, days_after=days_after)
-            plt.plot(prices_around_event.index, prices_around_event['Price'], label=f"{event} ({date})")
-            plt.axvline(event_date, color='red', linestyle='--', linewidth=0.8)
-        
-        plt.title("Brent Oil Price Trends Around Key Events")
-        plt.xlabel("Date")
-        plt.ylabel("Price")
-        plt.legend()
-        plt.show()
+            prices_around_event = self._get_prices_around_event(pd.to_datetime(date), days_before=days_before,
+                                                                days_after=days_after)
+            trends[f"{event} ({date})"] = prices_around_event['Price']
+
+        spec = PlotSpec('line', trends, title="Brent Oil Price Trends Around Key Events", xlabel="Date",
+                        ylabel="Price", figsize=(14, 8), legend=True,
+                        vlines=[pd.to_datetime(date) for date in key_events.values()])
+        return output(spec, 'price_trends_around_events', self.renderer)
 
     def _plot_percentage_changes_and_cumulative_returns(self, event_impact_df):
         """Plots percentage changes and cumulative returns before and after events."""
-        fig, axes = plt.subplots(2, 1, figsize=(12, 10))
-
-        # Plot for percentage changes
-        sns.barplot(data=event_impact_df.melt(id_vars=["Event", "Date"], 
-                                              value_vars=["Change_1M", "Change_3M", "Change_6M"]),
-                    x="Event", y="value", hue="variable", ax=axes[0])
-        axes[0].set_title("Percentage Change in Brent Oil Prices Before and After Events")
-        axes[0].set_ylabel("Percentage Change")
-        axes[0].legend(title="Change Period")
-
-        # Plot for cumulative returns
-        sns.barplot(data=event_impact_df.melt(id_vars=["Event", "Date"], 
-                                              value_vars=["Cumulative Return Before", "Cumulative Return After"]),
-                    x="Event", y="value", hue="variable", ax=axes[1])
-        axes[1].set_title("Cumulative Returns Before and After Events")
-        axes[1].set_ylabel("Cumulative Return")
-        axes[1].legend(title="Cumulative Return")
-
-        plt.tight_layout()
-        plt.show()
+        impacts = event_impact_df.set_index("Event")
+        spec = PlotSpec('panels', [
+            PlotSpec('grouped_bar', impacts[["Change_1M", "Change_3M", "Change_6M"]],
+                     title="Percentage Change in Brent Oil Prices Before and After Events",
+                     xlabel="Event", ylabel="Percentage Change", legend="Change Period"),
+            PlotSpec('grouped_bar', impacts[["Cumulative Return Before", "Cumulative Return After"]],
+                     title="Cumulative Returns Before and After Events",
+                     xlabel="Event", ylabel="Cumulative Return", legend="Cumulative Return"),
+        ], figsize=(12, 10))
+        return output(spec, 'event_changes_and_returns', self.renderer)
 
     def _perform_statistical_analysis(self, key_events):
         """Performs a t-test to assess significant price changes before and after events."""
-        t_test_results = {}
-        for event, date in key_events.items():
-            event_date = pd.to_datetime(date)
-            try:
-                before_prices = self._get_prices_around_event(event_date, days_before=180).loc[:event_date]['Price']
-                after_prices = self._get_prices_around_event(event_date, days_after=180).loc[event_date:]['Price']
-                t_stat, p_val = stats.ttest_ind(before_prices, after_prices, nan_policy='omit')
-                t_test_results[event] = {"t-statistic": t_stat, "p-value": p_val}
-            except KeyError:
-                self.logger.warning("Event %s at %s is out of price data range.", event, date)
-
-        t_test_df = pd.DataFrame(t_test_results).T
-        print(t_test_df)
+        return self._t_test_frame(self.compute_event_impacts(key_events))
+
+    def _t_test_frame(self, impacts):
+        """Extracts the t-test results from an event impact frame."""
+        t_test_df = impacts.set_index("Event")[["T-Statistic", "P-Value"]]
+        t_test_df.columns = ["t-statistic", "p-value"]
+        t_test_df.index.name = None
         return t_test_df
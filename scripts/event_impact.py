@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from scipy.special import stdtr
+from window_index import DateWindowIndex
+
+
+def horizon_label(days):
+    """Returns the result column name for a horizon, e.g. 30 -> 'Change_1M', 45 -> 'Change_45D'."""
+    if days % 30 == 0:
+        return f"Change_{days // 30}M"
+    return f"Change_{days}D"
+
+
+class EventImpactEngine:
+    """
+    Vectorized event-impact statistics for many events over one price series.
+
+    Prefix sums of the (centered) prices and their squares are built once, so the
+    mean and variance of any window cost O(1). Window bounds are resolved with
+    `DateWindowIndex`, and every statistic is computed for all events at once.
+
+    Parameters:
+    - price_data (pd.DataFrame or pd.Series): Prices indexed by date; a DataFrame must
+      have a 'Price' column.
+    """
+
+    def __init__(self, price_data):
+        prices = price_data['Price'] if isinstance(price_data, pd.DataFrame) else price_data
+        self.window_index = DateWindowIndex(prices)
+        self.prices = self.window_index.data.to_numpy(dtype=np.float64)
+        self.dates = self.window_index.index
+
+        # Centering keeps the sum-of-squares variance formula numerically stable
+        valid = ~np.isnan(self.prices)
+        self._shift = self.prices[valid].mean() if valid.any() else 0.0
+        centered = np.where(valid, self.prices - self._shift, 0.0)
+        self._count = np.concatenate(([0], np.cumsum(valid)))
+        self._sum = np.concatenate(([0.0], np.cumsum(centered)))
+        self._sumsq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    def window_moments(self, start, stop):
+        """
+        Returns the count, mean and sample variance of the prices in [start, stop).
+
+        Parameters:
+        - start, stop (np.ndarray): Positional window bounds.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray, np.ndarray]: Count, mean and variance (NaN where undefined).
+        """
+        n = (self._count[stop] - self._count[start]).astype(np.float64)
+        s1 = self._sum[stop] - self._sum[start]
+        s2 = self._sumsq[stop] - self._sumsq[start]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, s1 / n, np.nan)
+            var = np.where(n > 1, np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1), np.nan)
+        return n, mean + self._shift, var
+
+    def _price_at(self, dates, policy='nearest', tolerance_days=7):
+        """Returns the price on the trading day resolved for each date, NaN where none qualifies."""
+        pos = self.window_index.asof_positions(dates, policy=policy, tolerance_days=tolerance_days)
+        return np.where(pos >= 0, self.prices[np.maximum(pos, 0)], np.nan)
+
+    def horizon_changes(self, event_dates, days, policy='nearest', tolerance_days=7):
+        """
+        Percentage change between the prices `days` calendar days before and after each event.
+
+        Horizon dates falling on weekends or holidays are resolved to a trading day with
+        `DateWindowIndex.asof_positions`, using the given `policy` and `tolerance_days`.
+        """
+        events = self.window_index._to_datetime64(event_dates)
+        offset = np.timedelta64(int(days), 'D')
+        price_before = self._price_at(events - offset, policy, tolerance_days)
+        price_after = self._price_at(events + offset, policy, tolerance_days)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (price_after - price_before) / price_before * 100
+
+    def _cumulative_return(self, start, stop):
+        """Compounded return over [start, stop), i.e. last price / first price - 1."""
+        has_two = stop - start >= 2
+        first = self.prices[np.where(has_two, start, 0)]
+        last = self.prices[np.where(has_two, stop - 1, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(has_two, last / first - 1, np.nan)
+
+    def _ttest(self, before, after, equal_var):
+        """Two-sample t-test from window moments; Student's when `equal_var`, else Welch's."""
+        n1, m1, v1 = before
+        n2, m2, v2 = after
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if equal_var:
+                df = n1 + n2 - 2
+                pooled = ((n1 - 1) * v1 + (n2 - 1) * v2) / df
+                t_stat = (m1 - m2) / np.sqrt(pooled * (1 / n1 + 1 / n2))
+            else:
+                a, b = v1 / n1, v2 / n2
+                df = (a + b) ** 2 / (a * a / (n1 - 1) + b * b / (n2 - 1))
+                t_stat = (m1 - m2) / np.sqrt(a + b)
+            # Two-sided p-value from the t distribution's CDF (scipy.stats is slow to import)
+            p_val = 2 * stdtr(df, -np.abs(t_stat))
+        return t_stat, p_val
+
+    def compute(self, event_dates, names=None, horizons=(30, 90, 180), days_before=180, days_after=180,
+                equal_var=True, policy='nearest', tolerance_days=7):
+        """
+        Computes percentage changes, cumulative returns and t-tests for all events.
+
+        The before window is [event - days_before, event] and the after window is
+        [event, event + days_after]; both include the event date when it is a trading day.
+        `days_before` and `days_after` may be scalars or per-event arrays.
+
+        Parameters:
+        - event_dates (array-like): Event dates.
+        - names (array-like, optional): Event names; defaults to the event dates.
+        - horizons (iterable of int): Calendar-day horizons for the percentage changes.
+        - days_before, days_after (int or array-like): Window lengths in calendar days.
+        - equal_var (bool): Student's t-test when True (the scipy default), Welch's otherwise.
+        - policy (str): How horizon dates resolve to trading days, see `DateWindowIndex.asof_positions`.
+        - tolerance_days (int, optional): Maximum distance to the resolved trading day.
+
+        Returns:
+        - pd.DataFrame: One row per event.
+        """
+        events = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(event_dates)))
+        before_start, before_stop = self.window_index.bounds(events, days_before=days_before, days_after=0)
+        after_start, after_stop = self.window_index.bounds(events, days_before=0, days_after=days_after)
+
+        before = self.window_moments(before_start, before_stop)
+        after = self.window_moments(after_start, after_stop)
+        t_stat, p_val = self._ttest(before, after, equal_var)
+
+        result = pd.DataFrame({
+            "Event": list(names) if names is not None else events.strftime('%Y-%m-%d'),
+            "Date": events,
+        })
+        for days in horizons:
+            result[horizon_label(days)] = self.horizon_changes(events, days, policy, tolerance_days)
+        result["Cumulative Return Before"] = self._cumulative_return(before_start, before_stop)
+        result["Cumulative Return After"] = self._cumulative_return(after_start, after_stop)
+        result["T-Statistic"] = t_stat
+        result["P-Value"] = p_val
+        result["N Before"] = before[0].astype(np.int64)
+        result["N After"] = after[0].astype(np.int64)
+        return result
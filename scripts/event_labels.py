@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+
+class EventMembership:
+    """
+    Which events are active on each date, in compressed sparse row (CSR) form.
+
+    The events active on date i are `indices[indptr[i]:indptr[i + 1]]`, positions into
+    `events`, in order of event start. Memory is proportional to the number of
+    (date, active event) pairs, however much the events overlap.
+
+    Parameters:
+    - dates (pd.DatetimeIndex): The labelled dates, in the order they were given.
+    - events (pd.Index): Event names, ordered by start date.
+    - indptr (np.ndarray): Row pointers, one more than the number of dates.
+    - indices (np.ndarray): Event positions of every (date, event) pair.
+    """
+
+    def __init__(self, dates, events, indptr, indices):
+        self.dates = dates
+        self.events = events
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of active events on each date."""
+        return np.diff(self.indptr)
+
+    def events_at(self, i) -> list:
+        """Names of the events active on the i-th date."""
+        return self.events[self.indices[self.indptr[i]:self.indptr[i + 1]]].tolist()
+
+    def primary_codes(self) -> np.ndarray:
+        """Position of the latest-started active event on each date, -1 where none is active."""
+        counts = self.counts
+        codes = np.full(len(counts), -1, dtype=np.int64)
+        active = counts > 0
+        codes[active] = self.indices[self.indptr[1:][active] - 1]
+        return codes
+
+    def primary(self, no_event='No Event') -> pd.Categorical:
+        """One label per date: the latest-started active event, or `no_event`."""
+        labels = pd.Categorical.from_codes(self.primary_codes(), categories=self.events)
+        if no_event is None:
+            return labels
+        return labels.add_categories([no_event]).fillna(no_event)
+
+    def to_sparse(self):
+        """Boolean dates x events matrix as a `scipy.sparse.csr_matrix`."""
+        from scipy import sparse
+
+        data = np.ones(len(self.indices), dtype=bool)
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(len(self.dates), len(self.events)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Dense boolean membership frame, one column per event (for a handful of events)."""
+        return pd.DataFrame(self.to_sparse().toarray(), index=self.dates, columns=self.events)
+
+
+class EventIntervalIndex:
+    """
+    Interval index of events with inclusive [start, end] dates.
+
+    Labelling dates is vectorized: each event's covered date range is found with two
+    `searchsorted` calls, and the (date, event) pairs are laid out in CSR order with a
+    counting sort. No per-day frame is expanded, and overlapping or ended events are
+    handled exactly.
+
+    Parameters:
+    - events (pd.DataFrame): One row per event.
+    - name_col, start_col, end_col (str): Columns with the event name, start and end. A
+      missing end means the event is still ongoing.
+    """
+
+    def __init__(self, events: pd.DataFrame, name_col='Event', start_col='Start', end_col='End'):
+        starts = pd.to_datetime(events[start_col]).to_numpy(dtype='datetime64[ns]')
+        ends = pd.to_datetime(events[end_col]).to_numpy(dtype='datetime64[ns]')
+        if np.isnat(starts).any():
+            raise ValueError("Every event needs a start date.")
+        if (ends < starts).any():
+            bad = events[name_col].to_numpy()[ends < starts]
+            raise ValueError(f"Events end before they start: {', '.join(map(str, bad))}")
+
+        order = np.lexsort((ends, starts))
+        self.events = pd.Index(events[name_col].to_numpy()[order], name=name_col)
+        if not self.events.is_unique:
+            raise ValueError("Event names must be unique.")
+        self.starts = starts[order]
+        self.ends = ends[order]
+
+    def __len__(self):
+        return len(self.events)
+
+    def membership(self, dates) -> EventMembership:
+        """
+        Assigns each date all the events active on it.
+
+        Parameters:
+        - dates (array-like): Dates to label, in any order (e.g. a price frame's dates).
+
+        Returns:
+        - EventMembership: The sparse date -> events structure.
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        values = dates.to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+
+        # Each event covers the sorted date positions [lo, hi)
+        lo = np.searchsorted(sorted_values, self.starts, side='left')
+        hi = np.where(np.isnat(self.ends), len(values), np.searchsorted(sorted_values, self.ends, side='right'))
+        lengths = np.maximum(hi - lo, 0)
+        nnz = int(lengths.sum())
+
+        # Expand to (row, event) pairs without a Python loop
+        event_ids = np.repeat(np.arange(len(self.events)), lengths)
+        offsets = np.arange(nnz) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = order[np.repeat(lo, lengths) + offsets]
+
+        # Counting sort by row; the stable sort keeps events in start order within a row
+        counts = np.bincount(rows, minlength=len(values))
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        indices = event_ids[np.argsort(rows, kind='stable')]
+        return EventMembership(dates, self.events, indptr, indices)
+
+
+def label_events(price_data: pd.DataFrame, events: pd.DataFrame, no_event='No Event', **columns):
+    """
+    Adds event labels to a price frame without modifying it.
+
+    Parameters:
+    - price_data (pd.DataFrame): Prices with a 'Date' column or a date index.
+    - events (pd.DataFrame): Events, see `EventIntervalIndex`.
+    - no_event (str): Label of dates without an active event.
+    - **columns: Column names passed to `EventIntervalIndex`.
+
+    Returns:
+    - tuple[pd.DataFrame, EventMembership]: A copy of the prices with 'Event' (the
+      latest-started active event, categorical) and 'Active Events' (how many are
+      active), and the full membership for overlapping events.
+    """
+    dates = price_data['Date'] if 'Date' in price_data.columns else price_data.index
+    membership = EventIntervalIndex(events, **columns).membership(dates)
+    labelled = price_data.assign(**{'Event': membership.primary(no_event), 'Active Events': membership.counts})
+    return labelled, membership
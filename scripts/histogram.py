@@ -0,0 +1,114 @@
+import functools
+import numpy as np
+import pandas as pd
+
+# Upper bound on the number of bins of one histogram
+MAX_BINS = 10000
+
+
+def bin_labels(edges):
+    """Returns '[lo, hi)' labels for consecutive bin edges, e.g. '[10, 15)'."""
+    return [f"[{lo:g}, {hi:g})" for lo, hi in zip(edges[:-1].tolist(), edges[1:].tolist())]
+
+
+class HistogramService:
+    """
+    Price histograms over one read-only price series.
+
+    The prices are copied once into a date-sorted, read-only array, so concurrent
+    callers never modify shared data. A date range is a `searchsorted` slice, and
+    counting is a single `np.bincount`. Results are cached per bin specification
+    (bin size or edges, start, end).
+
+    Bins are half-open, [lo, hi). With a bin size they start at the floor of the
+    minimum price in the range and cover the maximum.
+
+    Parameters:
+    - price_data (pd.DataFrame or pd.Series): Prices indexed by date; a DataFrame must
+      have a 'Price' column.
+    - max_entries (int): Number of bin specifications kept in the cache.
+    """
+
+    def __init__(self, price_data, max_entries=128):
+        prices = price_data['Price'] if isinstance(price_data, pd.DataFrame) else price_data
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        valid = prices.notna().to_numpy()
+        self.dates = prices.index.values[valid].astype('datetime64[ns]')
+        self.values = prices.to_numpy(dtype=np.float64)[valid]
+        self.dates.setflags(write=False)
+        self.values.setflags(write=False)
+        self._counts = functools.lru_cache(maxsize=max_entries)(self._compute)
+
+    @staticmethod
+    def _datetime64(date):
+        """`date` as a naive datetime64[ns]; tz-aware dates are converted to UTC."""
+        date = pd.Timestamp(date)
+        if pd.isna(date):
+            raise ValueError("start and end must be valid dates.")
+        if date.tz is not None:
+            date = date.tz_convert('UTC').tz_localize(None)
+        return np.datetime64(date, 'ns')
+
+    def _slice(self, start, end):
+        lo = 0 if start is None else np.searchsorted(self.dates, start, side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, end, side='right')
+        return self.values[lo:hi]
+
+    def _compute(self, bin_size, edges, start, end):
+        values = self._slice(start, end)
+        if edges is not None:
+            edges = np.asarray(edges, dtype=np.float64)
+            # searchsorted(side='right') - 1 puts a value equal to an edge in the bin it opens
+            ids = np.searchsorted(edges, values, side='right') - 1
+            ids = ids[(ids >= 0) & (ids < len(edges) - 1)]
+            counts = np.bincount(ids, minlength=len(edges) - 1)
+        elif values.size == 0:
+            edges, counts = np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+        else:
+            origin = np.floor(values.min())
+            # Bin count checked as a float: a tiny bin_size would overflow the int64 bin ids
+            n_bins = np.floor((values.max() - origin) / bin_size) + 1
+            if not n_bins <= MAX_BINS:
+                raise ValueError(f"bin_size {bin_size:g} gives {n_bins:g} bins, more than {MAX_BINS}.")
+            n_bins = int(n_bins)
+            ids = np.floor((values - origin) / bin_size).astype(np.int64)
+            counts = np.bincount(ids, minlength=n_bins)
+            edges = origin + np.arange(n_bins + 1) * bin_size
+        edges.setflags(write=False)
+        counts.setflags(write=False)
+        return edges, counts
+
+    def counts(self, bin_size=5, edges=None, start=None, end=None):
+        """
+        Counts the prices per bin.
+
+        Parameters:
+        - bin_size (float): Bin width in USD, used when `edges` is not given.
+        - edges (array-like, optional): Strictly increasing bin edges; prices outside them are ignored.
+        - start, end (date-like, optional): Inclusive date range of the prices to count.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: Read-only bin edges (one more than bins) and counts.
+        """
+        if edges is not None:
+            edges = tuple(float(e) for e in edges)
+            if (len(edges) < 2 or len(edges) - 1 > MAX_BINS or not np.all(np.isfinite(edges))
+                    or np.any(np.diff(edges) <= 0)):
+                raise ValueError(f"edges must be 2 to {MAX_BINS + 1} finite, strictly increasing values.")
+            bin_size = None
+        elif not 0 < bin_size < np.inf:
+            raise ValueError("bin_size must be positive and finite.")
+        start = None if start is None else self._datetime64(start)
+        end = None if end is None else self._datetime64(end)
+        return self._counts(None if bin_size is None else float(bin_size), edges, start, end)
+
+    def distribution(self, bin_size=5, edges=None, start=None, end=None) -> pd.DataFrame:
+        """
+        The histogram as 'PriceRange' / 'Frequency' rows, see `counts`.
+
+        Returns:
+        - pd.DataFrame: One row per bin, labelled '[lo, hi)'.
+        """
+        edges, counts = self.counts(bin_size=bin_size, edges=edges, start=start, end=end)
+        return pd.DataFrame({'PriceRange': bin_labels(edges), 'Frequency': counts})
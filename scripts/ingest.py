@@ -0,0 +1,235 @@
+import logging
+import numpy as np
+import pandas as pd
+from price_pyramid import PricePyramid
+from price_store import normalize_price_frame, read_price_store, write_price_store
+
+
+class RunningStats:
+    """
+    Streaming count, mean and variance (Welford's algorithm).
+
+    Batches are folded in with Chan's parallel update, so appending n values costs
+    O(n) regardless of how much history was seen before.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Adds a batch of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        """Folds in the statistics of another RunningStats, as if its values had been added."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1), NaN with fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class _GrowableArray:
+    """Append-only numpy buffer with amortized O(1) appends (capacity doubling)."""
+
+    def __init__(self, dtype, capacity=1024):
+        self._buffer = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buffer.dtype)
+        needed = self._size + values.size
+        if needed > self._buffer.size:
+            grown = np.empty(max(needed, 2 * self._buffer.size), dtype=self._buffer.dtype)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size:needed] = values
+        self._size = needed
+
+    @property
+    def values(self):
+        return self._buffer[:self._size]
+
+    def __len__(self):
+        return self._size
+
+
+class IncrementalPriceIngestor:
+    """
+    Append-only store for a daily price series with incrementally maintained aggregates.
+
+    Each append updates, in time proportional to the new rows only: the overall
+    mean/variance (Welford), the daily to yearly aggregates of a `PricePyramid`,
+    histogram bin counts and prefix sums from which rolling-window statistics and the
+    CUSUM of deviations are read in O(1) per point.
+
+    Parameters:
+    - price_data (pd.DataFrame, optional): Initial history with 'Date' as index and a 'Price' column.
+    - bin_size (float): Width of the histogram bins in USD.
+    - logger (logging.Logger): Logger instance for logging messages.
+    """
+
+    def __init__(self, price_data: pd.DataFrame = None, bin_size: float = 5, logger: logging.Logger = None):
+        self.bin_size = bin_size
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self.stats = RunningStats()
+        self._dates = _GrowableArray('datetime64[ns]')
+        self._prices = _GrowableArray(np.float64)
+        # Prefix sums are kept relative to a fixed shift for numerical stability
+        self._shift = None
+        self._prefix_sum = _GrowableArray(np.float64)
+        self._prefix_sumsq = _GrowableArray(np.float64)
+        # Number of valid (non-NaN) prices, so that windows and the CUSUM skip missing prices
+        self._prefix_count = _GrowableArray(np.int64)
+        self._prefix_sum.extend([0.0])
+        self._prefix_sumsq.extend([0.0])
+        self._prefix_count.extend([0])
+        self._bin_origin = None
+        self._bins = {}
+        self.pyramid = PricePyramid()
+        if price_data is not None:
+            self.append(price_data)
+
+    @classmethod
+    def from_store(cls, path: str, **kwargs):
+        """Creates an ingestor from a columnar price store."""
+        return cls(read_price_store(path), **kwargs)
+
+    def __len__(self):
+        return len(self._prices)
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self._dates.values[-1]) if len(self) else None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The stored series as a DataFrame indexed by Date."""
+        return pd.DataFrame({'Price': self._prices.values},
+                            index=pd.DatetimeIndex(self._dates.values, name='Date'))
+
+    def save(self, path: str) -> str:
+        """Writes the stored series to a columnar price store."""
+        return write_price_store(self.data, path)
+
+    def append(self, new_rows) -> int:
+        """
+        Appends new price rows and updates every running aggregate.
+
+        Parameters:
+        - new_rows (pd.DataFrame or pd.Series): Rows indexed by (or with a column) 'Date',
+          all strictly later than the last stored date.
+
+        Returns:
+        - int: Number of rows appended.
+        """
+        if isinstance(new_rows, pd.Series):
+            new_rows = new_rows.rename('Price').to_frame()
+        if 'Date' not in new_rows.columns:
+            new_rows = new_rows.rename_axis('Date')
+        rows = normalize_price_frame(new_rows)
+        if rows.empty:
+            return 0
+        if not rows.index.is_unique:
+            raise ValueError("New rows contain duplicate dates.")
+        if len(self) and rows.index[0] <= self.last_date:
+            raise ValueError(f"New rows must start after {self.last_date.date()}, got {rows.index[0].date()}.")
+
+        dates = rows.index.values.astype('datetime64[ns]')
+        prices = rows['Price'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(prices)
+
+        self._dates.extend(dates)
+        self._prices.extend(prices)
+        self.stats.update(prices)
+        self.pyramid.append(rows)
+
+        if self._shift is None and valid.any():
+            self._shift = float(prices[valid][0])
+        centered = np.where(valid, prices - (self._shift or 0.0), 0.0)
+        self._prefix_sum.extend(self._prefix_sum.values[-1] + np.cumsum(centered))
+        self._prefix_sumsq.extend(self._prefix_sumsq.values[-1] + np.cumsum(centered * centered))
+        self._prefix_count.extend(self._prefix_count.values[-1] + np.cumsum(valid))
+
+        if self._bin_origin is None and valid.any():
+            self._bin_origin = float(np.floor(prices[valid].min()))
+        if valid.any():
+            bin_ids, bin_counts = np.unique(np.floor((prices[valid] - self._bin_origin) / self.bin_size).astype(np.int64),
+                                            return_counts=True)
+            for bin_id, count in zip(bin_ids.tolist(), bin_counts.tolist()):
+                self._bins[bin_id] = self._bins.get(bin_id, 0) + count
+
+        self.logger.info("Appended %d price rows up to %s.", len(rows), self.last_date.date())
+        return len(rows)
+
+    def yearly_averages(self) -> pd.Series:
+        """Average price per calendar year."""
+        yearly = self.pyramid.query('Y')['Mean']
+        return pd.Series(yearly.to_numpy(), index=pd.Index(yearly.index.year, name='Year'), name='Average_Price')
+
+    def histogram(self) -> pd.DataFrame:
+        """Price frequencies per bin of width `bin_size`, as 'PriceRange' / 'Frequency' rows."""
+        if not self._bins:
+            return pd.DataFrame(columns=['PriceRange', 'Frequency'])
+        first, last = min(self._bins), max(self._bins)
+        lower = self._bin_origin + np.arange(first, last + 1) * self.bin_size
+        return pd.DataFrame({
+            'PriceRange': [f"[{lo:g}, {lo + self.bin_size:g})" for lo in lower],
+            'Frequency': [self._bins.get(b, 0) for b in range(first, last + 1)],
+        })
+
+    def rolling_stats(self, window: int):
+        """
+        Mean and sample standard deviation of the valid prices among the last `window` rows, in O(1).
+
+        Returns:
+        - tuple[float, float]: Rolling mean and standard deviation (NaN if fewer than `window` rows,
+          or fewer than one and two valid prices respectively).
+        """
+        n = len(self)
+        if window < 2 or n < window or self._shift is None:
+            return np.nan, np.nan
+        count = self._prefix_count.values[n] - self._prefix_count.values[n - window]
+        if count == 0:
+            return np.nan, np.nan
+        s1 = self._prefix_sum.values[n] - self._prefix_sum.values[n - window]
+        s2 = self._prefix_sumsq.values[n] - self._prefix_sumsq.values[n - window]
+        std = np.sqrt(max(s2 - s1 * s1 / count, 0.0) / (count - 1)) if count > 1 else np.nan
+        return s1 / count + self._shift, std
+
+    def cusum(self) -> pd.Series:
+        """CUSUM of deviations from the current mean price, read from the stored prefix sums.
+
+        Missing prices add nothing: the CUSUM holds its previous value."""
+        steps = self._prefix_count.values[1:]
+        values = self._prefix_sum.values[1:] - steps * (self.stats.mean - (self._shift or 0.0))
+        return pd.Series(values, index=pd.DatetimeIndex(self._dates.values, name='Date'), name='CUSUM')
+
+    def cusum_at(self, position: int) -> float:
+        """CUSUM value at a single position (0-based) in O(1)."""
+        steps = self._prefix_count.values[position + 1]
+        return self._prefix_sum.values[position + 1] - steps * (self.stats.mean - (self._shift or 0.0))
@@ -1,10 +1,100 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+
+# One background writer per log file, shared by every SetupLogger writing to it
+_writers = {}
+_writers_lock = threading.Lock()
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line.
+
+    The object has 'time', 'name', 'level' and 'message', plus 'exception' when there
+    is a traceback and any fields passed with `extra=`.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'name': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queues a picklable copy of the record with the message merged and the traceback as text."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class _QueuedFileWriter:
+    """A rotating file handler fed through a queue by a background QueueListener thread."""
+
+    def __init__(self, path, max_bytes, backup_count, json_format):
+        self.file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                                 backupCount=backup_count, encoding='utf-8')
+        self.file_handler.setFormatter(JsonFormatter() if json_format else
+                                       logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = _QueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, self.file_handler)
+        self.listener.start()
+
+    def stop(self):
+        """Writes the queued records and closes the file."""
+        self.listener.stop()
+        self.file_handler.close()
+
+
+def shutdown():
+    """Flushes and stops every background log writer; runs automatically at exit."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger) and writer.queue_handler in logger.handlers:
+                logger.removeHandler(writer.queue_handler)
+        writer.stop()
+
+
+atexit.register(shutdown)
+
 
 class SetupLogger:
     """
     A class to set up logging for the application.
 
+    Records are put on an in-memory queue and written to the file by a background
+    thread, so logging never blocks the caller on disk I/O. The file is rotated once
+    it reaches `max_bytes`. Setting up the same log file again (e.g. re-running a
+    notebook cell) reuses its writer and never adds a second handler, so each record
+    is written once.
+
     Attributes:
     ----------
     log_file : str
@@ -13,7 +103,8 @@ class SetupLogger:
         The level of logging, default is logging.INFO.
     """
 
-    def __init__(self, log_file='logs/app.log', log_level=logging.INFO):
+    def __init__(self, log_file='logs/app.log', log_level=logging.INFO, name=__name__,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, json_format=False):
         """
         Initializes the logger with a specified log file and level.
 
@@ -23,25 +114,29 @@ class SetupLogger:
             The name of the file to save logs.
         log_level : logging level, optional
             The logging level (default is logging.INFO).
+        name : str, optional
+            Name of the configured logger (default is this module's name).
+        max_bytes : int, optional
+            Size at which the file is rotated (default 10 MiB); 0 never rotates.
+        backup_count : int, optional
+            Number of rotated files kept (default 5).
+        json_format : bool, optional
+            Write one JSON object per record instead of plain text lines. The format of
+            a file is fixed by the first SetupLogger that opens it.
         """
-        # Ensure the directory exists
-        log_dir = os.path.dirname(log_file)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(log_level)
-
-        # Create a file handler for logging
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(log_level)
+        path = os.path.abspath(log_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        # Define the logging format
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
+        with _writers_lock:
+            writer = _writers.get(path)
+            if writer is None:
+                writer = _writers[path] = _QueuedFileWriter(path, max_bytes, backup_count, json_format)
 
-        # Add the handler to the logger
-        self.logger.addHandler(file_handler)
+        self.log_file = log_file
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(log_level)
+        if writer.queue_handler not in self.logger.handlers:
+            self.logger.addHandler(writer.queue_handler)
 
     def get_logger(self):
         """
@@ -52,4 +147,4 @@ class SetupLogger:
         logger : logging.Logger
             The configured logger instance.
         """
-        return self.logger
\ No newline at end of file
+        return self.logger
@@ -1,11 +1,15 @@
 import pandas as pd
-import gdown
+import filecmp
 import os
-from IPython.display import display  # Import display for better output in notebooks
+import shutil
 import logging
+from price_store import read_price_store, store_path_for, write_price_store
+from data_cache import DatasetCache, GoogleDriveFetcher
+from data_profiler import DEFAULT_CHUNKSIZE, profile_source
 
 class DataPreprocessor:
-    def __init__(self, drive_link: str, output_dir: str = '../data/', output_file: str = 'data.csv', logger: logging.Logger = None):
+    def __init__(self, drive_link: str, output_dir: str = '../data/', output_file: str = 'data.csv', logger: logging.Logger = None,
+                 cache_dir: str = None, max_age: float = 24 * 3600, offline: bool = False, fetcher=None):
         """
         Initialize the DataPreprocessor class with the Google Drive link to the dataset.
         
@@ -14,17 +18,28 @@ class DataPreprocessor:
         output_dir (str): The directory where the data file will be saved.
         output_file (str): The local file name to save the downloaded data.
         logger (logging.Logger): Logger for tracking events and errors.
+        cache_dir (str): Directory of the download cache, defaults to '.cache' inside output_dir.
+        max_age (float): Seconds a cached download is used without re-fetching; None always re-fetches.
+        offline (bool): Load from the cache only, without contacting the source.
+        fetcher: Fetcher used instead of Google Drive, e.g. a LocalFileFetcher or HttpFetcher.
         """
         self.drive_link = drive_link
         self.output_dir = output_dir
         self.output_file = os.path.join(self.output_dir, output_file)
         self.data: pd.DataFrame = None
         self.logger = logger if logger else logging.getLogger(__name__)
+        self.cache = DatasetCache(cache_dir or os.path.join(self.output_dir, '.cache'), logger=self.logger)
+        self.max_age = max_age
+        self.offline = offline
+        self.fetcher = fetcher
 
     def load_data(self) -> pd.DataFrame:
         """
         Load the dataset from Google Drive, save it in the specified directory,
         and read it into a pandas DataFrame.
+
+        Downloads go through the local dataset cache, so the file is only fetched
+        again once the cached copy is older than max_age.
         
         Returns:
         pd.DataFrame: The loaded dataset.
@@ -34,16 +49,14 @@ class DataPreprocessor:
             os.makedirs(self.output_dir, exist_ok=True)
             self.logger.info(f"Directory checked/created: {self.output_dir}")
             
-            # Convert the Google Drive shareable link to a downloadable link
-            file_id = self.drive_link.split('/')[-2]
-            download_url = f'https://drive.google.com/uc?export=download&id={file_id}'
-            
-            # Log the download attempt
-            self.logger.info("Starting download from Google Drive.")
-            
-            # Download the file
-            gdown.download(download_url, self.output_file, quiet=False)
-            self.logger.info(f"File downloaded successfully to {self.output_file}.")
+            # Resolve the file through the download cache
+            fetcher = self.fetcher or GoogleDriveFetcher(self.drive_link)
+            cached_file = self.cache.get(fetcher, max_age=self.max_age, offline=self.offline)
+
+            # Only rewrite the output file when its content changed, keeping its mtime stable
+            if not os.path.exists(self.output_file) or not filecmp.cmp(cached_file, self.output_file, shallow=False):
+                shutil.copyfile(cached_file, self.output_file)
+                self.logger.info(f"File saved to {self.output_file}.")
 
             # Load data into a pandas DataFrame
             self.data = pd.read_csv(self.output_file)
@@ -58,33 +71,73 @@ class DataPreprocessor:
             raise
 
 
-    def inspect(self, df: pd.DataFrame) -> pd.DataFrame:
+    def save_price_store(self, path: str = None) -> str:
+        """
+        Normalize the loaded data once and save it as a typed columnar (Feather) file.
+
+        Parameters:
+        path (str): Destination file, defaults to the output file with a .feather extension.
+
+        Returns:
+        str: The path of the written store.
+        """
+        if self.data is None:
+            raise ValueError("No data loaded. Call load_data() first.")
+        path = path or store_path_for(self.output_file)
+        write_price_store(self.data, path)
+        self.logger.info(f"Price store written to {path}.")
+        return path
+
+    def load_price_store(self, path: str = None) -> pd.DataFrame:
+        """
+        Load the columnar price store through a memory-mapped, zero-copy read.
+
+        Parameters:
+        path (str): Store file, defaults to the output file with a .feather extension.
+
+        Returns:
+        pd.DataFrame: Price data indexed by Date.
+        """
+        path = path or store_path_for(self.output_file)
+        self.data = read_price_store(path)
+        self.logger.info(f"Price store loaded from {path}.")
+        return self.data
+
+    def inspect(self, df: pd.DataFrame = None, chunksize: int = DEFAULT_CHUNKSIZE, **profile_options) -> dict:
         """
-        Inspect the given DataFrame for structure, completeness, and summary statistics.
+        Inspect a DataFrame, or the downloaded data file, for structure, completeness and summary statistics.
+
+        The data is profiled in one streaming pass over chunks (see `data_profiler.py`), so
+        files larger than memory can be checked before they are loaded. The findings are
+        printed and returned.
 
         Parameters:
-        - df (pd.DataFrame): The DataFrame to inspect.
+        - df (pd.DataFrame, optional): The DataFrame to inspect; the output file is read in chunks when omitted.
+        - chunksize (int): Rows profiled per chunk.
+        - **profile_options: Passed to `DataProfiler`, e.g. date_format or gap_threshold.
 
         Returns:
-        - pd.DataFrame: Summary statistics for numeric columns.
+        - dict: The profile report, see `DataProfiler.report`.
         """
-        if df.empty:
+        if df is not None and df.empty:
             raise ValueError("The DataFrame is empty.")
 
         try:
-            # Check and display the dimensions of the DataFrame
-            dimensions = df.shape
+            report = profile_source(self.output_file if df is None else df, chunksize=chunksize,
+                                    logger=self.logger, **profile_options)
+            if report['rows'] == 0:
+                raise ValueError("The dataset is empty.")
+            columns = pd.DataFrame.from_dict(report['columns'], orient='index')
+
+            # Dimensions and data types of each column
+            dimensions = (report['rows'], len(columns))
             print(f"Dimensions (rows, columns): {dimensions}")
             self.logger.info(f"DataFrame dimensions: {dimensions}")
-
-            # Check and display data types of each column
-            data_types = df.dtypes
             print("\nData Types:")
-            print(data_types)
-            self.logger.info("Displayed data types for each column.")
+            print(columns['dtype'])
 
-            # Check for missing values in each column
-            missing_values = df.isnull().sum()
+            # Missing values in each column
+            missing_values = columns['missing']
             if missing_values.any():
                 print("\nMissing Values:")
                 print(missing_values[missing_values > 0])
@@ -93,29 +146,38 @@ class DataPreprocessor:
                 print("\nNo missing values found.")
                 self.logger.info("No missing values detected.")
 
-            # Check and display the count of unique values for each column
-            unique_values = df.nunique()
-            print("\nUnique Values in Each Column:")
-            print(unique_values)
-            
-            # Count the number of duplicate rows
-            duplicate_count = df.duplicated().sum()
+            # Distinct values per column (HyperLogLog estimates)
+            print("\nUnique Values in Each Column (estimated):")
+            print(columns['distinct'])
+
+            # Duplicate rows, with the first few as examples
+            duplicate_count = report['duplicate_rows']
             print(f"Number of duplicate rows: {duplicate_count}")
             self.logger.info(f"Duplicate rows found: {duplicate_count}")
-
-            # View duplicate rows if any
             if duplicate_count > 0:
-                duplicates = df[df.duplicated()]
                 print("Duplicate rows:")
-                print(duplicates)
+                print(pd.DataFrame(report['duplicate_examples']))
 
+            # Order and gaps of the dates
+            dates = report['dates']
+            if dates is not None:
+                print(f"\nDates: {dates['min']} to {dates['max']}, {dates['missing']} missing "
+                      f"({dates['unparsed']} unparseable), {dates['out_of_order']} out of order, "
+                      f"{dates['repeated']} repeated, {dates['gaps']} gaps longer than {dates['gap_threshold']}.")
+                if not dates['monotonic']:
+                    self.logger.warning("Dates are not in increasing order.")
 
             # Summary statistics for numeric columns
-            summary_statistics = df.describe(include='number')
+            numeric = [name for name, column in report['columns'].items() if 'mean' in column]
+            summary_statistics = columns.loc[numeric, ['count', 'mean', 'std', 'min', 'max']].T
             print("\nSummary Statistics for Numeric Columns:")
+            try:
+                from IPython.display import display  # Rich table in notebooks
+            except ImportError:
+                display = print
             display(summary_statistics)  # Display as a DataFrame
-            
-            # return summary_statistics  # Return for further use if needed
+
+            return report
 
         except Exception as e:
             self.logger.error(f"An error occurred while inspecting the dataset: {e}")
@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+
+# Aggregation levels, finest first
+PYRAMID_FREQS = ('D', 'W', 'M', 'Q', 'Y')
+
+# Level each one is aggregated from; weeks do not nest in months, so they hang off the days
+_PARENT = {'W': 'D', 'M': 'D', 'Q': 'M', 'Y': 'Q'}
+
+# Levels whose buckets nest in each other, used to split a date range into whole buckets
+_CHAIN = ('Y', 'Q', 'M', 'D')
+
+_FIELDS = ('open', 'high', 'low', 'close', 'count', 'sum', 'sumsq')
+
+_FREQ_ALIASES = {'B': 'D', 'ME': 'M', 'MS': 'M', 'QE': 'Q', 'QS': 'Q', 'YE': 'Y', 'YS': 'Y', 'A': 'Y'}
+
+
+def normalize_freq(freq) -> str:
+    """Maps 'd', 'ME', 'YE', ... to one of PYRAMID_FREQS; raises ValueError otherwise."""
+    key = str(freq).upper()
+    key = _FREQ_ALIASES.get(key, key)
+    if key not in PYRAMID_FREQS:
+        raise ValueError(f"freq must be one of {', '.join(PYRAMID_FREQS)}, got {freq!r}.")
+    return key
+
+
+def bucket_start(days, freq):
+    """First day (datetime64[D]) of the `freq` bucket containing each day; weeks start on Monday."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    if freq == 'D':
+        return days
+    if freq == 'W':
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return days - (days.view(np.int64) + 3) % 7
+    if freq == 'M':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    if freq == 'Q':
+        months = days.astype('datetime64[M]').view(np.int64)
+        return (months - months % 3).astype('datetime64[M]').astype('datetime64[D]')
+    return days.astype('datetime64[Y]').astype('datetime64[D]')
+
+
+def bucket_end(days, freq):
+    """First day after the `freq` bucket containing each day."""
+    starts = bucket_start(days, freq)
+    if freq == 'D':
+        return starts + 1
+    if freq == 'W':
+        return starts + 7
+    months = starts.astype('datetime64[M]')
+    if freq == 'M':
+        return (months + 1).astype('datetime64[D]')
+    if freq == 'Q':
+        return (months + 3).astype('datetime64[D]')
+    return (starts.astype('datetime64[Y]') + 1).astype('datetime64[D]')
+
+
+def _empty_level():
+    level = {'start': np.array([], dtype='datetime64[D]'), 'count': np.array([], dtype=np.int64)}
+    level.update((field, np.array([], dtype=np.float64)) for field in _FIELDS if field != 'count')
+    return level
+
+
+def _aggregate(level, keys):
+    """Combines consecutive rows of `level` with equal (sorted) `keys` into one row per key."""
+    if keys.size == 0:
+        return _empty_level()
+    first = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    last = np.append(first[1:], keys.size) - 1
+    return {
+        'start': keys[first],
+        'open': level['open'][first],
+        'high': np.maximum.reduceat(level['high'], first),
+        'low': np.minimum.reduceat(level['low'], first),
+        'close': level['close'][last],
+        'count': np.add.reduceat(level['count'], first),
+        'sum': np.add.reduceat(level['sum'], first),
+        'sumsq': np.add.reduceat(level['sumsq'], first),
+    }
+
+
+class PricePyramid:
+    """
+    Pre-aggregated price bars at daily, weekly, monthly, quarterly and yearly resolution.
+
+    Every level stores, per bucket, the open, high, low and close price, the count,
+    and the sum and sum of squares of the prices (relative to a fixed shift for
+    numerical stability). Days are built from the prices, weeks and months from the
+    days, quarters from the months and years from the quarters. Appending prices only
+    rebuilds the last bucket of each level plus the new ones.
+
+    A query returns the whole buckets of its level as a slice. A bucket cut by the
+    start or end of the range is combined from the coarsest whole buckets inside the
+    cut (e.g. 1999-03-15 to 1999-12-31 is days 15-31 of March, then the months of
+    April to June, then two quarters), so it costs O(log n + buckets returned) however
+    long the history is.
+
+    Ranges are whole days: intraday prices are aggregated into the day they fall on.
+
+    Parameters:
+    - price_data (pd.DataFrame or pd.Series, optional): Prices indexed by date; a DataFrame
+      must have a 'Price' column.
+    """
+
+    def __init__(self, price_data=None):
+        self.levels = {freq: _empty_level() for freq in PYRAMID_FREQS}
+        self.shift = None
+        self.last_timestamp = None
+        if price_data is not None:
+            self.append(price_data)
+
+    def __len__(self):
+        return int(self.levels['D']['count'].sum())
+
+    @property
+    def empty(self):
+        return self.levels['D']['start'].size == 0
+
+    def append(self, new_rows) -> int:
+        """
+        Adds prices later than the last stored one and updates every level.
+
+        Parameters:
+        - new_rows (pd.DataFrame or pd.Series): Prices indexed by date; a DataFrame must have a
+          'Price' column. NaN prices are skipped.
+
+        Returns:
+        - int: Number of prices added.
+        """
+        prices = new_rows['Price'] if isinstance(new_rows, pd.DataFrame) else new_rows
+        prices = prices.dropna()
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        if prices.empty:
+            return 0
+        timestamps = prices.index.values.astype('datetime64[ns]')
+        if self.last_timestamp is not None and timestamps[0] <= self.last_timestamp:
+            raise ValueError(f"New prices must start after {pd.Timestamp(self.last_timestamp)}, "
+                             f"got {pd.Timestamp(timestamps[0])}.")
+        values = prices.to_numpy(dtype=np.float64)
+        if self.shift is None:
+            self.shift = float(values[0])
+        centered = values - self.shift
+        rows = {'open': values, 'high': values, 'low': values, 'close': values,
+                'count': np.ones(values.size, dtype=np.int64), 'sum': centered, 'sumsq': centered * centered}
+
+        days = self.levels['D']
+        first_day = timestamps[0].astype('datetime64[D]')
+        # The first new price may fall on the last stored day; that day is rebuilt
+        if days['start'].size and days['start'][-1] == first_day:
+            rows = {field: np.concatenate([days[field][-1:], rows[field]]) for field in _FIELDS}
+            keys = np.concatenate([[first_day], timestamps.astype('datetime64[D]')])
+            changed = {'D': days['start'].size - 1}
+        else:
+            keys = timestamps.astype('datetime64[D]')
+            changed = {'D': days['start'].size}
+        self._replace_tail('D', changed['D'], _aggregate(rows, keys))
+
+        for freq in PYRAMID_FREQS[1:]:
+            parent = self.levels[_PARENT[freq]]
+            # Rebuild from the bucket containing the first changed row of the parent level
+            key = bucket_start(parent['start'][changed[_PARENT[freq]]:][:1], freq)[0]
+            level = self.levels[freq]
+            changed[freq] = int(np.searchsorted(level['start'], key))
+            tail = {field: column[np.searchsorted(parent['start'], key):] for field, column in parent.items()}
+            self._replace_tail(freq, changed[freq], _aggregate(tail, bucket_start(tail['start'], freq)))
+
+        self.last_timestamp = timestamps[-1]
+        return int(values.size)
+
+    def _replace_tail(self, freq, position, rows):
+        level = self.levels[freq]
+        self.levels[freq] = {field: np.concatenate([values[:position], rows[field]])
+                             for field, values in level.items()}
+
+    def _cover(self, first, end, chain=_CHAIN):
+        """(freq, from, to) day ranges, in order, splitting days [first, end) into the coarsest whole buckets."""
+        if first >= end:
+            return []
+        freq, finer = chain[0], chain[1:]
+        if not finer:
+            return [(freq, first, end)]
+        # Whole buckets of this level start in [lo, hi); the rest is split at the finer levels
+        lo, hi = bucket_end(first - 1, freq), bucket_start(end, freq)
+        if lo >= hi:
+            return self._cover(first, end, finer)
+        return self._cover(first, lo, finer) + [(freq, lo, hi)] + self._cover(hi, end, finer)
+
+    def _combine(self, first, last):
+        """One row (dict of fields) for days first..last, or None when they have no prices."""
+        parts = []
+        for freq, lo, hi in self._cover(first, last + 1):
+            level = self.levels[freq]
+            i, j = np.searchsorted(level['start'], [lo, hi])
+            if j > i:
+                parts.append({field: level[field][i:j] for field in _FIELDS})
+        if not parts:
+            return None
+        rows = {field: np.concatenate([part[field] for part in parts]) for field in _FIELDS}
+        return {
+            'open': rows['open'][0],
+            'high': rows['high'].max(),
+            'low': rows['low'].min(),
+            'close': rows['close'][-1],
+            'count': rows['count'].sum(),
+            'sum': rows['sum'].sum(),
+            'sumsq': rows['sumsq'].sum(),
+        }
+
+    def _days(self, start, end):
+        days = self.levels['D']['start']
+        first = days[0] if start is None else np.datetime64(pd.Timestamp(start).date(), 'D')
+        last = days[-1] if end is None else np.datetime64(pd.Timestamp(end).date(), 'D')
+        return first, last
+
+    def query(self, freq='M', start=None, end=None, label='start') -> pd.DataFrame:
+        """
+        Price bars at one resolution over an inclusive date range.
+
+        Parameters:
+        - freq (str): 'D', 'W' (weeks from Monday), 'M', 'Q' or 'Y'; pandas aliases such as 'ME' work too.
+        - start, end (date-like, optional): First and last day; the whole history by default.
+          Buckets cut by the range only aggregate the days inside it.
+        - label (str): Date of each bucket in the index: its first day ('start') or last day ('end').
+
+        Returns:
+        - pd.DataFrame: 'Open', 'High', 'Low', 'Close', 'Mean', 'Std' (sample), 'Count' and 'Sum'
+          per bucket with prices, indexed by 'Date'.
+        """
+        freq = normalize_freq(freq)
+        if label not in ('start', 'end'):
+            raise ValueError("label must be 'start' or 'end'.")
+        if self.empty:
+            return self._frame(_empty_level(), freq, label)
+        first, last = self._days(start, end)
+        if first > last:
+            return self._frame(_empty_level(), freq, label)
+
+        level = self.levels[freq]
+        first_bucket, last_bucket = bucket_start(first, freq), bucket_start(last, freq)
+        cut_first, cut_last = first_bucket != first, bucket_end(last, freq) != last + 1
+        if first_bucket == last_bucket and (cut_first or cut_last):
+            parts = [self._edge(first, last, first_bucket)]
+        else:
+            # Buckets lying entirely inside the range come straight from the level
+            lo = np.searchsorted(level['start'], bucket_end(first, freq) if cut_first else first)
+            hi = np.searchsorted(level['start'], last_bucket if cut_last else last + 1)
+            parts = [{field: column[lo:max(lo, hi)] for field, column in level.items()}]
+            if cut_first:
+                parts.insert(0, self._edge(first, bucket_end(first, freq) - 1, first_bucket))
+            if cut_last:
+                parts.append(self._edge(last_bucket, last, last_bucket))
+        parts = [part for part in parts if part is not None]
+        rows = {field: np.concatenate([part[field] for part in parts]) if parts else _empty_level()[field]
+                for field in ('start',) + _FIELDS}
+        return self._frame(rows, freq, label)
+
+    def _edge(self, first, last, start):
+        row = self._combine(first, last)
+        if row is None:
+            return None
+        return {'start': np.array([start], dtype='datetime64[D]'),
+                **{field: np.array([value]) for field, value in row.items()}}
+
+    def summary(self, start=None, end=None) -> dict:
+        """
+        Open, high, low, close, mean, std, count and sum of the prices over an inclusive
+        date range, combined from at most a few dozen buckets.
+        """
+        if self.empty:
+            return None
+        first, last = self._days(start, end)
+        row = self._edge(first, last, first) if first <= last else None
+        if row is None:
+            return None
+        frame = self._frame(row, 'D', 'start')
+        return {name.lower(): frame[name].iloc[0].item() for name in frame.columns}
+
+    def _frame(self, rows, freq, label):
+        count = rows['count'].astype(np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = rows['sum'] / count
+            variance = (rows['sumsq'] - rows['sum'] * mean) / (count - 1)
+        shift = self.shift or 0.0
+        dates = rows['start'] if label == 'start' else bucket_end(rows['start'], freq) - 1
+        return pd.DataFrame({
+            'Open': rows['open'],
+            'High': rows['high'],
+            'Low': rows['low'],
+            'Close': rows['close'],
+            'Mean': mean + shift,
+            'Std': np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan),
+            'Count': count,
+            'Sum': rows['sum'] + count * shift,
+        }, index=pd.DatetimeIndex(dates.astype('datetime64[ns]'), name='Date'))
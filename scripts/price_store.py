@@ -0,0 +1,104 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError as e:
+        raise ImportError("The columnar price store requires pyarrow: pip install pyarrow") from e
+    return pa, feather
+
+
+def normalize_price_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalizes raw price data into the typed layout of the columnar store.
+
+    Parameters:
+    - df (pd.DataFrame): Price data with a 'Date' column or index and a 'Price' column.
+
+    Returns:
+    - pd.DataFrame: Frame sorted by a datetime64[ns] 'Date' index, with a float64 'Price'
+      column and any text columns (such as 'Event') stored as categoricals.
+    """
+    df = df.reset_index() if 'Date' not in df.columns else df.copy()
+    if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'].astype(str).str.strip(), format='mixed', errors='coerce')
+    df['Date'] = df['Date'].astype('datetime64[ns]')
+    df = df.dropna(subset=['Date'])
+    df['Price'] = pd.to_numeric(df['Price'], errors='coerce').astype(np.float64)
+    for column in df.columns:
+        if column not in ('Date', 'Price') and (df[column].dtype == object or pd.api.types.is_string_dtype(df[column])):
+            df[column] = df[column].astype('category')
+    return df.sort_values('Date', kind='stable').set_index('Date')
+
+
+def write_price_store(df: pd.DataFrame, path: str) -> str:
+    """
+    Writes normalized price data to an uncompressed Feather (Arrow IPC) file.
+
+    The file is left uncompressed so that readers can memory-map it and share the
+    pages between processes.
+
+    Parameters:
+    - df (pd.DataFrame): Price data; it is normalized with `normalize_price_frame`.
+    - path (str): Destination file.
+
+    Returns:
+    - str: The path written.
+    """
+    pa, feather = _require_pyarrow()
+    table = pa.Table.from_pandas(normalize_price_frame(df).reset_index(), preserve_index=False)
+    # Write to a temporary file first so readers never map a half-written store. The name
+    # is unique, so processes rebuilding the store at the same time never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_price_store(path: str, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Reads a price store written by `write_price_store`.
+
+    With `memory_map`, the file is mapped instead of read, so numeric columns are
+    converted without copying and concurrent processes share the same pages.
+
+    Parameters:
+    - path (str): Store file.
+    - memory_map (bool): Whether to memory-map the file.
+
+    Returns:
+    - pd.DataFrame: Price data indexed by 'Date'.
+    """
+    pa, feather = _require_pyarrow()
+    if memory_map:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    else:
+        table = feather.read_table(path, memory_map=False)
+    df = table.to_pandas(split_blocks=True)
+    return df.set_index('Date')
+
+
+def store_path_for(csv_path: str) -> str:
+    """Returns the default columnar store location for a CSV file, e.g. data.csv -> data.feather."""
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def is_store_fresh(store_path: str, source_path: str) -> bool:
+    """Whether the store exists and is at least as new as the source file it was built from."""
+    if not os.path.exists(store_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(source_path)
@@ -0,0 +1,226 @@
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class PlotSpec:
+    """
+    Everything needed to draw one figure, without any matplotlib state.
+
+    Analysis code returns specs; `show` draws them interactively and `PlotRenderer`
+    writes them to files, in this process or in a pool of headless workers. Specs
+    are plain data, so they pickle cheaply to worker processes.
+
+    Kinds and their `data`:
+    - 'line': dict of label -> pd.Series (x is the index).
+    - 'bar': pd.Series of bar heights indexed by label.
+    - 'grouped_bar': pd.DataFrame, one group of bars per row and one bar per column.
+    - 'hist': tuple (edges, counts).
+    - 'box': pd.Series of values.
+    - 'panels': list of PlotSpec drawn as vertically stacked axes.
+
+    Parameters:
+    - kind (str): One of the kinds above.
+    - data: The data to draw.
+    - title, xlabel, ylabel (str): Axis labels.
+    - figsize (tuple): Figure size in inches.
+    - **options: Drawing options: 'vlines' (x positions of dashed red lines), 'annotations'
+      (list of (x, y, text)), 'colors' (dict label -> color), 'color', 'grid' ('both', 'y'
+      or False), 'legend' (bool or title), 'rotation' (x tick label angle).
+    """
+
+    def __init__(self, kind, data, title='', xlabel='', ylabel='', figsize=(10, 4), **options):
+        if kind not in DRAWERS and kind != 'panels':
+            raise ValueError(f"Unknown plot kind: {kind!r}")
+        self.kind = kind
+        self.data = data
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.figsize = tuple(figsize)
+        self.options = options
+
+
+def _draw_line(ax, spec):
+    colors = spec.options.get('colors', {})
+    for label, series in spec.data.items():
+        ax.plot(series.index, series.to_numpy(), label=label, color=colors.get(label, spec.options.get('color')))
+
+
+def _draw_bar(ax, spec):
+    labels = [str(label) for label in spec.data.index]
+    ax.bar(labels, spec.data.to_numpy(), color=spec.options.get('color'))
+
+
+def _draw_grouped_bar(ax, spec):
+    frame = spec.data
+    positions = np.arange(len(frame))
+    width = 0.8 / max(len(frame.columns), 1)
+    for i, column in enumerate(frame.columns):
+        ax.bar(positions + (i - (len(frame.columns) - 1) / 2) * width, frame[column].to_numpy(dtype=np.float64),
+               width=width, label=str(column))
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(label) for label in frame.index])
+
+
+def _draw_hist(ax, spec):
+    edges, counts = spec.data
+    ax.stairs(counts, edges, fill=True, color=spec.options.get('color'))
+
+
+def _draw_box(ax, spec):
+    values = np.asarray(spec.data, dtype=np.float64)
+    ax.boxplot(values[~np.isnan(values)])
+    ax.set_xticks([])
+
+
+DRAWERS = {
+    'line': _draw_line,
+    'bar': _draw_bar,
+    'grouped_bar': _draw_grouped_bar,
+    'hist': _draw_hist,
+    'box': _draw_box,
+}
+
+
+def draw(spec, ax):
+    """Draws a single-axes spec onto a matplotlib Axes."""
+    DRAWERS[spec.kind](ax, spec)
+    for x in spec.options.get('vlines', ()):
+        ax.axvline(x, color='red', linestyle='--', linewidth=0.8)
+    for x, y, text in spec.options.get('annotations', ()):
+        ax.text(x, y, text, color='red', fontsize=10)
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+    legend = spec.options.get('legend', False)
+    if legend:
+        ax.legend(title=legend if isinstance(legend, str) else None)
+    grid = spec.options.get('grid', False)
+    if grid:
+        ax.grid(axis=grid if grid in ('x', 'y') else 'both')
+    if spec.options.get('rotation'):
+        ax.tick_params(axis='x', labelrotation=spec.options['rotation'])
+
+
+def draw_figure(spec, fig):
+    """Clears `fig` and draws the spec (or its panels) on it."""
+    fig.clear()
+    fig.set_size_inches(spec.figsize)
+    panels = spec.data if spec.kind == 'panels' else [spec]
+    for i, panel in enumerate(panels):
+        draw(panel, fig.add_subplot(len(panels), 1, i + 1))
+    if spec.kind == 'panels' and spec.title:
+        fig.suptitle(spec.title)
+    fig.tight_layout()
+    return fig
+
+
+def show(spec):
+    """Draws a spec on a new pyplot figure and shows it (interactive use, e.g. notebooks)."""
+    import matplotlib.pyplot as plt
+
+    draw_figure(spec, plt.figure(figsize=spec.figsize))
+    plt.show()
+
+
+def output(spec, name, renderer=None):
+    """Shows a spec, or queues it on `renderer` (headless mode) under `name`. Returns the spec."""
+    if renderer is not None:
+        renderer.submit(spec, name)
+    else:
+        show(spec)
+    return spec
+
+
+def slugify(text):
+    """File-name-safe version of a label, e.g. 'Arab Spring (2010)' -> 'arab_spring_2010'."""
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_') or 'plot'
+
+
+# Per-process Agg figures, reused between specs of the same size
+_figures = {}
+
+
+def _render(spec, path, dpi, reuse_figures):
+    """Draws a spec into a file with the Agg canvas; runs in the calling process or a worker."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = _figures.get((spec.figsize, dpi)) if reuse_figures else None
+    if fig is None:
+        # Figure + FigureCanvasAgg bypasses pyplot: no GUI backend and no global figure registry
+        fig = Figure(figsize=spec.figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        if reuse_figures:
+            _figures[spec.figsize, dpi] = fig
+    draw_figure(spec, fig)
+    fig.savefig(path, dpi=dpi)
+    if reuse_figures:
+        fig.clear()
+    return path
+
+
+class PlotRenderer:
+    """
+    Headless renderer that writes `PlotSpec`s to image files.
+
+    Figures are drawn on the Agg canvas without pyplot, so no display or interactive
+    backend is needed and nothing blocks. Specs queued with `submit` are rendered
+    together by `flush`, spread over a process pool when `workers` > 1. Each process
+    reuses one figure per figure size instead of creating a new one for every plot.
+
+    Parameters:
+    - output_dir (str): Directory the files are written to (created if missing).
+    - workers (int): Worker processes for `flush`; 0 or 1 renders in this process.
+    - fmt (str): Image format / file extension, e.g. 'png', 'svg', 'pdf'.
+    - dpi (int): Resolution of raster formats.
+    - reuse_figures (bool): Whether to reuse figure objects between plots.
+    - logger (logging.Logger): Logger instance for logging messages.
+    """
+
+    def __init__(self, output_dir, workers=0, fmt='png', dpi=100, reuse_figures=True, logger=None):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.fmt = fmt
+        self.dpi = dpi
+        self.reuse_figures = reuse_figures
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self._queue = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def path_for(self, name):
+        return os.path.join(self.output_dir, f"{slugify(name)}.{self.fmt}")
+
+    def render(self, spec, name):
+        """Renders one spec now, in this process. Returns the file path."""
+        return _render(spec, self.path_for(name), self.dpi, self.reuse_figures)
+
+    def submit(self, spec, name):
+        """Queues a spec for the next `flush`. Returns the path the file will be written to."""
+        path = self.path_for(name)
+        self._queue.append((spec, path))
+        return path
+
+    def flush(self):
+        """
+        Renders every queued spec.
+
+        Returns:
+        - list[str]: The written file paths, in submission order.
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        if self.workers and self.workers > 1 and len(queue) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(queue))) as pool:
+                futures = [pool.submit(_render, spec, path, self.dpi, self.reuse_figures) for spec, path in queue]
+                paths = [future.result() for future in futures]
+        else:
+            paths = [_render(spec, path, self.dpi, self.reuse_figures) for spec, path in queue]
+        self.logger.info("Rendered %d plots to %s.", len(paths), self.output_dir)
+        return paths
+
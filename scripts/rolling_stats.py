@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+# Statistics computed by RollingStats.compute, in output column order
+ROLLING_STATS = ('mean', 'std', 'volatility', 'drawdown', 'zscore')
+
+# Upper bound on the number of windows of one request
+MAX_WINDOWS = 50
+
+
+class RollingStats:
+    """
+    Rolling statistics of one price series for many window sizes at once.
+
+    Prefix sums of the prices, their squares, the log returns and their squares are
+    built once; every window's mean, standard deviation and volatility is then read
+    from them in O(1) per point, whatever the window size. Drawdowns use a running
+    maximum filter, which is O(n) per window. The input frame is never modified: the
+    prices are copied once into read-only arrays.
+
+    Windows count rows (trading days), like `pd.Series.rolling(window)`; missing prices
+    are dropped first, and a point needs a full window of history (NaN before that).
+
+    Parameters:
+    - price_data (pd.DataFrame or pd.Series): Prices indexed by date; a DataFrame must
+      have a 'Price' column.
+    - periods_per_year (int): Periods used to annualize the log-return volatility;
+      None leaves it per period.
+    """
+
+    def __init__(self, price_data, periods_per_year=252):
+        prices = price_data['Price'] if isinstance(price_data, pd.DataFrame) else price_data
+        prices = prices.dropna()
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        self.periods_per_year = periods_per_year
+        self.dates = pd.DatetimeIndex(prices.index, name='Date')
+        self.values = prices.to_numpy(dtype=np.float64).copy()
+        self.values.setflags(write=False)
+
+        # Sums are taken around the mean, which keeps the variance differences accurate
+        self._shift = float(self.values.mean()) if len(self.values) else 0.0
+        centered = self.values - self._shift
+        self._sum = self._prefix(centered)
+        self._sumsq = self._prefix(centered * centered)
+
+        # returns[i] is the log return into row i; row 0 has none
+        returns = np.zeros(len(self.values))
+        if len(self.values) > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = np.diff(np.log(self.values))
+        self._return_sum = self._prefix(returns)
+        self._return_sumsq = self._prefix(returns * returns)
+
+    @staticmethod
+    def _prefix(values):
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        prefix.setflags(write=False)
+        return prefix
+
+    def __len__(self):
+        return len(self.values)
+
+    def _positions(self, start=None, end=None):
+        """Row positions of the inclusive [start, end] date range."""
+        lo = 0 if start is None else self.dates.searchsorted(self._timestamp(start), side='left')
+        hi = len(self) if end is None else self.dates.searchsorted(self._timestamp(end), side='right')
+        return np.arange(lo, hi)
+
+    @staticmethod
+    def _timestamp(date):
+        """`date` as a naive Timestamp comparable with the dates; tz-aware dates are converted to UTC."""
+        date = pd.Timestamp(date)
+        if pd.isna(date):
+            raise ValueError("start and end must be valid dates.")
+        return date.tz_convert('UTC').tz_localize(None) if date.tz is not None else date
+
+    def _check_window(self, window, minimum=1):
+        if int(window) != window or window < minimum:
+            raise ValueError(f"window must be an integer of at least {minimum}, got {window!r}.")
+        return int(window)
+
+    @staticmethod
+    def _window_sums(prefix, positions, window, history=0):
+        """Sums over the `window` rows ending at each position (NaN without `window + history` rows)."""
+        sums = np.full(len(positions), np.nan)
+        full = positions >= window - 1 + history
+        ends = positions[full] + 1
+        sums[full] = prefix[ends] - prefix[ends - window]
+        return sums
+
+    @classmethod
+    def _variance(cls, prefix_sum, prefix_sumsq, positions, window, history=0):
+        """Rolling sample variance; values within the rounding error of the prefix sums count as 0."""
+        s1 = cls._window_sums(prefix_sum, positions, window, history)
+        s2 = cls._window_sums(prefix_sumsq, positions, window, history)
+        squares = s2 - s1 * s1 / window
+        # Differencing two large prefix sums leaves noise where the prices are flat
+        noise = 4 * np.finfo(np.float64).eps * prefix_sumsq[np.minimum(positions + 1, len(prefix_sumsq) - 1)]
+        return s1, np.where(squares <= noise, 0.0, squares) / (window - 1)
+
+    def _moments(self, positions, window):
+        if window == 1:
+            return self._window_sums(self._sum, positions, 1) + self._shift, np.full(len(positions), np.nan)
+        s1, var = self._variance(self._sum, self._sumsq, positions, window)
+        return s1 / window + self._shift, np.sqrt(var)
+
+    def _zscore(self, positions, mean, std):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(std > 0, (self.values[positions] - mean) / std, np.nan)
+
+    def _volatility(self, positions, window):
+        # A window of returns ending at row i needs the prices from row i - window
+        var = self._variance(self._return_sum, self._return_sumsq, positions, window, history=1)[1]
+        volatility = np.sqrt(var)
+        return volatility * np.sqrt(self.periods_per_year) if self.periods_per_year else volatility
+
+    def _drawdown(self, positions, window):
+        from scipy.ndimage import maximum_filter1d
+
+        if not len(positions):
+            return np.array([], dtype=np.float64)
+        # Filter only the rows the requested range and its window history need
+        lo = max(positions[0] - window + 1, 0)
+        values = self.values[lo:positions[-1] + 1]
+        # origin shifts the centered filter window to the trailing rows [i - window + 1, i]
+        peaks = maximum_filter1d(values, size=window, origin=(window - 1) // 2, mode='nearest')
+        drawdown = self.values[positions] / peaks[positions - lo] - 1.0
+        drawdown[positions < window - 1] = np.nan
+        return drawdown
+
+    def mean(self, window, start=None, end=None) -> np.ndarray:
+        """Rolling mean price."""
+        window = self._check_window(window)
+        return self._moments(self._positions(start, end), window)[0]
+
+    def std(self, window, start=None, end=None) -> np.ndarray:
+        """Rolling sample standard deviation of the price."""
+        window = self._check_window(window, 2)
+        return self._moments(self._positions(start, end), window)[1]
+
+    def zscore(self, window, start=None, end=None) -> np.ndarray:
+        """Distance of each price from its rolling mean, in rolling standard deviations."""
+        window = self._check_window(window, 2)
+        positions = self._positions(start, end)
+        return self._zscore(positions, *self._moments(positions, window))
+
+    def volatility(self, window, start=None, end=None) -> np.ndarray:
+        """Rolling sample standard deviation of the daily log returns, annualized with `periods_per_year`."""
+        return self._volatility(self._positions(start, end), self._check_window(window, 2))
+
+    def drawdown(self, window, start=None, end=None) -> np.ndarray:
+        """Fall of each price below the highest price of its window, as a fraction (<= 0)."""
+        return self._drawdown(self._positions(start, end), self._check_window(window))
+
+    def compute(self, windows, stats=ROLLING_STATS, start=None, end=None) -> pd.DataFrame:
+        """
+        Computes several statistics for several windows, sharing the prefix sums and
+        each window's mean and standard deviation between the statistics.
+
+        Parameters:
+        - windows (iterable of int): Window sizes in rows.
+        - stats (iterable of str): Statistics from `ROLLING_STATS`.
+        - start, end (date-like, optional): Inclusive date range of the rows to return;
+          earlier rows still count as window history.
+
+        Returns:
+        - pd.DataFrame: Indexed by Date, with 'Price' and one '<stat>_<window>' column per pair.
+        """
+        windows = list(dict.fromkeys(windows))
+        stats = list(dict.fromkeys(stats))
+        if not windows or len(windows) > MAX_WINDOWS:
+            raise ValueError(f"Give 1 to {MAX_WINDOWS} windows.")
+        unknown = [stat for stat in stats if stat not in ROLLING_STATS]
+        if unknown or not stats:
+            raise ValueError(f"stats must be among {', '.join(ROLLING_STATS)}, got {', '.join(map(str, unknown))}.")
+        minimum = 1 if set(stats) <= {'mean', 'drawdown'} else 2
+        windows = [self._check_window(window, minimum) for window in windows]
+
+        positions = self._positions(start, end)
+        results = {}
+        for window in windows:
+            if {'mean', 'std', 'zscore'} & set(stats):
+                mean, std = self._moments(positions, window)
+                results['mean', window], results['std', window] = mean, std
+                if 'zscore' in stats:
+                    results['zscore', window] = self._zscore(positions, mean, std)
+            if 'volatility' in stats:
+                results['volatility', window] = self._volatility(positions, window)
+            if 'drawdown' in stats:
+                results['drawdown', window] = self._drawdown(positions, window)
+
+        columns = {'Price': self.values[positions]}
+        columns.update((f'{stat}_{window}', results[stat, window]) for stat in stats for window in windows)
+        return pd.DataFrame(columns, index=self.dates[positions])
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+def _period_days(freq):
+    """Length of one `freq` step in days (1 for calendar-based steps such as 'B')."""
+    try:
+        return pd.Timedelta(pd.tseries.frequencies.to_offset(freq)) / pd.Timedelta(days=1)
+    except ValueError:
+        return 1.0
+
+
+def synthetic_prices(n=9000, freq='B', end='2022-09-30', start_price=20.0, n_regimes=6, volatility=0.02,
+                     reversion=0.002, gap_rate=0.005, missing_rate=0.0, seed=0) -> pd.DataFrame:
+    """
+    Generates a seeded, Brent-like price series.
+
+    Log prices follow a mean-reverting random walk with fat-tailed (Student t) shocks.
+    The series is split into regimes, each with its own price level and volatility, so
+    it has real change points. Runs of rows are removed to create gaps (holidays,
+    outages), and single prices can be set to NaN.
+
+    Parameters:
+    - n (int): Number of rows returned.
+    - freq (str): Step of the date grid, e.g. 'B' (business days, like the Brent data),
+      'D', 'h' or '5min' for intraday data.
+    - end (date-like): Date of the last grid point; the series runs backwards from it.
+    - start_price (float): Price before the first shock.
+    - n_regimes (int): Number of regimes; their starts are in `attrs['change_points']`.
+    - volatility (float): Typical daily log-return volatility, scaled to `freq`.
+    - reversion (float): Daily pull of the log price towards its regime level.
+    - gap_rate (float): Expected fraction of grid points removed as gaps.
+    - missing_rate (float): Fraction of prices set to NaN.
+    - seed (int): Random seed; the same arguments always give the same series.
+
+    Returns:
+    - pd.DataFrame: 'Price' column rounded to cents, indexed by 'Date'.
+    """
+    from scipy.signal import lfilter
+
+    if n < 1 or n_regimes < 1:
+        raise ValueError("n and n_regimes must be at least 1.")
+    rng = np.random.default_rng(seed)
+    step = _period_days(freq)
+
+    # Gap runs with a mean length of 3 steps, cut out of a grid long enough to keep n rows
+    n_gaps = rng.poisson(n * gap_rate / 3) if gap_rate > 0 else 0
+    lengths = rng.geometric(1 / 3, size=n_gaps)
+    grid = pd.date_range(end=pd.Timestamp(end), periods=n + int(lengths.sum()), freq=freq, name='Date')
+    keep = np.ones(len(grid), dtype=bool)
+    for start, length in zip(rng.integers(0, len(grid), size=n_gaps).tolist(), lengths.tolist()):
+        keep[start:start + length] = False
+    dates = grid[keep][-n:]
+
+    # Regimes: a level and a volatility multiplier per segment
+    starts = np.sort(rng.choice(np.arange(1, n), size=min(n_regimes - 1, n - 1), replace=False)) if n > 1 else []
+    regime = np.zeros(n, dtype=np.int64)
+    regime[starts] = 1
+    regime = np.cumsum(regime)
+    levels = np.log(rng.uniform(15, 110, size=regime[-1] + 1))
+    vol_scale = rng.lognormal(0, 0.5, size=regime[-1] + 1)
+
+    # x[t] = (1 - k) x[t-1] + k level[t] + sigma[t] e[t], solved as a linear filter
+    k = min(reversion * step, 1.0)
+    shocks = rng.standard_t(4, size=n) / np.sqrt(2.0)
+    forcing = k * levels[regime] + volatility * np.sqrt(step) * vol_scale[regime] * shocks
+    log_prices, _ = lfilter([1.0], [1.0, -(1 - k)], forcing, zi=[(1 - k) * np.log(start_price)])
+    prices = np.round(np.exp(log_prices), 2)
+
+    if missing_rate > 0:
+        prices[rng.random(n) < missing_rate] = np.nan
+    frame = pd.DataFrame({'Price': prices}, index=dates)
+    frame.attrs['change_points'] = list(dates[starts])
+    return frame
+
+
+def synthetic_events(n_events, start='1987-05-20', end='2022-09-30', max_duration_days=730,
+                     point_fraction=0.3, seed=0) -> pd.DataFrame:
+    """
+    Generates a seeded catalogue of (possibly overlapping) events.
+
+    Parameters:
+    - n_events (int): Number of events.
+    - start, end (date-like): Range of the event start dates.
+    - max_duration_days (int): Longest event duration.
+    - point_fraction (float): Fraction of one-day events (e.g. an attack or a decision).
+    - seed (int): Random seed.
+
+    Returns:
+    - pd.DataFrame: 'Event', 'Start' and 'End' columns, as used by `event_labels`.
+    """
+    rng = np.random.default_rng(seed)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    offsets = rng.integers(0, max((end - start).days, 1), size=n_events)
+    durations = np.where(rng.random(n_events) < point_fraction, 0, rng.integers(1, max_duration_days + 1, size=n_events))
+    starts = start + pd.to_timedelta(offsets, unit='D')
+    return pd.DataFrame({
+        'Event': [f"Event {i:05d}" for i in range(n_events)],
+        'Start': starts,
+        'End': starts + pd.to_timedelta(durations, unit='D'),
+    })
+
+
+def key_events(events: pd.DataFrame) -> dict:
+    """Event name -> start date ('YYYY-MM-DD'), the form used by the event-impact functions."""
+    return dict(zip(events['Event'], events['Start'].dt.strftime('%Y-%m-%d')))
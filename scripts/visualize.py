@@ -1,38 +1,45 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-import IPython.display as display
-from IPython.display import HTML
+from histogram import HistogramService
+from rolling_stats import RollingStats
+from price_pyramid import PricePyramid
+from rendering import PlotRenderer, PlotSpec, output
 
 class DataVisualizer:
-    def __init__(self, data: pd.DataFrame, logger):
+    def __init__(self, data: pd.DataFrame, logger, renderer: PlotRenderer = None):
         """
         Initialize the DataVisualizer with data and a logger instance.
         
         Parameters:
         - data (pd.DataFrame): DataFrame containing 'Date' and 'Price' columns.
         - logger: Logger instance for logging events and errors.
+        - renderer (PlotRenderer, optional): Headless mode; plots are queued on the renderer
+          and written to files by `renderer.flush()` instead of being shown.
         """
         self.data = data
         self.logger = logger
+        self.renderer = renderer
+        self._histograms = None
+        self._rolling = None
+        self._pyramid = None
         self.logger.info("DataVisualizer initialized.")
 
         
         
     def _display_error_message(self, method_name):
             """Displays an error message with a hyperlink to the log file in the notebook."""
+            from IPython.display import HTML, display
+
             log_link = f'<a href="../logs/notebooks.log" target="_blank">Check the log file for details</a>'
-            display.display(HTML(f"<p style='color:red;'>An error occurred in {method_name}. {log_link}</p>"))
+            display(HTML(f"<p style='color:red;'>An error occurred in {method_name}. {log_link}</p>"))
 
     def plot_box(self):
         """Plots a box plot of Brent Oil Prices."""
         try:
-            plt.figure(figsize=(8, 4))
-            sns.boxplot(data=self.data, y='Price')
-            plt.title('Box Plot of Brent Oil Prices')
-            plt.ylabel('Price (USD per barrel)')
-            plt.show()
+            spec = PlotSpec('box', self.data['Price'], title='Box Plot of Brent Oil Prices',
+                            ylabel='Price (USD per barrel)', figsize=(8, 4))
+            output(spec, 'box_plot', self.renderer)
             self.logger.info("Box plot of Brent Oil Prices displayed successfully.")
+            return spec
         except Exception as e:
             self.logger.error(f"Failed to plot box plot: {e}")
             self._display_error_message("plot_boxplot")
@@ -40,28 +47,39 @@ class DataVisualizer:
     def plot_price_over_time(self):
         """Plots Brent Oil Prices over time."""
         try:
-            plt.figure(figsize=(10, 4))
-            plt.plot(self.data.index, self.data['Price'], label='Brent Oil Price', color='blue')
-            plt.title('Brent Oil Prices Over Time')
-            plt.xlabel('Date')
-            plt.ylabel('Price (USD per barrel)')
-            plt.legend()
-            plt.show()
+            spec = PlotSpec('line', {'Brent Oil Price': self.data['Price']}, title='Brent Oil Prices Over Time',
+                            xlabel='Date', ylabel='Price (USD per barrel)', figsize=(10, 4),
+                            color='blue', legend=True)
+            output(spec, 'price_over_time', self.renderer)
             self.logger.info("Price over time plot displayed successfully.")
+            return spec
         except Exception as e:
             self.logger.error(f"Failed to plot price over time: {e}")
             self._display_error_message("plot_price_over_time")
 
-    def plot_price_distribution(self):
-        """Plots the distribution of Brent Oil Prices."""
+    @property
+    def histograms(self) -> HistogramService:
+        """Histogram service over the prices, shared with the dashboard backend."""
+        if self._histograms is None:
+            self._histograms = HistogramService(self.data)
+        return self._histograms
+
+    def plot_price_distribution(self, bin_size=5, edges=None, start=None, end=None):
+        """
+        Plots the distribution of Brent Oil Prices.
+
+        Parameters:
+        - bin_size (float): Bin width in USD, used when `edges` is not given.
+        - edges (array-like, optional): Explicit bin edges.
+        - start, end (date-like, optional): Date range of the prices to include.
+        """
         try:
-            plt.figure(figsize=(10, 4))
-            sns.histplot(self.data['Price'], bins=30, kde=True)
-            plt.title('Price Distribution')
-            plt.xlabel('Price (USD per barrel)')
-            plt.ylabel('Frequency')
-            plt.show()
+            edges, counts = self.histograms.counts(bin_size=bin_size, edges=edges, start=start, end=end)
+            spec = PlotSpec('hist', (edges, counts), title='Price Distribution',
+                            xlabel='Price (USD per barrel)', ylabel='Frequency', figsize=(10, 4))
+            output(spec, 'price_distribution', self.renderer)
             self.logger.info("Price distribution plot displayed successfully.")
+            return spec
         except Exception as e:
             self.logger.error(f"Failed to plot price distribution: {e}")
             self._display_error_message("plot_price_distribution")
@@ -69,39 +87,52 @@ class DataVisualizer:
     def plot_yearly_average(self):
         """Plots average Brent Oil Prices per year."""
         try:
-            df = self.data.copy().reset_index()
-            df['Year'] = df['Date'].dt.year
-            yearly_avg = df.groupby('Year')['Price'].mean().reset_index()
-            
-            plt.figure(figsize=(12, 6))
-            sns.barplot(x='Year', y='Price', data=yearly_avg, hue='Year', legend=False, palette='viridis')
-            plt.title('Average Yearly Brent Oil Prices')
-            plt.xlabel('Year')
-            plt.ylabel('Average Price (USD per barrel)')
-            plt.xticks(rotation=45)
-            plt.grid(axis='y')
-            plt.tight_layout()
-            plt.show()
+            # Read from the pre-aggregated yearly level instead of grouping a copy of the data
+            yearly_avg = self.pyramid.query('Y')['Mean']
+            yearly_avg.index = yearly_avg.index.year
+            spec = PlotSpec('bar', yearly_avg, title='Average Yearly Brent Oil Prices', xlabel='Year',
+                            ylabel='Average Price (USD per barrel)', figsize=(12, 6), rotation=45, grid='y')
+            output(spec, 'yearly_average', self.renderer)
             self.logger.info("Yearly average price plot displayed successfully.")
+            return spec
         except Exception as e:
             self.logger.error(f"Failed to plot yearly average: {e}")
             self._display_error_message("plot_yearly_average")
 
+    @property
+    def pyramid(self) -> PricePyramid:
+        """Daily to yearly price aggregates, shared with the dashboard backend."""
+        if self._pyramid is None:
+            self._pyramid = PricePyramid(self.data)
+        return self._pyramid
+
+    @property
+    def rolling(self) -> RollingStats:
+        """Rolling statistics over the prices, shared with the dashboard backend."""
+        if self._rolling is None:
+            self._rolling = RollingStats(self.data)
+        return self._rolling
+
     def plot_rolling_volatility(self, window=30):
-        """Plots the rolling volatility (standard deviation) of Brent Oil Prices."""
+        """
+        Plots the rolling volatility (standard deviation) of Brent Oil Prices.
+
+        Parameters:
+        - window (int or list[int]): Window size(s) in days; one line is drawn per window.
+        """
         try:
-            self.data['Rolling_Volatility'] = self.data['Price'].rolling(window=window).std()
-            plt.figure(figsize=(10, 4))
-            plt.plot(self.data.index, self.data['Rolling_Volatility'], color='orange', label=f'{window}-Day Rolling Volatility')
-            plt.title(f'{window}-Day Rolling Volatility of Brent Oil Prices')
-            plt.xlabel('Date')
-            plt.ylabel('Volatility (Rolling Standard Deviation)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.show()
-            self.logger.info(f"{window}-day rolling volatility plot displayed successfully.")
+            windows = [window] if isinstance(window, int) else list(window)
+            # Computed from shared prefix sums; self.data is left unchanged
+            rolling = self.rolling.compute(windows, stats=('std',))
+            lines = {f'{w}-Day Rolling Volatility': rolling[f'std_{w}'] for w in windows}
+            label = '/'.join(map(str, windows))
+            spec = PlotSpec('line', lines, title=f'{label}-Day Rolling Volatility of Brent Oil Prices', xlabel='Date',
+                            ylabel='Volatility (Rolling Standard Deviation)', figsize=(10, 4),
+                            colors={f'{windows[0]}-Day Rolling Volatility': 'orange'}, legend=True, grid='both',
+                            rotation=45)
+            output(spec, f'rolling_volatility_{label}', self.renderer)
+            self.logger.info(f"{label}-day rolling volatility plot displayed successfully.")
+            return spec
         except Exception as e:
             self.logger.error(f"Failed to plot rolling volatility: {e}")
-            self._display_error_message("plot_rolling_volatility")
\ No newline at end of file
+            self._display_error_message("plot_rolling_volatility")
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+ASOF_POLICIES = ('exact', 'previous', 'next', 'nearest')
+
+
+class DateWindowIndex:
+    """
+    Binary-search lookup of date windows on a sorted DatetimeIndex.
+
+    Windows are resolved with `searchsorted` into integer positions and returned as
+    positional slices, so a lookup costs O(log N) and the returned frame is a view
+    on the underlying data instead of a boolean-mask copy.
+
+    Parameters:
+    - data (pd.DataFrame or pd.Series): Price data indexed by date. It is sorted once
+      if the index is not already monotonic increasing.
+    """
+
+    def __init__(self, data):
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise TypeError("DateWindowIndex requires a DatetimeIndex.")
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index(kind='stable')
+        self.data = data
+        self.index = data.index
+        self._values = self.index.values
+
+    def __len__(self):
+        return len(self.index)
+
+    def _to_datetime64(self, dates):
+        """Converts scalar or array-like dates to a datetime64 array matching the index."""
+        return pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates))).values.astype(self._values.dtype)
+
+    def bounds(self, event_dates, days_before=30, days_after=30):
+        """
+        Resolves windows [event - days_before, event + days_after] to positional bounds.
+
+        All arguments broadcast against each other, so many (event, before, after)
+        windows are resolved in a single vectorized call.
+
+        Parameters:
+        - event_dates (date-like or array-like): Event dates.
+        - days_before (int or array-like): Calendar days before each event.
+        - days_after (int or array-like): Calendar days after each event.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: Start (inclusive) and stop (exclusive) positions.
+        """
+        events = self._to_datetime64(event_dates)
+        before = events - np.asarray(days_before, dtype='timedelta64[D]')
+        after = events + np.asarray(days_after, dtype='timedelta64[D]')
+        before, after = np.broadcast_arrays(before, after)
+        start = np.searchsorted(self._values, before.astype(self._values.dtype), side='left')
+        stop = np.searchsorted(self._values, after.astype(self._values.dtype), side='right')
+        return start, stop
+
+    def asof_positions(self, dates, policy='nearest', tolerance_days=None):
+        """
+        Resolves dates to the position of a trading day in the index.
+
+        The lookup never raises: dates without a matching trading day resolve to -1.
+
+        Parameters:
+        - dates (date-like or array-like): Dates to resolve.
+        - policy (str): 'exact' for the same date only, 'previous' for the last trading
+          day on or before the date, 'next' for the first one on or after it, or
+          'nearest' for the closest one (ties go to the previous day).
+        - tolerance_days (int, optional): Maximum calendar-day distance between a date
+          and its resolved trading day.
+
+        Returns:
+        - np.ndarray: Integer positions, -1 where no trading day qualifies.
+        """
+        if policy not in ASOF_POLICIES:
+            raise ValueError(f"Unknown as-of policy: {policy!r}")
+
+        targets = self._to_datetime64(dates).astype(np.int64)
+        values = self._values.astype(np.int64)
+        n = len(values)
+        if n == 0:
+            return np.full(targets.shape, -1, dtype=np.int64)
+
+        prev = np.searchsorted(values, targets, side='right') - 1
+        nxt = np.searchsorted(values, targets, side='left')
+        prev_gap = np.where(prev >= 0, targets - values[np.maximum(prev, 0)], np.iinfo(np.int64).max)
+        next_gap = np.where(nxt < n, values[np.minimum(nxt, n - 1)] - targets, np.iinfo(np.int64).max)
+
+        if policy == 'exact':
+            pos, gap = np.where(prev_gap == 0, prev, -1), np.zeros_like(targets)
+        elif policy == 'previous':
+            pos, gap = prev, prev_gap
+        elif policy == 'next':
+            pos, gap = np.where(nxt < n, nxt, -1), next_gap
+        else:
+            use_next = next_gap < prev_gap
+            pos, gap = np.where(use_next, nxt, prev), np.where(use_next, next_gap, prev_gap)
+
+        if tolerance_days is not None:
+            unit, _ = np.datetime_data(self._values.dtype)
+            tolerance = np.timedelta64(int(tolerance_days), 'D').astype(f'timedelta64[{unit}]').astype(np.int64)
+            pos = np.where(gap <= tolerance, pos, -1)
+        return pos.astype(np.int64)
+
+    def window(self, event_date, days_before=30, days_after=30):
+        """Returns the rows within [event - days_before, event + days_after] as a view."""
+        start, stop = self.bounds(event_date, days_before, days_after)
+        return self.data.iloc[int(start[0]):int(stop[0])]
+
+    def windows(self, event_dates, days_before=30, days_after=30):
+        """Yields the window view for every event, resolving all bounds in one call."""
+        start, stop = self.bounds(event_dates, days_before, days_after)
+        for lo, hi in zip(start.tolist(), stop.tolist()):
+            yield self.data.iloc[lo:hi]
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The analysis scripts import each other by bare module name, and the backend
+# imports its `models` package relative to dashboard/backend.
+for path in (os.path.join(ROOT, 'scripts'), os.path.join(ROOT, 'dashboard', 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
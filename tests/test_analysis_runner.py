@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+from analysis_runner import AnalysisRunner
+
+
+def mean_price(series, offset=0.0):
+    return float(series.mean()) + offset
+
+
+def sleep_for(series, seconds):
+    time.sleep(seconds)
+    return len(series)
+
+
+def worker_pid(series):
+    return os.getpid()
+
+
+def fail(series):
+    raise ValueError(f"cannot analyse {series.name}")
+
+
+@pytest.fixture
+def prices():
+    index = pd.date_range('2020-01-01', periods=200, freq='D')
+    return {
+        'Brent': pd.Series(np.linspace(50.0, 70.0, 200), index=index),
+        'WTI': pd.DataFrame({'Price': np.r_[np.full(100, 40.0), np.full(100, 60.0)]}, index=index),
+    }
+
+
+def run(prices, submit, **kwargs):
+    with AnalysisRunner(prices, max_workers=2, start_method='fork', **kwargs) as runner:
+        submit(runner)
+        return runner.run(poll_interval=0.02)
+
+
+def test_results_come_back_in_submission_order(prices):
+    def submit(runner):
+        runner.submit('WTI', mean_price, offset=1.0)
+        runner.submit('Brent', mean_price)
+        runner.submit('WTI', 'change_points', n_bkps=1)
+
+    results = run(prices, submit)
+    assert [r['status'] for r in results] == ['ok', 'ok', 'ok']
+    assert [r['series'] for r in results] == ['WTI', 'Brent', 'WTI']
+    assert results[0]['result'] == pytest.approx(51.0)
+    assert results[1]['result'] == pytest.approx(60.0)
+    assert results[2]['analysis'] == 'change_points'
+    assert results[2]['result']['breakpoints'] == [100]
+
+
+def test_error_is_reported_without_affecting_other_tasks(prices):
+    def submit(runner):
+        runner.submit('Brent', fail)
+        runner.submit('WTI', mean_price)
+
+    failed, ok = run(prices, submit)
+    assert failed['status'] == 'error'
+    assert 'ValueError: cannot analyse Brent' in failed['error']
+    assert failed['result'] is None
+    assert ok['status'] == 'ok'
+
+
+def test_timeout_terminates_the_task(prices):
+    def submit(runner):
+        runner.submit('Brent', sleep_for, seconds=30)
+        runner.submit('WTI', sleep_for, timeout=5, seconds=0)
+
+    started = time.monotonic()
+    slow, fast = run(prices, submit, timeout=0.3)
+    assert time.monotonic() - started < 10
+    assert slow['status'] == 'timeout'
+    assert fast['status'] == 'ok' and fast['result'] == 200
+
+
+def test_cancel_queued_and_running_tasks(prices):
+    def submit(runner):
+        running = runner.submit('Brent', sleep_for, seconds=30)
+        queued = runner.submit('WTI', mean_price)
+        runner.cancel(queued)
+        threading.Timer(0.3, runner.cancel, args=(running,)).start()
+
+    started = time.monotonic()
+    running, queued = run(prices, submit)
+    assert time.monotonic() - started < 10
+    assert running['status'] == 'cancelled' and running['elapsed'] is not None
+    assert queued['status'] == 'cancelled' and queued['elapsed'] is None
+
+
+def test_workers_are_reused_and_replaced_after_a_timeout(prices):
+    with AnalysisRunner(prices, max_workers=1, start_method='fork') as runner:
+        for name in ['Brent', 'WTI', 'Brent']:
+            runner.submit(name, worker_pid)
+        first = runner.run(poll_interval=0.02)
+        runner.submit('Brent', worker_pid)
+        runner.submit('Brent', sleep_for, timeout=0.3, seconds=30)
+        runner.submit('WTI', worker_pid)
+        second = runner.run(poll_interval=0.02)
+    pids = {r['result'] for r in first}
+    assert len(pids) == 1 and os.getpid() not in pids
+    assert second[0]['result'] in pids
+    assert second[1]['status'] == 'timeout'
+    assert second[2]['status'] == 'ok' and second[2]['result'] not in pids
+
+
+def test_unknown_series_and_analysis_are_rejected(prices):
+    with AnalysisRunner(prices, start_method='fork') as runner:
+        with pytest.raises(KeyError):
+            runner.submit('Dubai', mean_price)
+        with pytest.raises(KeyError):
+            runner.submit('Brent', 'garch')
+
+
+def test_close_releases_shared_memory(prices):
+    runner = AnalysisRunner(prices, start_method='fork')
+    names = [shared.shm_name for shared in runner.series.values()]
+    runner.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from bayes_changepoint import marginal_change_point_posterior
+from scipy.special import gammaln, logsumexp
+
+PRIOR = {'m0': 0.5, 'kappa0': 0.1, 'alpha0': 2.0, 'beta0': 1.5}
+
+
+def segment_log_marginal(x, m0, kappa0, alpha0, beta0):
+    """Normal-Gamma marginal likelihood of one segment, from its values directly."""
+    n = len(x)
+    mean = x.mean()
+    kappa_n = kappa0 + n
+    alpha_n = alpha0 + n / 2
+    beta_n = beta0 + 0.5 * ((x - mean) ** 2).sum() + kappa0 * n * (mean - m0) ** 2 / (2 * kappa_n)
+    return (gammaln(alpha_n) - gammaln(alpha0) + alpha0 * np.log(beta0) - alpha_n * np.log(beta_n)
+            + 0.5 * np.log(kappa0 / kappa_n) - 0.5 * n * np.log(2 * np.pi))
+
+
+def brute_force(values, n_changepoints, min_size):
+    """Posterior probability of a change at each position, enumerating every configuration."""
+    n = len(values)
+    configs, log_likelihoods = [], []
+    for taus in itertools.combinations(range(min_size, n - min_size + 1), n_changepoints):
+        bounds = [0, *taus, n]
+        if any(b - a < min_size for a, b in zip(bounds[:-1], bounds[1:])):
+            continue
+        configs.append(taus)
+        log_likelihoods.append(sum(segment_log_marginal(values[a:b], **PRIOR)
+                                   for a, b in zip(bounds[:-1], bounds[1:])))
+    log_evidence = logsumexp(log_likelihoods)
+    probability = np.zeros(n)
+    for taus, log_likelihood in zip(configs, log_likelihoods):
+        probability[list(taus)] += np.exp(log_likelihood - log_evidence)
+    return probability, log_evidence
+
+
+def series(seed=0, n=14):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0.0, 1.0, n)
+    values[n // 3:] += 1.5
+    values[2 * n // 3:] -= 3.0
+    return pd.Series(values, index=pd.date_range('2021-01-04', periods=n, freq='D'))
+
+
+@pytest.mark.parametrize('n_changepoints', [1, 2])
+@pytest.mark.parametrize('min_size', [1, 2, 3])
+def test_posterior_matches_brute_force(n_changepoints, min_size):
+    data = series()
+    expected, log_evidence = brute_force(data.to_numpy(), n_changepoints, min_size)
+    result = marginal_change_point_posterior(data, n_changepoints=n_changepoints, min_size=min_size,
+                                             n_samples=10, **PRIOR)
+    np.testing.assert_allclose(result['posterior'].to_numpy(), expected, rtol=1e-9, atol=1e-12)
+    assert result['log_evidence'] == pytest.approx(log_evidence, rel=1e-12)
+    assert result['posterior'].sum() == pytest.approx(n_changepoints)
+
+
+def test_samples_follow_the_posterior():
+    data = series(seed=3, n=12)
+    result = marginal_change_point_posterior(data, n_changepoints=2, n_samples=4000, **PRIOR)
+    samples = result['samples']
+    assert list(samples.columns) == ['change_1', 'change_2']
+    assert (samples['change_1'] < samples['change_2']).all()
+
+    positions = data.index.get_indexer(pd.concat([samples['change_1'], samples['change_2']]))
+    frequency = np.bincount(positions, minlength=len(data)) / len(samples)
+    np.testing.assert_allclose(frequency, result['posterior'].to_numpy(), atol=0.05)
+
+
+def test_too_short_series_is_rejected():
+    with pytest.raises(ValueError):
+        marginal_change_point_posterior(series(n=5), n_changepoints=2, min_size=2)
@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from changepoint import L2Cost, detect_change_points, optimal_partition, pelt, select_penalty
+
+
+def step_signal(seed=0):
+    rng = np.random.default_rng(seed)
+    means = np.repeat([0.0, 5.0, -3.0], [40, 30, 50])
+    return means + rng.normal(0.0, 0.3, means.size)
+
+
+def segmentations(n, min_size, n_bkps=None):
+    """Every list of segment ends over [0, n) with segments of at least `min_size`."""
+    counts = range(n) if n_bkps is None else [n_bkps]
+    for k in counts:
+        for bkps in itertools.combinations(range(min_size, n - min_size + 1), k):
+            ends = list(bkps) + [n]
+            if all(b - a >= min_size for a, b in zip([0] + ends[:-1], ends)):
+                yield ends
+
+
+def total_cost(model, ends):
+    return sum(float(model.cost(a, b)) for a, b in zip([0] + ends[:-1], ends))
+
+
+@pytest.mark.parametrize('cost', ['l2', 'normal'])
+def test_pelt_recovers_known_segmentation(cost):
+    signal = step_signal()
+    assert pelt(signal, select_penalty(signal, cost=cost), cost=cost) == [40, 70, 120]
+
+
+@pytest.mark.parametrize('cost', ['l2', 'normal'])
+def test_optimal_partition_recovers_known_segmentation(cost):
+    assert optimal_partition(step_signal(), 2, cost=cost) == [40, 70, 120]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_optimal_partition_matches_brute_force(seed):
+    signal = np.random.default_rng(seed).normal(size=11)
+    model = L2Cost().fit(signal)
+    for n_bkps in (1, 2, 3):
+        expected = min(segmentations(len(signal), 2, n_bkps), key=lambda ends: total_cost(model, ends))
+        result = optimal_partition(signal, n_bkps, min_size=2)
+        assert total_cost(model, result) == pytest.approx(total_cost(model, expected))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pelt_matches_brute_force(seed):
+    signal = np.random.default_rng(seed).normal(size=11)
+    signal[6:] += 2.0
+    model = L2Cost().fit(signal)
+    penalty = 1.5
+
+    def penalized(ends):
+        return total_cost(model, ends) + penalty * (len(ends) - 1)
+
+    expected = min(segmentations(len(signal), 2), key=penalized)
+    assert penalized(pelt(signal, penalty, min_size=2)) == pytest.approx(penalized(expected))
+
+
+def test_short_signals_have_a_single_segment():
+    assert pelt([1.0, 2.0, 3.0], 1.0, min_size=2) == [3]
+    assert optimal_partition([1.0, 2.0, 3.0], 1, min_size=2) == [3]
+    assert optimal_partition(step_signal(), 0) == [120]
+
+
+def test_detect_change_points_reports_dates():
+    signal = step_signal()
+    series = pd.Series(signal, index=pd.date_range('2020-01-01', periods=signal.size, freq='D'))
+    result = detect_change_points(series, n_bkps=2)
+    assert result['breakpoints'] == [40, 70]
+    assert result['dates'] == [series.index[40], series.index[70]]
+    assert result['segments']['n'].tolist() == [40, 30, 50]
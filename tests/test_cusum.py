@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cusum import OnlineCusumDetector, cusum_alarms
+
+
+def test_alarm_on_known_shift():
+    detector = OnlineCusumDetector(drift=0.5, threshold=4.0, target_mean=0.0, target_std=1.0)
+    values = [0.0] * 10 + [2.0] * 10
+    alarms = detector.process(values)
+    # Each shifted value adds 2 - 0.5 = 1.5, so the third one crosses 4.0
+    assert alarms[0]['position'] == 12
+    assert alarms[0]['direction'] == 'up'
+    assert alarms[0]['change_start'] == 10
+    assert alarms[0]['statistic'] == pytest.approx(4.5)
+    # The detector resets after an alarm and keeps alarming while the shift persists
+    assert [alarm['position'] for alarm in alarms] == [12, 15, 18]
+
+
+def test_downward_shift_after_warmup():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(10.0, 1.0, 50), rng.normal(5.0, 1.0, 50)])
+    detector = OnlineCusumDetector(drift=0.5, threshold=5.0, warmup=30)
+    alarms = detector.process(values)
+    assert alarms
+    assert alarms[0]['direction'] == 'down'
+    assert 50 <= alarms[0]['position'] < 56
+    assert alarms[0]['reference_mean'] == pytest.approx(values[:30].mean())
+
+
+def test_no_alarm_before_warmup_completes():
+    detector = OnlineCusumDetector(warmup=5)
+    assert detector.process([1.0, 2.0, 100.0, -100.0]) == []
+    assert not detector.ready
+    detector.update(3.0)
+    assert detector.ready
+    assert detector.std == pytest.approx(np.std([1.0, 2.0, 100.0, -100.0, 3.0], ddof=1))
+
+
+def test_chunks_match_a_single_pass():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(0, 1, 200), rng.normal(2, 1, 200), rng.normal(-1, 2, 200)])
+    values[[5, 250, 420]] = np.nan
+
+    whole = OnlineCusumDetector(warmup=20).process(values)
+    chunked = OnlineCusumDetector(warmup=20)
+    alarms = []
+    for chunk in np.array_split(values, 7):
+        alarms.extend(chunked.process(chunk))
+    assert alarms == whole
+
+
+def test_nan_values_are_skipped_but_counted():
+    detector = OnlineCusumDetector(target_mean=0.0, target_std=1.0, threshold=1.0, drift=0.0)
+    assert detector.update(float('nan')) is None
+    assert detector.update(5.0)['position'] == 1
+
+
+def test_short_warmup_requires_targets():
+    with pytest.raises(ValueError):
+        OnlineCusumDetector(warmup=1)
+    OnlineCusumDetector(warmup=0, target_mean=0.0, target_std=1.0)
+
+
+def test_cusum_alarms_frame():
+    values = [0.0] * 10 + [2.0] * 10
+    series = pd.Series(values, index=pd.date_range('2022-03-01', periods=len(values), freq='D'))
+    alarms = cusum_alarms(series, threshold=4.0, warmup=5)
+    assert alarms.index.name == 'Date'
+    assert alarms.index[0] == series.index[alarms['position'].iloc[0]]
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+from data_cache import DatasetCache, LocalFileFetcher
+
+
+class StubFetcher:
+    """Stands in for a remote source: serves `content`, revalidating on `version`."""
+
+    source_id = 'stub:prices'
+
+    def __init__(self, content=b'Date,Price\n20-May-87,18.63\n', version='v1', source_id=None):
+        self.source_id = source_id or self.source_id
+        self.content = content
+        self.version = version
+        self.error = None
+        self.calls = []
+
+    def fetch(self, dest, validators):
+        self.calls.append(dict(validators))
+        if self.error is not None:
+            with open(dest, 'wb') as f:
+                f.write(self.content[:5])
+            raise self.error
+        if validators.get('version') == self.version:
+            return None
+        with open(dest, 'wb') as f:
+            f.write(self.content)
+        return {'version': self.version}
+
+
+def leftovers(cache):
+    return [name for name in os.listdir(cache.objects_dir) if name.startswith('.download-')]
+
+
+def test_fetch_stores_content_addressed_object(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    path = cache.get(fetcher)
+    assert os.path.basename(path) == hashlib.sha256(fetcher.content).hexdigest()
+    with open(path, 'rb') as f:
+        assert f.read() == fetcher.content
+    assert cache.metadata(fetcher.source_id)['validators'] == {'version': 'v1'}
+
+
+def test_unchanged_source_is_revalidated_not_refetched(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    first = cache.get(fetcher)
+    assert cache.get(fetcher) == first
+    assert fetcher.calls == [{}, {'version': 'v1'}]
+    assert leftovers(cache) == []
+
+
+def test_changed_source_gives_a_new_object(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    first = cache.get(fetcher)
+    fetcher.content, fetcher.version = b'Date,Price\n21-May-87,18.45\n', 'v2'
+    second = cache.get(fetcher)
+    assert second != first
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def test_fresh_copy_is_served_without_fetching(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    path = cache.get(fetcher)
+    assert cache.get(fetcher, max_age=3600) == path
+    assert cache.get(fetcher, offline=True) == path
+    assert len(fetcher.calls) == 1
+
+
+def test_offline_without_cached_copy_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DatasetCache(str(tmp_path)).get(StubFetcher(), offline=True)
+
+
+def test_failed_fetch_falls_back_and_leaves_no_partial_download(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    path = cache.get(fetcher)
+    fetcher.error = IOError('connection reset')
+    assert cache.get(fetcher) == path
+    assert leftovers(cache) == []
+
+
+def test_failed_first_fetch_raises_and_leaves_no_partial_download(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    fetcher.error = IOError('connection reset')
+    with pytest.raises(IOError):
+        cache.get(fetcher)
+    assert leftovers(cache) == []
+    assert cache.metadata(fetcher.source_id) is None
+
+
+def test_missing_object_is_refetched(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path)), StubFetcher()
+    os.remove(cache.get(fetcher))
+    path = cache.get(fetcher, max_age=3600)
+    assert os.path.exists(path)
+    assert fetcher.calls == [{}, {}]
+
+
+def test_local_file_fetcher_revalidates_on_mtime(tmp_path):
+    source = tmp_path / 'prices.csv'
+    source.write_bytes(b'Date,Price\n')
+    cache = DatasetCache(str(tmp_path / 'cache'))
+    fetcher = LocalFileFetcher(str(source))
+    first = cache.get(fetcher)
+    assert cache.get(fetcher) == first
+    source.write_bytes(b'Date,Price\n20-May-87,18.63\n')
+    os.utime(source, (0, 12345))
+    assert cache.get(fetcher) != first
+
+
+class SlowFetcher(StubFetcher):
+    """Writes half of its content, then waits until every other fetch has started writing too."""
+
+    def __init__(self, barrier, **kwargs):
+        super().__init__(**kwargs)
+        self.barrier = barrier
+
+    def fetch(self, dest, validators):
+        with open(dest, 'wb') as f:
+            f.write(self.content[:len(self.content) // 2])
+            f.flush()
+            self.barrier.wait(timeout=10)
+            f.write(self.content[len(self.content) // 2:])
+        return {'version': self.version}
+
+
+def test_concurrent_fetches_use_separate_temporary_files(tmp_path):
+    cache, barrier = DatasetCache(str(tmp_path)), threading.Barrier(4)
+    fetchers = [SlowFetcher(barrier, content=f'{i}'.encode() * 1000, source_id=f'stub:{i}') for i in range(4)]
+    paths = {}
+    threads = [threading.Thread(target=lambda f=f: paths.update({f.source_id: cache.get(f)})) for f in fetchers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for fetcher in fetchers:
+        with open(paths[fetcher.source_id], 'rb') as f:
+            assert f.read() == fetcher.content
+    assert leftovers(cache) == []
+
+
+def test_superseded_objects_expire(tmp_path):
+    cache, fetcher = DatasetCache(str(tmp_path), max_unused_age=60), StubFetcher()
+    first = cache.get(fetcher)
+    os.utime(first, (0, time.time() - 120))
+    fetcher.content, fetcher.version = b'Date,Price\n21-May-87,18.45\n', 'v2'
+    second = cache.get(fetcher)
+    assert not os.path.exists(first) and os.path.exists(second)
+
+
+def test_size_limit_evicts_least_recently_fetched(tmp_path):
+    old, new = StubFetcher(b'a' * 100, source_id='stub:old'), StubFetcher(b'b' * 100, source_id='stub:new')
+    cache = DatasetCache(str(tmp_path), max_bytes=150)
+    old_path = cache.get(old)
+    new_path = cache.get(new)
+    assert not os.path.exists(old_path) and os.path.exists(new_path)
+    # The evicted source is fetched again, which in turn evicts the other one
+    assert cache.get(old, max_age=3600) == old_path
+    assert os.path.exists(old_path) and not os.path.exists(new_path)
+    assert old.calls == [{}, {}]
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_profiler import DataProfiler, DuplicateDetector, HyperLogLog, iter_chunks, profile_source
+
+
+@pytest.fixture(scope='module')
+def raw():
+    """Brent-like raw rows with duplicates, missing prices, bad dates and gaps."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('1990-01-01', periods=3000)
+    dates = dates.delete(np.arange(1000, 1010))  # ten business days missing: a 17-day gap
+    frame = pd.DataFrame({'Date': dates.strftime('%d-%b-%y'),
+                          'Price': np.round(rng.uniform(10, 120, len(dates)), 2)})
+    frame.loc[rng.choice(len(frame), 25, replace=False), 'Price'] = np.nan
+    frame.loc[[7, 8], 'Date'] = ['not a date', '']
+    return pd.concat([frame, frame.iloc[[100, 200, 200]]], ignore_index=True)
+
+
+def test_single_pass_matches_pandas(raw):
+    report = profile_source(raw, chunksize=257, date_format='%d-%b-%y')
+    price = raw['Price']
+    assert report['rows'] == len(raw) and report['chunks'] == -(-len(raw) // 257)
+    assert report['duplicate_rows'] == int(raw.duplicated().sum()) == 3
+    assert report['columns']['Price']['missing'] == int(price.isna().sum())
+    assert report['columns']['Price']['mean'] == pytest.approx(price.mean(), rel=1e-12)
+    assert report['columns']['Price']['std'] == pytest.approx(price.std(), rel=1e-9)
+    assert (report['columns']['Price']['min'], report['columns']['Price']['max']) == (price.min(), price.max())
+    assert report['columns']['Price']['distinct'] == pytest.approx(price.nunique(), rel=0.03)
+
+    dates = report['dates']
+    assert (dates['unparsed'], dates['missing']) == (1, 2)
+    assert not dates['monotonic'] and dates['out_of_order'] == 1 and dates['repeated'] == 1
+    # The removed days, and the jump between the rows repeated at the end
+    assert [gap['length'].days for gap in dates['largest_gaps']] == [140, 17]
+    assert dates['smallest_step'] == pd.Timedelta(days=1)
+
+
+def test_merged_profiles_match_a_single_pass(raw):
+    whole = DataProfiler(date_format='%d-%b-%y')
+    for chunk in iter_chunks(raw, chunksize=500):
+        whole.update(chunk)
+    parts = []
+    for bounds in np.array_split(np.arange(len(raw)), 4):
+        part = DataProfiler(date_format='%d-%b-%y')
+        for chunk in iter_chunks(raw.iloc[bounds[0]:bounds[-1] + 1], chunksize=300):
+            part.update(chunk)
+        parts.append(part)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    expected, result = whole.report(), merged.report()
+    assert result['duplicate_rows'] == expected['duplicate_rows']
+    assert result['dates'] == expected['dates']
+    for name in ('count', 'missing', 'distinct', 'min', 'max'):
+        assert result['columns']['Price'][name] == expected['columns']['Price'][name]
+    assert result['columns']['Price']['std'] == pytest.approx(expected['columns']['Price']['std'], rel=1e-12)
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'csv.gz', 'parquet', 'feather'])
+def test_files_profile_like_the_frame(tmp_path, raw, suffix):
+    path = str(tmp_path / f'prices.{suffix}')
+    if suffix.startswith('csv'):
+        raw.to_csv(path, index=False)
+    elif suffix == 'parquet':
+        pytest.importorskip('pyarrow')
+        raw.to_parquet(path, index=False, row_group_size=1000)
+    else:
+        pytest.importorskip('pyarrow')
+        raw.to_feather(path, chunksize=1000)
+    report = profile_source(path, chunksize=400, date_format='%d-%b-%y')
+    expected = profile_source(raw, chunksize=400, date_format='%d-%b-%y')
+    assert report['rows'] == expected['rows'] and report['duplicate_rows'] == expected['duplicate_rows']
+    assert report['dates'] == expected['dates']
+    assert report['columns']['Price']['mean'] == pytest.approx(expected['columns']['Price']['mean'])
+
+
+def test_duplicate_detector_matches_pandas():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 500, 5000).astype(np.uint64)
+    detector = DuplicateDetector()
+    repeated = np.concatenate([detector.update(chunk) for chunk in np.array_split(values, 7)])
+    np.testing.assert_array_equal(repeated, pd.Series(values).duplicated().to_numpy())
+    assert detector.duplicates == len(values) - len(np.unique(values))
+
+
+@pytest.mark.parametrize('n', [10, 1000, 200_000])
+def test_hyperloglog_estimate_is_close(n):
+    hashes = pd.util.hash_array(np.arange(n, dtype=np.int64))
+    sketch, other = HyperLogLog(), HyperLogLog()
+    sketch.update(hashes[: n // 2])
+    other.update(hashes[n // 2:])
+    sketch.merge(other)
+    assert sketch.estimate() == pytest.approx(n, rel=0.03)
+    with pytest.raises(ValueError):
+        sketch.merge(HyperLogLog(precision=10))
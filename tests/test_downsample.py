@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.downsample import downsample_series, lttb_indices, minmax_indices
+
+
+def random_walk(n, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(size=n))
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 7, 50, 333])
+def test_lttb_returns_exactly_n_out_sorted_indices(n):
+    y = random_walk(n)
+    x = np.arange(n) * 86400.0
+    for n_out in range(0, n + 3):
+        indices = lttb_indices(x, y, n_out)
+        assert len(indices) == min(n_out, n)
+        assert np.all(np.diff(indices) > 0)
+        if n_out >= 2:
+            assert indices[0] == 0 and indices[-1] == n - 1
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 7, 50, 333])
+def test_minmax_never_exceeds_n_out(n):
+    y = random_walk(n, seed=1)
+    for n_out in range(0, n + 3):
+        indices = minmax_indices(y, n_out)
+        assert len(indices) <= min(n_out, n)
+        assert np.all(np.diff(indices) > 0)
+        assert indices.min(initial=0) >= 0 and indices.max(initial=0) < n
+        if n_out >= 2:
+            assert indices[0] == 0 and indices[-1] == n - 1
+
+
+def test_minmax_keeps_the_extremes():
+    y = random_walk(1000, seed=2)
+    for n_out in (4, 10, 101):
+        indices = minmax_indices(y, n_out)
+        assert np.argmin(y) in indices and np.argmax(y) in indices
+
+
+def test_minmax_with_three_points_keeps_the_largest_excursion():
+    y = np.array([0.0, 1.0, -5.0, 2.0, 0.0])
+    assert minmax_indices(y, 3).tolist() == [0, 2, 4]
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_series_respects_max_points(method):
+    series = pd.Series(random_walk(500), index=pd.date_range('2000-01-03', periods=500, freq='B'))
+    for max_points in (3, 10, 499, 500, None):
+        result = downsample_series(series, max_points, method=method)
+        assert len(result) <= (max_points or len(series))
+        assert result.index.is_monotonic_increasing
+    with pytest.raises(ValueError):
+        downsample_series(series, 10, method='every_nth')
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.event_batch import MAX_EVENTS, BatchRequestError, iter_event_impacts, parse_event_batch
+from models.price_analysis import EventImpactEngine
+
+
+def batch(**overrides):
+    payload = {'events': [{'name': 'Gulf War', 'date': '1990-08-02'},
+                          {'date': '2008-09-15', 'end_date': '2008-12-31'}]}
+    payload.update(overrides)
+    return payload
+
+
+def test_defaults_and_end_dates():
+    parsed = parse_event_batch(batch())
+    assert parsed['names'] == ['Gulf War', '2008-09-15']
+    assert parsed['days_after'].tolist() == [180, 107]
+    assert parsed['horizons'] == [30, 90, 180]
+    assert (parsed['policy'], parsed['tolerance_days'], parsed['equal_var']) == ('nearest', 7, True)
+
+
+def test_dates_with_an_offset_are_converted_to_utc():
+    parsed = parse_event_batch({'events': [{'date': '2020-03-09T01:00:00+03:00'}, {'date': '2020-03-09'}]})
+    assert parsed['dates'].tz is None
+    assert parsed['dates'].tolist() == [pd.Timestamp('2020-03-08'), pd.Timestamp('2020-03-09')]
+
+
+@pytest.mark.parametrize('payload', [
+    [],
+    {'events': []},
+    {'events': [{'name': 'no date'}]},
+    batch(events=[{'date': 'yesterday-ish'}]),
+    batch(events=[{'date': '1e400'}]),
+    batch(events=[{'date': '1677-10-01'}]),
+    batch(events=[{'date': '2262-03-01'}]),
+    batch(events=[{'date': '2008-09-15', 'end_date': '2008-09-01'}]),
+    batch(days_before=-1),
+    batch(days_after=1.5),
+    batch(days_before=True),
+    batch(horizons='30,90'),
+    batch(horizons=[0]),
+    batch(policy='closest'),
+    batch(tolerance_days='7'),
+    batch(equal_var='false'),
+    batch(equal_var=1),
+    batch(chunk_size=0),
+])
+def test_invalid_requests_are_rejected(payload):
+    with pytest.raises(BatchRequestError) as error:
+        parse_event_batch(payload)
+    assert error.value.status == 400
+
+
+def test_too_many_events_is_413():
+    with pytest.raises(BatchRequestError) as error:
+        parse_event_batch({'events': [{'date': '2020-01-01'}] * (MAX_EVENTS + 1)})
+    assert error.value.status == 413
+
+
+def test_chunks_match_a_single_computation():
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame({'Price': 50.0 + np.cumsum(rng.normal(size=3000))},
+                          index=pd.bdate_range('2005-01-03', periods=3000, name='Date'))
+    events = [{'name': f'E{i}', 'date': str(date.date())}
+              for i, date in enumerate(pd.date_range('2006-01-01', '2015-01-01', periods=23))]
+    parsed = parse_event_batch({'events': events, 'chunk_size': 5, 'equal_var': False, 'horizons': [10, 60]})
+    engine = EventImpactEngine(prices)
+    chunks = list(iter_event_impacts(engine, **parsed))
+    assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 3]
+
+    result = pd.concat(chunks, ignore_index=True)
+    expected = engine.compute(parsed['dates'], names=parsed['names'], horizons=[10, 60], equal_var=False)
+    pd.testing.assert_frame_equal(result.drop(columns='End Date'), expected)
+    assert (result['End Date'] == result['Date'] + pd.Timedelta(days=180)).all()
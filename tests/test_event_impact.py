@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from event_impact import EventImpactEngine, horizon_label
+from scipy import stats
+
+EVENTS = pd.to_datetime(['2016-03-01', '2017-06-15', '2018-01-06', '2019-11-30', '2015-01-10'])
+
+
+@pytest.fixture(scope='module')
+def prices():
+    rng = np.random.default_rng(0)
+    values = 60.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, 1500)))
+    values[rng.choice(1500, 30, replace=False)] = np.nan
+    return pd.DataFrame({'Price': values}, index=pd.bdate_range('2014-06-02', periods=1500, name='Date'))
+
+
+def baseline(prices, event, days_before=180, days_after=180, equal_var=True):
+    """The per-event pandas/scipy computation the engine replaces."""
+    before = prices.loc[event - pd.Timedelta(days=days_before):event, 'Price'].dropna()
+    after = prices.loc[event:event + pd.Timedelta(days=days_after), 'Price'].dropna()
+    t_stat, p_val = stats.ttest_ind(before, after, equal_var=equal_var)
+    return before, after, t_stat, p_val
+
+
+@pytest.mark.parametrize('equal_var', [True, False])
+def test_t_tests_match_scipy(prices, equal_var):
+    result = EventImpactEngine(prices).compute(EVENTS, days_before=120, days_after=90, equal_var=equal_var)
+    for event, (_, row) in zip(EVENTS, result.iterrows()):
+        before, after, t_stat, p_val = baseline(prices, event, 120, 90, equal_var)
+        assert (row['N Before'], row['N After']) == (len(before), len(after))
+        assert row['T-Statistic'] == pytest.approx(t_stat, rel=1e-8)
+        assert row['P-Value'] == pytest.approx(p_val, rel=1e-6)
+
+
+def test_window_moments_match_pandas(prices):
+    engine = EventImpactEngine(prices)
+    start, stop = engine.window_index.bounds(EVENTS, days_before=45, days_after=30)
+    n, mean, var = engine.window_moments(start, stop)
+    for i, event in enumerate(EVENTS):
+        window = prices.loc[event - pd.Timedelta(days=45):event + pd.Timedelta(days=30), 'Price'].dropna()
+        assert n[i] == len(window)
+        assert mean[i] == pytest.approx(window.mean(), rel=1e-12)
+        assert var[i] == pytest.approx(window.var(), rel=1e-9)
+
+
+def test_horizon_changes_and_cumulative_returns():
+    # Calendar-day prices, so every horizon date is a trading day
+    rng = np.random.default_rng(1)
+    prices = pd.Series(50.0 + np.cumsum(rng.normal(size=800)) * 0.1 + np.arange(800) * 0.01,
+                       index=pd.date_range('2020-01-01', periods=800, freq='D'))
+    events = pd.to_datetime(['2020-08-01', '2021-03-15'])
+    result = EventImpactEngine(prices).compute(events, horizons=(30, 45), days_before=60, days_after=60)
+
+    assert list(result.columns[2:4]) == [horizon_label(30), horizon_label(45)] == ['Change_1M', 'Change_45D']
+    for i, event in enumerate(events):
+        for days in (30, 45):
+            before = prices[event - pd.Timedelta(days=days)]
+            after = prices[event + pd.Timedelta(days=days)]
+            assert result[horizon_label(days)][i] == pytest.approx((after - before) / before * 100)
+        window = prices[event - pd.Timedelta(days=60):event]
+        assert result['Cumulative Return Before'][i] == pytest.approx(window.iloc[-1] / window.iloc[0] - 1)
+
+
+def test_events_outside_the_data_give_nan(prices):
+    result = EventImpactEngine(prices).compute(['2030-01-01'], names=['Future'])
+    assert result['Event'].tolist() == ['Future']
+    assert result['N Before'].tolist() == [0]
+    assert result[['T-Statistic', 'P-Value', 'Change_1M', 'Cumulative Return After']].isna().all(axis=None)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from event_labels import EventIntervalIndex, label_events
+
+EVENTS = pd.DataFrame({
+    'Event': ['Gulf War', 'Sanctions', 'Pandemic', 'Strike'],
+    'Start': ['2020-01-03', '2020-01-05', '2020-01-08', '2020-01-04'],
+    'End': ['2020-01-06', None, '2020-01-09', '2020-01-04'],
+})
+
+
+def brute_force(dates, events):
+    """Active events on each date, in start order, by checking every (date, event) pair."""
+    events = events.assign(Start=pd.to_datetime(events['Start']), End=pd.to_datetime(events['End']))
+    events = events.sort_values(['Start', 'End'], kind='stable')
+    return [[row.Event for row in events.itertuples()
+             if row.Start <= date and (pd.isna(row.End) or date <= row.End)] for date in dates]
+
+
+def test_membership_matches_brute_force():
+    dates = pd.date_range('2020-01-01', '2020-01-12')[::-1]  # any order
+    membership = EventIntervalIndex(EVENTS).membership(dates)
+    expected = brute_force(dates, EVENTS)
+    assert [membership.events_at(i) for i in range(len(dates))] == expected
+    assert membership.counts.tolist() == [len(active) for active in expected]
+    assert membership.to_frame().sum(axis=1).tolist() == membership.counts.tolist()
+
+
+def test_random_intervals_match_brute_force():
+    rng = np.random.default_rng(0)
+    starts = pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 60, 40), unit='D')
+    ends = starts + pd.to_timedelta(rng.integers(0, 20, 40), unit='D')
+    events = pd.DataFrame({'Event': [f'E{i}' for i in range(40)], 'Start': starts,
+                           'End': ends.where(rng.random(40) > 0.1)})
+    dates = pd.bdate_range('2020-12-15', '2021-04-15')
+    membership = EventIntervalIndex(events).membership(dates)
+    assert [membership.events_at(i) for i in range(len(dates))] == brute_force(dates, events)
+
+
+def test_primary_label_is_the_latest_started_event():
+    dates = pd.to_datetime(['2020-01-02', '2020-01-04', '2020-01-06', '2020-01-08'])
+    labels = EventIntervalIndex(EVENTS).membership(dates).primary()
+    assert list(labels) == ['No Event', 'Strike', 'Sanctions', 'Pandemic']
+
+
+def test_label_events_leaves_the_input_unchanged():
+    prices = pd.DataFrame({'Price': [1.0, 2.0, 3.0]}, index=pd.date_range('2020-01-04', periods=3, name='Date'))
+    labelled, membership = label_events(prices, EVENTS)
+    assert list(prices.columns) == ['Price']
+    assert labelled['Event'].tolist() == ['Strike', 'Sanctions', 'Sanctions']
+    assert labelled['Active Events'].tolist() == [2, 2, 2]
+    assert len(membership) == 3
+
+
+@pytest.mark.parametrize('events, message', [
+    (EVENTS.assign(Start=[None, '2020-01-05', '2020-01-08', '2020-01-04']), 'start date'),
+    (EVENTS.assign(End=['2020-01-01', None, '2020-01-09', '2020-01-04']), 'Gulf War'),
+    (EVENTS.assign(Event=['A', 'A', 'B', 'C']), 'unique'),
+])
+def test_invalid_events_are_rejected(events, message):
+    with pytest.raises(ValueError, match=message):
+        EventIntervalIndex(events)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from histogram import MAX_BINS, HistogramService
+
+
+@pytest.fixture
+def prices():
+    values = [12.0, 14.5, np.nan, 17.0, 21.9, 22.0, 30.0]
+    return pd.Series(values, index=pd.date_range('2020-01-01', periods=len(values)), name='Price')
+
+
+def test_bin_size_counts(prices):
+    edges, counts = HistogramService(prices).counts(bin_size=5)
+    np.testing.assert_array_equal(edges, [12, 17, 22, 27, 32])
+    np.testing.assert_array_equal(counts, [2, 2, 1, 1])
+
+
+def test_edges_and_date_range(prices):
+    service = HistogramService(prices)
+    edges, counts = service.counts(edges=[10, 20, 30], start='2020-01-02', end='2020-01-06')
+    np.testing.assert_array_equal(counts, [2, 2])
+    # An aware date is compared in UTC
+    _, aware = service.counts(edges=[10, 20, 30], start='2020-01-02T01:00+01:00', end='2020-01-06T00:00Z')
+    np.testing.assert_array_equal(aware, counts)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'bin_size': 0}, {'bin_size': np.nan}, {'bin_size': np.inf}, {'bin_size': 1e-300},
+    {'bin_size': 18.0 / (MAX_BINS + 1)}, {'edges': [1, 1]}, {'edges': [0, np.inf]},
+    {'start': pd.NaT}, {'end': 'NaT'},
+])
+def test_invalid_requests_are_rejected(prices, kwargs):
+    with pytest.raises(ValueError):
+        HistogramService(prices).counts(**kwargs)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ingest import IncrementalPriceIngestor
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(2)
+    values = 70.0 + np.cumsum(rng.normal(0.0, 1.0, 300))
+    values[[0, 5, 6, 7, 150, 299]] = np.nan
+    values[200:230] = np.nan  # longer than the smaller windows
+    return pd.Series(values, index=pd.bdate_range('2018-01-01', periods=300), name='Price')
+
+
+@pytest.mark.parametrize('window', [2, 5, 21])
+def test_rolling_stats_match_pandas_with_missing_prices(prices, window):
+    ingestor = IncrementalPriceIngestor()
+    for batch in np.array_split(np.arange(len(prices)), 7):
+        ingestor.append(prices.iloc[batch])
+        seen = prices.iloc[:batch[-1] + 1]
+        rolling = seen.rolling(window, min_periods=1)
+        mean, std = ingestor.rolling_stats(window)
+        np.testing.assert_allclose([mean, std], [rolling.mean().iloc[-1], rolling.std().iloc[-1]],
+                                   rtol=1e-9, equal_nan=True)
+
+
+def test_rolling_stats_without_valid_prices():
+    ingestor = IncrementalPriceIngestor(pd.Series([np.nan] * 5, index=pd.date_range('2020-01-01', periods=5)))
+    assert np.isnan(ingestor.rolling_stats(3)).all()
+    assert np.isnan(ingestor.rolling_stats(10)).all()
+
+
+def test_cusum_skips_missing_prices(prices):
+    ingestor = IncrementalPriceIngestor(prices.iloc[:100])
+    ingestor.append(prices.iloc[100:])
+    expected = (prices - prices.mean()).fillna(0.0).cumsum()
+    np.testing.assert_allclose(ingestor.cusum(), expected, atol=1e-8)
+    assert ingestor.cusum_at(210) == pytest.approx(expected.iloc[210], abs=1e-8)
+
+
+def test_statistics_and_histogram(prices):
+    ingestor = IncrementalPriceIngestor(prices, bin_size=5)
+    assert len(ingestor) == len(prices)
+    assert ingestor.stats.count == prices.count()
+    assert ingestor.stats.mean == pytest.approx(prices.mean())
+    assert ingestor.stats.std == pytest.approx(prices.std())
+    assert ingestor.histogram()['Frequency'].sum() == prices.count()
+    with pytest.raises(ValueError):
+        ingestor.append(prices.iloc[-3:])
@@ -0,0 +1,79 @@
+import json
+import logging
+import threading
+
+import pytest
+from logger import SetupLogger, shutdown
+
+
+@pytest.fixture(autouse=True)
+def flush_writers():
+    yield
+    shutdown()
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_repeated_setup_writes_each_record_once(tmp_path):
+    path = str(tmp_path / 'logs' / 'app.log')
+    for _ in range(3):
+        logger = SetupLogger(path, name='test_logger.repeat').get_logger()
+    assert len(logger.handlers) == 1
+    logger.info('price data loaded')
+    shutdown()
+    lines = read_lines(path)
+    assert len(lines) == 1 and lines[0].endswith(' - test_logger.repeat - INFO - price data loaded')
+    assert logger.handlers == []
+
+
+def test_json_lines_with_extra_fields_and_tracebacks(tmp_path):
+    path = str(tmp_path / 'app.jsonl')
+    logger = SetupLogger(path, name='test_logger.json', json_format=True).get_logger()
+    logger.info('fetched %d rows', 9011, extra={'source': 'gdrive'})
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception('analysis failed')
+    shutdown()
+    first, second = [json.loads(line) for line in read_lines(path)]
+    assert first['message'] == 'fetched 9011 rows' and first['source'] == 'gdrive' and first['level'] == 'INFO'
+    assert second['level'] == 'ERROR' and 'ZeroDivisionError' in second['exception']
+
+
+def test_records_from_many_threads_all_arrive(tmp_path):
+    path = str(tmp_path / 'threads.log')
+    logger = SetupLogger(path, name='test_logger.threads').get_logger()
+
+    def work(i):
+        for j in range(100):
+            logger.info('thread %d record %d', i, j)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown()
+    assert len(read_lines(path)) == 800
+
+
+def test_files_are_rotated(tmp_path):
+    path = tmp_path / 'rotating.log'
+    logger = SetupLogger(str(path), name='test_logger.rotate', max_bytes=2000, backup_count=2).get_logger()
+    for i in range(200):
+        logger.info('record %d', i)
+    shutdown()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['rotating.log', 'rotating.log.1', 'rotating.log.2']
+    assert path.stat().st_size <= 2000
+
+
+def test_level_is_applied(tmp_path):
+    path = str(tmp_path / 'level.log')
+    logger = SetupLogger(path, log_level=logging.WARNING, name='test_logger.level').get_logger()
+    logger.info('hidden')
+    logger.warning('shown')
+    shutdown()
+    assert [line.rsplit(' - ', 1)[1] for line in read_lines(path)] == ['shown']
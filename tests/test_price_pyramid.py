@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from price_pyramid import PricePyramid, bucket_end, bucket_start
+
+# Pandas frequencies grouping the same buckets as each pyramid level
+RESAMPLE = {'W': 'W-MON', 'M': 'MS', 'Q': 'QS', 'Y': 'YS'}
+
+
+@pytest.fixture(scope='module')
+def prices():
+    rng = np.random.default_rng(0)
+    values = 50.0 + np.cumsum(rng.normal(0.0, 1.0, 2000))
+    values[rng.choice(2000, 40, replace=False)] = np.nan
+    return pd.Series(values, index=pd.bdate_range('2012-02-15', periods=2000, name='Date'), name='Price')
+
+
+def resampled(prices, freq):
+    grouped = prices.dropna().resample(RESAMPLE.get(freq, freq), closed='left', label='left')
+    expected = pd.DataFrame({
+        'Open': grouped.first(), 'High': grouped.max(), 'Low': grouped.min(), 'Close': grouped.last(),
+        'Mean': grouped.mean(), 'Std': grouped.std(), 'Count': grouped.count(), 'Sum': grouped.sum(),
+    })
+    return expected[expected['Count'] > 0]
+
+
+def assert_bars_equal(result, expected):
+    np.testing.assert_array_equal(result.index.values, expected.index.values)
+    np.testing.assert_array_equal(result['Count'], expected['Count'])
+    for column in ('Open', 'High', 'Low', 'Close', 'Mean', 'Std', 'Sum'):
+        np.testing.assert_allclose(result[column], expected[column], rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M', 'Q', 'Y'])
+def test_levels_match_pandas_resample(prices, freq):
+    assert_bars_equal(PricePyramid(prices).query(freq), resampled(prices, freq))
+
+
+@pytest.mark.parametrize('freq', ['W', 'M', 'Q', 'Y'])
+def test_ranges_match_pandas_resample(prices, freq):
+    pyramid = PricePyramid(prices)
+    rng = np.random.default_rng(1)
+    days = pd.date_range(prices.index[0] - pd.Timedelta(days=10), prices.index[-1] + pd.Timedelta(days=10))
+    for _ in range(25):
+        start, end = sorted(rng.choice(days, 2))
+        assert_bars_equal(pyramid.query(freq, start, end), resampled(prices[start:end], freq))
+
+
+def test_appending_in_pieces_matches_one_build(prices):
+    pieces = PricePyramid()
+    for bounds in np.array_split(np.arange(len(prices)), 9):
+        pieces.append(prices.iloc[bounds[0]:bounds[-1] + 1])
+    whole = PricePyramid(prices)
+    for freq in ('D', 'W', 'M', 'Q', 'Y'):
+        pd.testing.assert_frame_equal(pieces.query(freq), whole.query(freq), rtol=1e-9)
+    with pytest.raises(ValueError):
+        pieces.append(prices.iloc[:5])
+
+
+def test_summary_matches_the_range(prices):
+    summary = PricePyramid(prices).summary('2013-03-07', '2016-11-22')
+    window = prices['2013-03-07':'2016-11-22'].dropna()
+    assert summary['count'] == len(window)
+    assert summary['open'] == window.iloc[0] and summary['close'] == window.iloc[-1]
+    assert summary['high'] == window.max() and summary['low'] == window.min()
+    assert summary['mean'] == pytest.approx(window.mean(), rel=1e-12)
+    assert summary['std'] == pytest.approx(window.std(), rel=1e-9)
+
+
+def test_bucket_bounds():
+    days = np.array(['2024-02-14', '2024-05-01', '2024-12-31'], dtype='datetime64[D]')
+    assert bucket_start(days, 'W').astype(str).tolist() == ['2024-02-12', '2024-04-29', '2024-12-30']
+    assert (bucket_end(days, 'W') - 1).astype(str).tolist() == ['2024-02-18', '2024-05-05', '2025-01-05']
+    assert (bucket_end(days, 'M') - 1).astype(str).tolist() == ['2024-02-29', '2024-05-31', '2024-12-31']
+    assert (bucket_end(days, 'Q') - 1).astype(str).tolist() == ['2024-03-31', '2024-06-30', '2024-12-31']
@@ -0,0 +1,54 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from price_store import normalize_price_frame, read_price_store, write_price_store
+
+
+@pytest.fixture
+def raw():
+    return pd.DataFrame({'Date': ['20-May-87', '21-May-87', 'Apr 22, 2020', 'not a date', '19-May-87'],
+                         'Price': ['18.63', '18.45', '20.1', '1.0', 'n/a']})
+
+
+def test_normalize_parses_sorts_and_types(raw):
+    df = normalize_price_frame(raw)
+    assert df.index.dtype == 'datetime64[ns]'
+    assert df.index.tolist() == pd.to_datetime(['1987-05-19', '1987-05-20', '1987-05-21', '2020-04-22']).tolist()
+    assert df['Price'].dtype == np.float64
+    assert np.isnan(df['Price'].iloc[0])
+
+
+@pytest.mark.parametrize('memory_map', [True, False])
+def test_round_trip(tmp_path, raw, memory_map):
+    path = write_price_store(raw, str(tmp_path / 'prices.feather'))
+    pd.testing.assert_frame_equal(read_price_store(path, memory_map=memory_map), normalize_price_frame(raw))
+    assert os.listdir(tmp_path) == ['prices.feather']
+
+
+def test_concurrent_writers_publish_whole_files(tmp_path, raw):
+    path = str(tmp_path / 'prices.feather')
+    frames = [normalize_price_frame(raw).assign(Price=float(i)) for i in range(8)]
+    threads = [threading.Thread(target=write_price_store, args=(frame, path)) for frame in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert read_price_store(path)['Price'].nunique() == 1
+    assert os.listdir(tmp_path) == ['prices.feather']
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, raw, monkeypatch):
+    from pyarrow import feather
+
+    def fail(table, dest, **kwargs):
+        with open(dest, 'wb') as f:
+            f.write(b'ARROW1')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(feather, 'write_feather', fail)
+    with pytest.raises(OSError):
+        write_price_store(raw, str(tmp_path / 'prices.feather'))
+    assert os.listdir(tmp_path) == []
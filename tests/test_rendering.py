@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from rendering import PlotRenderer, PlotSpec, output, slugify
+
+
+def specs():
+    dates = pd.date_range('2020-01-01', periods=50, freq='D')
+    prices = pd.Series(np.linspace(40.0, 60.0, 50), index=dates)
+    return {
+        'line': PlotSpec('line', {'Price': prices}, title='Price', vlines=[dates[10]],
+                         annotations=[(dates[10], 50.0, 'Event')], legend=True, grid='both'),
+        'bar': PlotSpec('bar', pd.Series([1.0, 2.0], index=[2019, 2020]), rotation=45),
+        'grouped_bar': PlotSpec('grouped_bar', pd.DataFrame({'1M': [1.0, -2.0], '3M': [0.5, 3.0]},
+                                                            index=['A', 'B']), legend='Horizon'),
+        'hist': PlotSpec('hist', (np.array([0.0, 5.0, 10.0]), np.array([3, 7])), color='skyblue'),
+        'box': PlotSpec('box', pd.Series([1.0, np.nan, 3.0, 2.0])),
+        'panels': PlotSpec('panels', [PlotSpec('line', {'Price': prices}), PlotSpec('box', prices)],
+                           title='Panels', figsize=(8, 6)),
+    }
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        PlotSpec('pie', [1, 2])
+
+
+def test_slugify():
+    assert slugify('Arab Spring (2010)') == 'arab_spring_2010'
+    assert slugify('***') == 'plot'
+
+
+@pytest.mark.parametrize('kind', list(specs()))
+def test_render_every_kind(tmp_path, kind):
+    path = PlotRenderer(str(tmp_path)).render(specs()[kind], f'Plot {kind}')
+    assert path == str(tmp_path / f'plot_{kind}.png')
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_reused_figures_draw_the_same_image(tmp_path):
+    reused = PlotRenderer(str(tmp_path / 'reused'))
+    fresh = PlotRenderer(str(tmp_path / 'fresh'), reuse_figures=False)
+    for name, spec in specs().items():
+        with open(reused.render(spec, name), 'rb') as a, open(fresh.render(spec, name), 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_flush_renders_the_queue_in_workers(tmp_path):
+    renderer = PlotRenderer(str(tmp_path), workers=2, fmt='svg')
+    for name, spec in specs().items():
+        assert output(spec, name, renderer=renderer) is spec
+    assert os.listdir(tmp_path) == []
+
+    paths = renderer.flush()
+    assert paths == [renderer.path_for(name) for name in specs()]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+    assert renderer.flush() == []
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from models.cache import ResponseCache
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache()
+    calls = []
+    start = threading.Barrier(16)
+
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return object(), True
+
+    def request(_):
+        start.wait()
+        return cache.get_or_compute('key', compute)
+
+    with ThreadPoolExecutor(16) as pool:
+        values = list(pool.map(request, range(16)))
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+    assert cache.get('key') is values[0]
+
+
+def test_different_keys_compute_concurrently():
+    cache = ResponseCache()
+    started = {key: threading.Event() for key in 'ab'}
+
+    def compute(key, other):
+        started[key].set()
+        # Would time out if the computation of `other` were blocked behind this one
+        assert started[other].wait(5)
+        return key, True
+
+    with ThreadPoolExecutor(2) as pool:
+        a = pool.submit(cache.get_or_compute, 'a', lambda: compute('a', 'b'))
+        b = pool.submit(cache.get_or_compute, 'b', lambda: compute('b', 'a'))
+        assert (a.result(), b.result()) == ('a', 'b')
+
+
+def test_uncacheable_values_are_not_stored():
+    cache = ResponseCache()
+    assert cache.get_or_compute('key', lambda: ('error', False)) == 'error'
+    assert len(cache) == 0
+    assert cache.get_or_compute('key', lambda: ('value', True)) == 'value'
+    assert cache.get_or_compute('key', lambda: ('other', True)) == 'value'
+
+
+def test_failed_computation_releases_the_key():
+    cache = ResponseCache()
+
+    def fail():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', fail)
+    assert cache._key_locks == {}
+    assert cache.get_or_compute('key', lambda: ('value', True)) == 'value'
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from rolling_stats import RollingStats
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    values = 60.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, 600)))
+    values[[10, 300]] = np.nan
+    values[400:420] = values[399]  # flat stretch: the rolling std must be exactly 0
+    return pd.Series(values, index=pd.bdate_range('2015-01-01', periods=600), name='Price')
+
+
+@pytest.mark.parametrize('window', [2, 5, 21, 252])
+def test_matches_pandas_rolling(prices, window):
+    expected_prices = prices.dropna()
+    stats = RollingStats(prices)
+    rolling = expected_prices.rolling(window)
+    log_returns = np.log(expected_prices).diff()
+
+    np.testing.assert_allclose(stats.mean(window), rolling.mean(), rtol=1e-10, equal_nan=True)
+    # pandas leaves rounding noise on the flat stretch, which RollingStats clamps to 0
+    expected_std = rolling.std().where(rolling.max() != rolling.min(), 0.0)
+    np.testing.assert_allclose(stats.std(window), expected_std, rtol=1e-7, atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(stats.volatility(window),
+                               log_returns.rolling(window).std() * np.sqrt(252), rtol=1e-7, atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(stats.drawdown(window), expected_prices / rolling.max() - 1.0,
+                               rtol=1e-12, equal_nan=True)
+
+
+def test_flat_prices_have_zero_std(prices):
+    stats = RollingStats(prices)
+    flat = stats.dates.get_indexer(prices.index[404:420])
+    assert (stats.std(5)[flat] == 0.0).all()
+    assert np.isnan(stats.zscore(5)[flat]).all()
+
+
+def test_compute_range_keeps_earlier_history(prices):
+    stats = RollingStats(prices)
+    whole = stats.compute([5, 21])
+    part = stats.compute([5, 21], start='2016-01-01', end='2016-03-31')
+    pd.testing.assert_frame_equal(part, whole.loc['2016-01-01':'2016-03-31'])
+    assert list(whole.columns) == ['Price'] + [f'{stat}_{window}' for stat in
+                                               ('mean', 'std', 'volatility', 'drawdown', 'zscore')
+                                               for window in (5, 21)]
+
+
+def test_invalid_windows_are_rejected(prices):
+    stats = RollingStats(prices)
+    with pytest.raises(ValueError):
+        stats.std(1)
+    with pytest.raises(ValueError):
+        stats.compute([2.5])
+    with pytest.raises(ValueError):
+        stats.compute([])
+
+
+def test_compute_range_accepts_aware_dates(prices):
+    stats = RollingStats(prices)
+    naive = stats.compute([5], start='2016-01-01', end='2016-03-31')
+    aware = stats.compute([5], start='2016-01-01T01:00+01:00', end='2016-03-31T00:00Z')
+    pd.testing.assert_frame_equal(aware, naive)
+    with pytest.raises(ValueError):
+        stats.compute([5], start=pd.NaT)
+    with pytest.raises(ValueError):
+        stats.compute(list(range(2, 53)))
@@ -0,0 +1,21 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import run_benchmarks  # noqa: E402
+
+
+def test_benchmark_run_writes_and_compares_results(tmp_path, capsys):
+    output = str(tmp_path / 'results.json')
+    args = ['--sizes', '300', '--events', '5', '--repeat', '2', '--skip-endpoints',
+            '--only', 'get_prices_around_event|calculate_price_distribution']
+    run_benchmarks.main(args + ['--output', output])
+    with open(output) as f:
+        results = json.load(f)
+    assert [r['name'] for r in results['results']] == ['get_prices_around_event', 'calculate_price_distribution']
+    assert all(r['size'] == 300 and r['repeat'] == 2 and r['min_s'] <= r['median_s'] for r in results['results'])
+    assert results['meta']['args']['events'] == 5
+
+    run_benchmarks.main(args + ['--output', str(tmp_path / 'again.json'), '--compare', output])
+    assert 'ratio' in capsys.readouterr().out
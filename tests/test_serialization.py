@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from models import serialization
+from models.serialization import JSON_MIMETYPE, Table, serialize, serialize_ndjson
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    return request.param
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2020-01-01', '2020-01-02', None]),
+        'Price': [1.5, np.nan, np.inf],
+        'Event': ['a', None, 'c'],
+    })
+
+
+def test_missing_and_infinite_numbers_become_null(encoder, frame):
+    payload = {
+        'table': Table(frame),
+        'floats': [float('nan'), float('-inf'), 2.5],
+        'numpy': np.array([np.nan, 1.0]),
+        'scalar': np.float64(np.nan),
+        'nested': {'value': (float('inf'), 3)},
+    }
+    body = serialize(payload, JSON_MIMETYPE)
+    assert b'NaN' not in body and b'Infinity' not in body
+    assert json.loads(body) == {
+        'table': [
+            {'Date': '2020-01-01T00:00:00', 'Price': 1.5, 'Event': 'a'},
+            {'Date': '2020-01-02T00:00:00', 'Price': None, 'Event': None},
+            {'Date': None, 'Price': None, 'Event': 'c'},
+        ],
+        'floats': [None, None, 2.5],
+        'numpy': [None, 1.0],
+        'scalar': None,
+        'nested': {'value': [None, 3]},
+    }
+
+
+def test_columnar_layout(encoder, frame):
+    body = json.loads(serialize(Table(frame), JSON_MIMETYPE, layout='columnar'))
+    assert body['columns'] == ['Date', 'Price', 'Event'] and body['length'] == 3
+    assert body['data']['Date'] == [1577836800000, 1577923200000, None]
+    assert body['data']['Price'] == [1.5, None, None]
+
+
+def test_ndjson_rows(encoder, frame):
+    lines = serialize_ndjson(Table(frame)).splitlines()
+    assert [json.loads(line)['Price'] for line in lines] == [1.5, None, None]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from synthetic_data import key_events, synthetic_events, synthetic_prices
+
+
+def test_prices_are_seeded():
+    pd.testing.assert_frame_equal(synthetic_prices(500, seed=3), synthetic_prices(500, seed=3))
+    assert not synthetic_prices(500, seed=3).equals(synthetic_prices(500, seed=4))
+
+
+@pytest.mark.parametrize('n, freq', [(1, 'B'), (2500, 'B'), (5000, 'h')])
+def test_prices_shape(n, freq):
+    prices = synthetic_prices(n, freq=freq, missing_rate=0.01, n_regimes=4)
+    assert len(prices) == n
+    assert list(prices.columns) == ['Price'] and prices.index.name == 'Date'
+    assert prices.index.is_monotonic_increasing and prices.index.is_unique
+    assert (prices['Price'].dropna() > 0).all()
+    assert set(prices.attrs['change_points']) <= set(prices.index)
+    assert len(prices.attrs['change_points']) == min(3, n - 1)
+
+
+def test_prices_have_gaps_and_missing_values():
+    prices = synthetic_prices(20000, freq='D', gap_rate=0.05, missing_rate=0.02)
+    steps = np.diff(prices.index.values).astype('timedelta64[D]').astype(np.int64)
+    assert (steps > 1).any()
+    assert 0.01 < prices['Price'].isna().mean() < 0.03
+    assert not synthetic_prices(1000, gap_rate=0.0)['Price'].isna().any()
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        synthetic_prices(0)
+
+
+def test_events():
+    events = synthetic_events(200, start='2000-01-01', end='2010-12-31', max_duration_days=30, seed=1)
+    assert len(events) == 200 and events['Event'].is_unique
+    assert (events['Start'] >= pd.Timestamp('2000-01-01')).all()
+    durations = (events['End'] - events['Start']).dt.days
+    assert durations.between(0, 30).all()
+    assert 0.15 < (durations == 0).mean() < 0.45
+    catalogue = key_events(events)
+    assert catalogue['Event 00000'] == events['Start'][0].strftime('%Y-%m-%d')
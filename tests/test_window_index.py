@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from window_index import DateWindowIndex
+
+# Trading days with a weekend gap and a longer gap before the 15th
+DATES = pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-05', '2024-01-08', '2024-01-15'])
+
+
+@pytest.fixture
+def index():
+    return DateWindowIndex(pd.Series(np.arange(len(DATES), dtype=float), index=DATES))
+
+
+QUERIES = ['2024-01-01', '2024-01-02', '2024-01-04', '2024-01-06', '2024-01-07', '2024-01-11', '2024-01-20']
+
+
+@pytest.mark.parametrize('policy, expected', [
+    ('exact', [-1, 0, -1, -1, -1, -1, -1]),
+    ('previous', [-1, 0, 1, 2, 2, 3, 4]),
+    ('next', [0, 0, 2, 3, 3, 4, -1]),
+    # 01-04 and 01-11 are equally far from both neighbours; ties go to the previous day
+    ('nearest', [0, 0, 1, 2, 3, 3, 4]),
+])
+def test_asof_policies(index, policy, expected):
+    assert index.asof_positions(QUERIES, policy=policy).tolist() == expected
+
+
+@pytest.mark.parametrize('policy, expected', [
+    ('previous', [-1, 0, 1, 2, -1, -1, -1]),
+    ('next', [0, 0, 2, -1, 3, -1, -1]),
+    ('nearest', [0, 0, 1, 2, 3, -1, -1]),
+])
+def test_asof_tolerance(index, policy, expected):
+    assert index.asof_positions(QUERIES, policy=policy, tolerance_days=1).tolist() == expected
+
+
+def test_asof_zero_tolerance_is_exact(index):
+    for policy in ('previous', 'next', 'nearest'):
+        np.testing.assert_array_equal(index.asof_positions(QUERIES, policy=policy, tolerance_days=0),
+                                      index.asof_positions(QUERIES, policy='exact'))
+
+
+def test_asof_scalar_and_empty_index(index):
+    assert index.asof_positions('2024-01-09', policy='previous').tolist() == [3]
+    empty = DateWindowIndex(pd.Series([], index=pd.DatetimeIndex([]), dtype=float))
+    assert empty.asof_positions(QUERIES).tolist() == [-1] * len(QUERIES)
+
+
+def test_asof_rejects_unknown_policy(index):
+    with pytest.raises(ValueError):
+        index.asof_positions(QUERIES, policy='closest')
+
+
+def test_windows_are_inclusive_positional_slices(index):
+    start, stop = index.bounds(['2024-01-05', '2024-01-10'], days_before=2, days_after=[3, 5])
+    assert start.tolist() == [1, 3]
+    assert stop.tolist() == [4, 5]
+    assert index.window('2024-01-05', 2, 3).index.equals(DATES[1:4])
+
+
+def test_unsorted_input_is_sorted_once():
+    shuffled = pd.Series([3.0, 1.0, 2.0], index=DATES[[2, 0, 1]])
+    index = DateWindowIndex(shuffled)
+    assert index.index.equals(DATES[:3])
+    assert index.window('2024-01-03', 0, 0).tolist() == [2.0]